@@ -0,0 +1,86 @@
+"""
+Cost of the UI's per-rerun output handling for one finished blog, before
+and after the artifact store.
+
+before: every Streamlit rerun writes downloads/<slug>.md, zips the blog in
+memory, writes the zip, and reopens both files for the download buttons.
+after:  the reducer saves the Markdown once and reruns serve it from memory;
+the zip is built once, on the first download, and later downloads read the
+saved zip.
+
+    python -m benchmarks.bench_artifacts --reruns 50 --downloads 3 --words 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+import zipfile
+from io import BytesIO
+
+from core.artifacts import ArtifactStore, zip_bytes
+
+WORKDIR = tempfile.mkdtemp(prefix="bench_artifacts_")
+
+
+def make_blog(words: int) -> str:
+    body = "\n\n".join(
+        f"## Section {s}\n\n" + " ".join(f"word{(s * 31 + i) % 997}" for i in range(words // 10))
+        for s in range(10)
+    )
+    return f"# Benchmark blog\n\n{body}\n"
+
+
+def before(final_md: str, reruns: int, downloads: int) -> dict:
+    out = os.path.join(WORKDIR, "before")
+    os.makedirs(out, exist_ok=True)
+    md_path, zip_path = os.path.join(out, "blog.md"), os.path.join(out, "blog.zip")
+    written = 0
+    for _ in range(reruns):
+        with open(md_path, "w", encoding="utf-8") as f:
+            f.write(final_md)
+        buf = BytesIO()
+        with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as z:
+            z.writestr("blog.md", final_md.encode("utf-8"))
+        zip_data = buf.getvalue()
+        with open(zip_path, "wb") as f:
+            f.write(zip_data)
+        with open(md_path, "rb") as f:
+            f.read()
+        with open(zip_path, "rb") as f:
+            f.read()
+        written += len(final_md.encode("utf-8")) + len(zip_data)
+    return {"bytes_written": written, "zips_built": reruns}
+
+
+def after(final_md: str, reruns: int, downloads: int) -> dict:
+    store = ArtifactStore(os.path.join(WORKDIR, "after"))
+    store.put("blog.md", final_md)  # the reducer's single save
+    for i in range(reruns):
+        md_bytes = final_md.encode("utf-8")
+        if i < downloads:  # a download click on some reruns
+            store.derived_bytes("blog.zip", md_bytes, lambda: zip_bytes({"blog.md": md_bytes}))
+    return {"bytes_written": store.stats["bytes_written"], "zips_built": store.stats["built"]}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reruns", type=int, default=50)
+    ap.add_argument("--downloads", type=int, default=3, help="reruns that also download the zip")
+    ap.add_argument("--words", type=int, default=20000)
+    args = ap.parse_args()
+
+    final_md = make_blog(args.words)
+    print(f"blog: {len(final_md.encode('utf-8')) / 1024:.0f} KiB, {args.reruns} reruns, {args.downloads} zip downloads")
+    print(f"{'':>6} | {'total ms':>8} {'ms/rerun':>8} {'KiB written':>11} {'zips':>4}")
+    results = {}
+    for name, fn in (("before", before), ("after", after)):
+        t0 = time.perf_counter()
+        row = fn(final_md, args.reruns, args.downloads)
+        row["ms"] = (time.perf_counter() - t0) * 1000
+        results[name] = row
+        print(f"{name:>6} | {row['ms']:>8.1f} {row['ms'] / args.reruns:>8.2f} {row['bytes_written'] / 1024:>11.0f} {row['zips_built']:>4}")
+    print(f"after vs before: {(results['after']['ms'] / results['before']['ms'] - 1) * 100:+.1f}% time")
+
+
+if __name__ == "__main__":
+    main()
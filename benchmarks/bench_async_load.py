@@ -0,0 +1,77 @@
+"""
+Throughput of N concurrent topics in one process: sync graph on a thread
+pool vs. async graph (create_async_app) on one event loop, both against the
+local fake LLM and fake search.
+
+    python -m benchmarks.bench_async_load --topics 8 32 --llm-latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("SEARCH_CACHE", "off")
+os.environ.setdefault("LLM_CACHE", "off")
+
+from benchmarks.fakes import FakeChatModel, FakeSearch, install_fakes  # noqa: E402
+from workflow.graph import create_app, create_async_app  # noqa: E402
+
+
+def inputs_for(i: int) -> dict:
+    return {
+        "topic": f"benchmark topic {i}",
+        "mode": "",
+        "needs_research": False,
+        "queries": [],
+        "evidence": [],
+        "plan": None,
+        "as_of": "2026-01-29",
+        "recency_days": 7,
+        "sections": [],
+        "final": "",
+    }
+
+
+def run_sync(n: int, threads: int) -> float:
+    app = create_app(durable=False)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda i: app.invoke(inputs_for(i)), range(n)))
+    return time.perf_counter() - t0
+
+
+async def run_async(n: int) -> float:
+    app = create_async_app(durable=False)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(app.ainvoke(inputs_for(i)) for i in range(n)))
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--topics", type=int, nargs="+", default=[4, 16, 32])
+    ap.add_argument("--threads", type=int, default=8, help="thread pool size for the sync baseline")
+    ap.add_argument("--llm-latency", type=float, default=0.2)
+    ap.add_argument("--search-latency", type=float, default=0.2)
+    ap.add_argument("--tasks", type=int, default=6)
+    args = ap.parse_args()
+
+    install_fakes(
+        FakeChatModel(latency=args.llm_latency, n_tasks=args.tasks),
+        FakeSearch(latency=args.search_latency),
+    )
+    os.chdir(tempfile.mkdtemp(prefix="bench_async_"))  # reducer writes <title>.md into CWD
+
+    print(f"llm={args.llm_latency}s search={args.search_latency}s tasks={args.tasks} sync threads={args.threads}")
+    print(f"{'topics':>6} | {'sync s':>7} {'blogs/s':>7} | {'async s':>7} {'blogs/s':>7}")
+    for n in args.topics:
+        t_sync = run_sync(n, args.threads)
+        t_async = asyncio.run(run_async(n))
+        print(f"{n:>6} | {t_sync:7.2f} {n / t_sync:7.2f} | {t_async:7.2f} {n / t_async:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
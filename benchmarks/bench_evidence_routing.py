@@ -0,0 +1,95 @@
+"""
+Worker prompt size with every section getting evidence[:20] (before) vs.
+BM25-routed top-k evidence per section (after).
+
+    python -m benchmarks.bench_evidence_routing --evidence 60 --top-k 8
+
+Token counts are estimated as chars / 4 (no tokenizer dependency).
+"""
+import argparse
+import os
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from core.relevance import route_evidence  # noqa: E402
+from node.worker import build_worker_messages  # noqa: E402
+from schemas.EvidenceSchema import EvidenceItem  # noqa: E402
+from schemas.PlanSchema import Plan, Task  # noqa: E402
+
+SUBJECTS = [
+    ("vector databases", ["pgvector", "hnsw", "index", "recall"]),
+    ("model pricing", ["tokens", "pricing", "cost", "api"]),
+    ("agent frameworks", ["langgraph", "agents", "tools", "orchestration"]),
+    ("gpu inference", ["gpu", "latency", "batching", "throughput"]),
+    ("evaluation", ["benchmarks", "evals", "accuracy", "regression"]),
+    ("security", ["prompt", "injection", "guardrails", "privacy"]),
+]
+
+
+def make_plan(n_tasks: int) -> Plan:
+    tasks = []
+    for i in range(n_tasks):
+        name, words = SUBJECTS[i % len(SUBJECTS)]
+        tasks.append(
+            Task(
+                id=i + 1,
+                title=f"{name.title()} in practice",
+                goal=f"Understand {name} trade-offs.",
+                bullets=[f"Compare {w} options" for w in words[:4]],
+                target_words=300,
+                tags=words[:2],
+                # Intro/outro style sections don't cite
+                requires_citations=0 < i < n_tasks - 1,
+            )
+        )
+    return Plan(blog_title="State of AI tooling", audience="developers", tone="practical", tasks=tasks)
+
+
+def make_evidence(n: int):
+    out = []
+    for i in range(n):
+        name, words = SUBJECTS[i % len(SUBJECTS)]
+        out.append(
+            EvidenceItem(
+                title=f"{name.title()} update #{i}: {words[i % 4]}",
+                url=f"https://news.example.com/{name.replace(' ', '-')}/{i}",
+                published_at="2026-01-20",
+                snippet=f"Release notes about {' '.join(words)} and what changed for {name}.",
+            )
+        )
+    return out
+
+
+def prompt_tokens(payload: dict) -> int:
+    _, messages = build_worker_messages(payload)
+    return sum(len(m.content) for m in messages) // 4
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tasks", type=int, default=9)
+    ap.add_argument("--evidence", type=int, default=60)
+    ap.add_argument("--top-k", type=int, default=8)
+    args = ap.parse_args()
+
+    plan = make_plan(args.tasks)
+    evidence = make_evidence(args.evidence)
+    routed = route_evidence(plan.tasks, evidence, k=args.top_k, mode="hybrid")
+    base = {"topic": "AI tooling", "mode": "hybrid", "as_of": "2026-01-29", "recency_days": 45, "plan": plan}
+
+    total_before = total_after = 0
+    print(f"{'task':>4} {'cites':>5} | {'ev before':>9} {'ev after':>8} | {'tok before':>10} {'tok after':>9}")
+    for task in plan.tasks:
+        before = prompt_tokens({**base, "task": task, "evidence": evidence})
+        after = prompt_tokens({**base, "task": task, "evidence": routed[task.id]})
+        total_before += before
+        total_after += after
+        print(
+            f"{task.id:>4} {str(task.requires_citations):>5} | {min(20, len(evidence)):>9} {len(routed[task.id]):>8}"
+            f" | {before:>10} {after:>9}"
+        )
+    print(f"total worker prompt tokens: {total_before} -> {total_after} ({1 - total_after / total_before:.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
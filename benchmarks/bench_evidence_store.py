@@ -0,0 +1,84 @@
+"""
+Research over a series of related topics with and without the evidence
+store. Consecutive runs share `--overlap` of their queries (as related
+topics do), so with the store the sources an earlier run already extracted
+are reused and only new search results reach the extractor.
+
+    python -m benchmarks.bench_evidence_store --runs 10 --queries 6 --overlap 0.5
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix="bench_evidence_store_")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("SEARCH_CACHE", "off")
+os.environ.setdefault("LLM_CACHE", "off")
+os.environ["EVIDENCE_STORE_PATH"] = os.path.join(WORKDIR, "evidence.sqlite")
+
+import core.evidence_store  # noqa: E402
+from benchmarks.fakes import FakeChatModel, FakeSearch, install_fakes  # noqa: E402
+from node.Research import research_node  # noqa: E402
+
+
+def run_queries(run: int, n: int, overlap: float) -> list:
+    # Run r keeps the last `shared` queries of run r-1 and adds new ones
+    shared = int(n * overlap)
+    start = run * (n - shared)
+    return [f"topic query {i}" for i in range(start, start + n)]
+
+
+def run(args, store: str) -> dict:
+    core.evidence_store.EVIDENCE_STORE = store
+    llm = FakeChatModel(latency=args.extract_latency, echo_results=True)
+    install_fakes(llm, FakeSearch(latency=args.search_latency))
+
+    latencies, extracted, hits = [], 0, 0
+    for r in range(args.runs):
+        state = {
+            "topic": f"topic {r}",
+            "mode": "open_book",
+            "queries": run_queries(r, args.queries, args.overlap),
+            "as_of": "2026-01-25",
+            "recency_days": 7,
+        }
+        t0 = time.perf_counter()
+        out = research_node(state)
+        latencies.append(time.perf_counter() - t0)
+        extracted += out["research_stats"]["extracted"]
+        hits += out["research_stats"]["store_hits"]
+    return {
+        "p50_s": round(statistics.median(latencies), 3),
+        "extract_calls": llm.calls,
+        "results_extracted": extracted,
+        "store_hits": hits,
+        "evidence_last_run": len(out["evidence"]),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=10)
+    ap.add_argument("--queries", type=int, default=6)
+    ap.add_argument("--overlap", type=float, default=0.5, help="share of queries repeated from the previous run")
+    ap.add_argument("--search-latency", type=float, default=0.1)
+    ap.add_argument("--extract-latency", type=float, default=0.4)
+    args = ap.parse_args()
+
+    print(f"{'store':>5} | {'p50 s':>6} {'calls':>5} {'extracted':>9} {'hits':>5} {'evidence':>8}")
+    results = {}
+    for store in ("off", "on"):
+        row = results[store] = run(args, store)
+        print(
+            f"{store:>5} | {row['p50_s']:>6} {row['extract_calls']:>5} {row['results_extracted']:>9} "
+            f"{row['store_hits']:>5} {row['evidence_last_run']:>8}"
+        )
+    off, on = results["off"], results["on"]
+    print(f"extractor input: {(on['results_extracted'] / off['results_extracted'] - 1) * 100:+.1f}%, "
+          f"research p50: {(on['p50_s'] / off['p50_s'] - 1) * 100:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Export of very large blogs: the first render of every format (one pass over
+the Markdown, plus the zip), then repeated downloads, which hit the render
+cache and, with an artifact store, only compare hashes on disk.
+
+    python -m benchmarks.bench_export --words 10000 100000 1000000 --downloads 20
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from core.artifacts import ArtifactStore  # noqa: E402
+from core.export import FORMATS, export_bytes  # noqa: E402
+from schemas.EvidenceSchema import EvidenceItem  # noqa: E402
+from schemas.PlanSchema import Plan, Task  # noqa: E402
+
+WORKDIR = tempfile.mkdtemp(prefix="bench_export_")
+
+
+def make_result(words: int, sections: int = 12) -> dict:
+    """
+    A finished run whose sections mix the blocks the writer produces:
+    paragraphs with inline markup, lists, a code fence and a table.
+    """
+    per_section = max(1, words // sections)
+    texts = []
+    for s in range(1, sections + 1):
+        sentence = f"Release {s} improves **latency** by `{s}0%` for [vendor {s}](https://example.com/{s}) users"
+        n = max(1, per_section // 14)
+        paras = "\n\n".join(f"{sentence}, paragraph {p} of *section {s}*." for p in range(n))
+        texts.append(
+            f"## Section {s}\n\n{paras}\n\n"
+            f"- first point\n- second point\n  - nested detail\n\n"
+            f"```python\ndef f(x):\n    return x < {s}\n```\n\n"
+            f"| metric | value |\n|---|---:|\n| p50 | {s} ms |\n| p95 | {s * 3} ms |\n"
+        )
+    plan = Plan(
+        blog_title="Very large blog",
+        audience="developers",
+        tone="practical",
+        tasks=[
+            Task(id=s, title=f"Section {s}", goal="Explain.", bullets=["a", "b", "c"], target_words=per_section)
+            for s in range(1, sections + 1)
+        ],
+    )
+    return {
+        "topic": "export benchmark",
+        "mode": "hybrid",
+        "as_of": "2026-01-29",
+        "plan": plan,
+        "evidence": [EvidenceItem(title=f"Source {i}", url=f"https://example.com/{i}") for i in range(40)],
+        "sections": list(enumerate(texts, 1)),
+        "final": "# Very large blog\n\n" + "\n\n".join(texts) + "\n",
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--words", type=int, nargs="+", default=[10000, 100000, 1000000])
+    ap.add_argument("--downloads", type=int, default=20, help="repeated downloads of every format")
+    args = ap.parse_args()
+
+    print(f"{'words':>8} {'MiB md':>7} | {'render ms':>9} {'MiB/s':>6} | {'cached ms':>9} | sizes (KiB)")
+    for words in args.words:
+        result = make_result(words)
+        md_mib = len(result["final"].encode("utf-8")) / 2**20
+        store = ArtifactStore(os.path.join(WORKDIR, str(words)))
+
+        t0 = time.perf_counter()
+        sizes = {fmt: len(export_bytes(result, fmt, store)) for fmt in FORMATS}
+        first = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for _ in range(args.downloads):
+            for fmt in FORMATS:
+                export_bytes(result, fmt, store)
+        cached = (time.perf_counter() - t0) / args.downloads
+
+        print(
+            f"{words:>8} {md_mib:>7.2f} | {first * 1000:>9.1f} {md_mib / first:>6.1f} | {cached * 1000:>9.2f} | "
+            + " ".join(f"{fmt}={size / 1024:.0f}" for fmt, size in sizes.items())
+        )
+        assert store.stats["written"] == len(FORMATS), store.stats  # repeats never rewrite
+
+
+if __name__ == "__main__":
+    main()
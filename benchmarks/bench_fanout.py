@@ -0,0 +1,141 @@
+"""
+Fan-out cost vs. plan and evidence size, for three payload shapes:
+
+- legacy: per-Send model_dump() of the plan and all evidence, rebuilt with
+  pydantic in every worker
+- plan ref: live Plan / routed evidence objects shared by reference
+- current: task + routed evidence slice + a small brief (worker_payloads)
+
+Time is fan-out plus the worker-side parsing; size is what the checkpointer
+stores for the pending Sends (each one serialized on its own with the
+saver's JsonPlusSerializer), which in-process sharing does not reduce.
+
+    python -m benchmarks.bench_fanout
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer  # noqa: E402
+from langgraph.types import Send  # noqa: E402
+
+from core.relevance import route_evidence  # noqa: E402
+from node.Orchestrator import fanout  # noqa: E402
+from node.worker import _as_model, build_worker_messages  # noqa: E402
+from schemas.EvidenceSchema import EvidenceItem  # noqa: E402
+from schemas.PlanSchema import Plan, Task  # noqa: E402
+
+
+def make_state(n_tasks: int, n_evidence: int) -> dict:
+    plan = Plan(
+        blog_title="Benchmark blog",
+        audience="developers",
+        tone="practical",
+        constraints=["no fluff", "cite sources"],
+        tasks=[
+            Task(
+                id=i,
+                title=f"Section {i}",
+                goal="Understand the thing.",
+                bullets=[f"point {j}" for j in range(5)],
+                target_words=300,
+                tags=["perf", "bench"],
+                requires_citations=i % 2 == 0,
+            )
+            for i in range(1, n_tasks + 1)
+        ],
+    )
+    evidence = [
+        EvidenceItem(
+            title=f"Source {i}",
+            url=f"https://example.com/{i}",
+            published_at="2026-01-01",
+            snippet="x" * 240,
+            source="example",
+        )
+        for i in range(n_evidence)
+    ]
+    return {
+        "topic": "benchmark",
+        "mode": "hybrid",
+        "as_of": "2026-01-29",
+        "recency_days": 45,
+        "plan": plan,
+        "evidence": evidence,
+    }
+
+
+def legacy_fanout(state: dict):
+    return [
+        Send(
+            "worker",
+            {
+                "task": task.model_dump(),
+                "topic": state["topic"],
+                "mode": state["mode"],
+                "as_of": state["as_of"],
+                "recency_days": state["recency_days"],
+                "plan": state["plan"].model_dump(),
+                "evidence": [e.model_dump() for e in state.get("evidence", [])],
+            },
+        )
+        for task in state["plan"].tasks
+    ]
+
+
+def plan_ref_fanout(state: dict):
+    # Shared references, but every Send still carries the whole Plan
+    routed = route_evidence(state["plan"].tasks, state.get("evidence", []), mode=state["mode"])
+    shared = {k: state[k] for k in ("topic", "mode", "as_of", "recency_days", "plan")}
+    return [Send("worker", {**shared, "task": task, "evidence": routed[task.id]}) for task in state["plan"].tasks]
+
+
+def worker_parse(payload: dict) -> None:
+    # The model construction worker_node does before building its prompt
+    _as_model(Task, payload["task"])
+    [_as_model(EvidenceItem, e) for e in payload.get("evidence", [])]
+    if "plan" in payload:
+        _as_model(Plan, payload["plan"])
+
+
+SERDE = JsonPlusSerializer()
+
+
+def bench(fn, state: dict, repeat: int):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        sends = fn(state)
+        for s in sends:
+            worker_parse(s.arg)
+    elapsed = (time.perf_counter() - t0) / repeat
+    size = sum(len(SERDE.dumps_typed(s)[1]) for s in sends)
+    return elapsed, size
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    # The brief yields the same prompt as the full plan did
+    state = make_state(3, 10)
+    for old, new in zip(plan_ref_fanout(state), fanout(state)):
+        assert build_worker_messages(old.arg)[1][1].content == build_worker_messages(new.arg)[1][1].content
+
+    variants = {"legacy": legacy_fanout, "plan ref": plan_ref_fanout, "current": fanout}
+    print(f"{'tasks':>5} {'evidence':>8} | " + " ".join(f"{n + ' ms':>11}" for n in variants)
+          + " | " + " ".join(f"{n + ' KB':>11}" for n in variants))
+    for n_tasks in (5, 9):
+        for n_evidence in (0, 20, 60, 120):
+            state = make_state(n_tasks, n_evidence)
+            rows = [bench(fn, state, args.repeat) for fn in variants.values()]
+            print(
+                f"{n_tasks:>5} {n_evidence:>8} | " + " ".join(f"{t * 1e3:11.3f}" for t, _ in rows)
+                + " | " + " ".join(f"{b / 1024:11.1f}" for _, b in rows)
+            )
+
+
+if __name__ == "__main__":
+    main()
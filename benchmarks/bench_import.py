@@ -0,0 +1,80 @@
+"""
+Cold-start cost of the app: fresh interpreters importing the graph (what
+Streamlit and every test pay on start), compiling it, and building the LLM
+on first use. Also lists the slowest imports from `python -X importtime`.
+
+    python -m benchmarks.bench_import --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STEPS = {
+    "import workflow.graph": "import workflow.graph",
+    "+ create_app()": "from workflow.graph import create_app; create_app(durable=False)",
+    "+ first get_llm()": (
+        "from workflow.graph import create_app; create_app(durable=False); "
+        "from core.llm import get_llm; get_llm()"
+    ),
+}
+
+TIMER = "import time; t0 = time.perf_counter(); {code}; print(time.perf_counter() - t0)"
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("GOOGLE_API_KEY", "offline-benchmark")  # never prompt
+    env.setdefault("LLM_CACHE", "off")
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def time_step(code: str, repeat: int) -> list:
+    out = []
+    for _ in range(repeat):
+        res = subprocess.run(
+            [sys.executable, "-c", TIMER.format(code=code)],
+            capture_output=True, text=True, check=True, cwd=ROOT, env=_env(),
+        )
+        out.append(float(res.stdout.strip().splitlines()[-1]))
+    return out
+
+
+def slowest_imports(module: str, top: int) -> list:
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=ROOT, env=_env(),
+    )
+    rows = []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(cumulative_us), int(self_us), depth, name.strip()))
+    # The module itself and what it imports directly
+    return sorted((r for r in rows if r[2] <= 1), reverse=True)[:top]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5, help="fresh interpreters per step")
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    print(f"{'step':>22} | {'median s':>8} {'min s':>7} {'max s':>7}")
+    for label, code in STEPS.items():
+        times = time_step(code, args.repeat)
+        print(f"{label:>22} | {statistics.median(times):8.3f} {min(times):7.3f} {max(times):7.3f}")
+
+    print("\nslowest direct imports of workflow.graph (cumulative ms):")
+    for cumulative_us, _, depth, name in slowest_imports("workflow.graph", args.top):
+        print(f"{cumulative_us / 1000:9.1f}  {'  ' * depth}{name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Per-role model routing: runs the pipeline with every role on one model
+("single") and with the per-role profiles from core.llm ("routed"), each role
+backed by a local stand-in whose latency follows its model's speed, and
+reports calls, latency, tokens and estimated cost per role.
+
+Speeds in MODEL_SPEED are rough assumptions for a like-for-like comparison,
+not measurements; costs come from core.metrics.MODEL_PRICES. Profiles are
+resolved like the app does, so LLM_<ROLE>_MODEL etc. apply here too.
+
+    python -m benchmarks.bench_model_roles --runs 3 --mode hybrid
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict
+
+WORKDIR = tempfile.mkdtemp(prefix="bench_model_roles_")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("SEARCH_CACHE", "off")
+os.environ.setdefault("LLM_CACHE", "off")
+
+from benchmarks.bench_async_load import inputs_for  # noqa: E402
+from benchmarks.fakes import FakeChatModel, FakeSearch, install_fakes  # noqa: E402
+from core.llm import PROFILES, resolve_profile, set_llm  # noqa: E402
+from core.metrics import cost_usd  # noqa: E402
+from langchain_core.runnables import RunnableLambda  # noqa: E402
+from workflow.graph import create_app  # noqa: E402
+
+# model -> (seconds to first token, output tokens per second)
+MODEL_SPEED = {
+    "gemini-2.5-flash": (0.45, 200.0),
+    "gemini-2.5-flash-lite": (0.25, 400.0),
+    "gemini-2.5-pro": (1.20, 120.0),
+}
+DEFAULT_SPEED = (0.60, 150.0)
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class RoleStandIn(FakeChatModel):
+    """
+    FakeChatModel for one role on one model: sleeps for the model's simulated
+    latency (scaled by `time_scale`) and tallies tokens from the text sizes.
+    """
+
+    role: str = "worker"
+    model: str = "gemini-2.5-flash"
+    time_scale: float = 0.05
+    stats: Dict[str, float] = {}
+
+    def model_post_init(self, __context: Any) -> None:
+        self.stats = {"calls": 0, "latency_s": 0.0, "input_tokens": 0, "output_tokens": 0}
+        self._lock = threading.Lock()
+
+    def _simulate(self, messages: Any, output: str) -> float:
+        first_token_s, tokens_per_s = MODEL_SPEED.get(self.model, DEFAULT_SPEED)
+        out_tokens = _tokens(output)
+        latency = first_token_s + out_tokens / tokens_per_s
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["latency_s"] += latency
+            self.stats["input_tokens"] += _tokens(str(messages))
+            self.stats["output_tokens"] += out_tokens
+        return latency * self.time_scale
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self._simulate(messages, self._section()))
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self._simulate(messages, self._section()))
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        def invoke(messages):
+            result = self._structured(schema, messages)
+            time.sleep(self._simulate(messages, result.model_dump_json()))
+            return result
+
+        async def ainvoke(messages):
+            result = self._structured(schema, messages)
+            await asyncio.sleep(self._simulate(messages, result.model_dump_json()))
+            return result
+
+        return RunnableLambda(invoke, afunc=ainvoke)
+
+
+def run_config(args, models: Dict[str, str]) -> Dict[str, dict]:
+    fakes = {
+        role: RoleStandIn(
+            role=role,
+            model=model,
+            time_scale=args.time_scale,
+            latency=0.0,
+            mode=args.mode,
+            n_tasks=args.tasks,
+            section_words=args.section_words,
+        )
+        for role, model in models.items()
+    }
+    install_fakes(fakes["worker"], FakeSearch(latency=0.0))
+    for role, fake in fakes.items():
+        set_llm(fake, role)
+    try:
+        app = create_app(durable=False)
+        t0 = time.perf_counter()
+        for i in range(args.runs):
+            app.invoke(inputs_for(i))
+        wall = (time.perf_counter() - t0) / args.time_scale / args.runs
+    finally:
+        set_llm(None)
+
+    rows = {}
+    for role, fake in fakes.items():
+        s = fake.stats
+        calls = s["calls"] or 1
+        rows[role] = {
+            "model": fake.model,
+            "calls_per_run": round(s["calls"] / args.runs, 1),
+            "mean_latency_s": round(s["latency_s"] / calls, 3),
+            "input_tokens_per_run": round(s["input_tokens"] / args.runs),
+            "output_tokens_per_run": round(s["output_tokens"] / args.runs),
+            "cost_usd_per_run": round(cost_usd(s["input_tokens"], s["output_tokens"], fake.model) / args.runs, 6),
+        }
+    rows["total"] = {
+        "wall_s_per_run": round(wall, 2),
+        "cost_usd_per_run": round(sum(r["cost_usd_per_run"] for r in rows.values()), 6),
+    }
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mode", default="hybrid", choices=["closed_book", "hybrid", "open_book"])
+    ap.add_argument("--tasks", type=int, default=6)
+    ap.add_argument("--section-words", type=int, default=300)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--single-model", default="gemini-2.5-flash", help="model for every role in the baseline")
+    ap.add_argument("--time-scale", type=float, default=0.05, help="fraction of simulated latency actually slept")
+    ap.add_argument("--json", default=None, help="write results here")
+    args = ap.parse_args()
+
+    os.chdir(WORKDIR)  # reducer writes <title>.md into CWD
+
+    configs = {
+        "single": {role: args.single_model for role in PROFILES},
+        "routed": {role: resolve_profile(role).model for role in PROFILES},
+    }
+    results = {name: run_config(args, models) for name, models in configs.items()}
+
+    print(f"{'config':>7} {'role':>12} {'model':>22} | {'calls':>5} {'lat s':>6} {'in tok':>7} {'out tok':>7} {'USD/run':>9}")
+    for name, rows in results.items():
+        for role in PROFILES:
+            r = rows[role]
+            print(
+                f"{name:>7} {role:>12} {r['model']:>22} | {r['calls_per_run']:>5} {r['mean_latency_s']:>6} "
+                f"{r['input_tokens_per_run']:>7} {r['output_tokens_per_run']:>7} {r['cost_usd_per_run']:>9.5f}"
+            )
+        total = rows["total"]
+        print(f"{name:>7} {'total':>12} {'':>22} | simulated wall {total['wall_s_per_run']} s/run, {total['cost_usd_per_run']:.5f} USD/run")
+
+    single, routed = results["single"]["total"], results["routed"]["total"]
+    if single["cost_usd_per_run"]:
+        print(
+            f"\nrouted vs single: cost {(routed['cost_usd_per_run'] / single['cost_usd_per_run'] - 1) * 100:+.1f}%, "
+            f"wall {(routed['wall_s_per_run'] / single['wall_s_per_run'] - 1) * 100:+.1f}%"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+End-to-end latency of hybrid topics: sequential, with speculative planning
+(SPECULATIVE_PLANNING: the plan is drafted while research runs and
+reconcile patches the research-dependent tasks afterwards), and with early
+dispatch on top (EARLY_DISPATCH: sections needing neither research nor
+citations are written during that same step). Uses the fake LLM / search
+with per-call latencies, so the difference is the overlap; the critical
+path of the last run shows which node bounds each step.
+
+Early dispatch pays off when research is slower than planning plus one
+section (try --search-latency 1.5); otherwise those sections lengthen the
+planning step instead of hiding behind research.
+
+    python -m benchmarks.bench_overlap --runs 5 --plan-latency 0.6
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix="bench_overlap_")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("SEARCH_CACHE", "off")
+os.environ.setdefault("LLM_CACHE", "off")
+
+import node.Orchestrator  # noqa: E402
+from core import metrics  # noqa: E402
+from benchmarks.bench_async_load import inputs_for  # noqa: E402
+from benchmarks.fakes import FakeChatModel, FakeSearch, install_fakes  # noqa: E402
+from workflow.graph import create_app  # noqa: E402
+
+
+CONFIGS = {
+    "sequential": ("off", "off"),
+    "speculative": ("on", "off"),
+    "early": ("on", "on"),
+}
+
+
+def run(args, config: str) -> dict:
+    node.Orchestrator.SPECULATIVE_PLANNING, node.Orchestrator.EARLY_DISPATCH = CONFIGS[config]
+    llm = FakeChatModel(
+        latency=args.llm_latency,
+        schema_latency={"Plan": args.plan_latency, "PlanPatch": args.patch_latency},
+        mode="hybrid",
+        n_tasks=args.tasks,
+    )
+    install_fakes(llm, FakeSearch(latency=args.search_latency))
+    app = create_app(durable=False)
+
+    latencies = []
+    for i in range(args.runs):
+        with metrics.collect(f"{config}-{i}") as collected:
+            t0 = time.perf_counter()
+            app.invoke(inputs_for(i))
+            latencies.append(time.perf_counter() - t0)
+    path = collected.critical_path()
+    return {
+        "p50_s": round(statistics.median(latencies), 3),
+        "min_s": round(min(latencies), 3),
+        "llm_calls_per_run": round(llm.calls / args.runs, 1),
+        "critical_path": " > ".join(
+            f"{p['node']}{'' if p['task_id'] is None else '#' + str(p['task_id'])} {p['s']:.2f}"
+            for p in path["steps"]
+        ),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--tasks", type=int, default=6)
+    ap.add_argument("--llm-latency", type=float, default=0.2, help="routing / extraction / section calls")
+    ap.add_argument("--plan-latency", type=float, default=0.6, help="full plan call")
+    ap.add_argument("--patch-latency", type=float, default=0.2, help="reconcile call")
+    ap.add_argument("--search-latency", type=float, default=0.3)
+    args = ap.parse_args()
+
+    os.chdir(WORKDIR)  # reducer writes <title>.md into CWD
+
+    print(f"{'config':>11} | {'p50 s':>6} {'min s':>6} {'calls':>5} | critical path (s)")
+    results = {}
+    for config in CONFIGS:
+        row = results[config] = run(args, config)
+        print(f"{config:>11} | {row['p50_s']:>6} {row['min_s']:>6} {row['llm_calls_per_run']:>5} | {row['critical_path']}")
+    base = results["sequential"]["p50_s"]
+    for config in ("speculative", "early"):
+        print(f"{config} vs sequential p50: {(results[config]['p50_s'] / base - 1) * 100:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
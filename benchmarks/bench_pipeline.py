@@ -0,0 +1,155 @@
+"""
+End-to-end pipeline overhead: create_app() over a matrix of topic modes,
+task counts and evidence sizes against the deterministic fake LLM and fake
+search, reporting throughput, p50/p95 latency and peak memory per cell.
+
+With the default zero latencies the numbers are the pipeline's own cost
+(pydantic validation, prompt assembly, evidence routing, state merging,
+checkpoint writes, file I/O). Save a run with --json and pass it to
+--compare on a later commit to see per-cell deltas.
+
+    python -m benchmarks.bench_pipeline --json bench.json
+    python -m benchmarks.bench_pipeline --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+WORKDIR = tempfile.mkdtemp(prefix="bench_pipeline_")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("SEARCH_CACHE", "off")
+os.environ.setdefault("LLM_CACHE", "off")
+os.environ.setdefault("CHECKPOINT_PATH", os.path.join(WORKDIR, "checkpoints.sqlite"))
+
+from benchmarks.bench_async_load import inputs_for  # noqa: E402
+from benchmarks.fakes import FakeChatModel, FakeSearch, install_fakes  # noqa: E402
+from workflow.graph import create_app  # noqa: E402
+
+
+def percentile(values, q):
+    s = sorted(values)
+    k = (len(s) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run_cell(args, mode: str, n_tasks: int, n_evidence: int, durable: bool) -> dict:
+    llm = FakeChatModel(
+        latency=args.llm_latency,
+        mode=mode,
+        n_tasks=n_tasks,
+        n_evidence=n_evidence,
+        section_words=args.section_words,
+    )
+    install_fakes(llm, FakeSearch(latency=args.search_latency, snippet_words=args.snippet_words))
+    app = create_app(durable=durable)
+
+    def once(i: int) -> float:
+        config = {"configurable": {"thread_id": f"{mode}-{n_tasks}-{n_evidence}-{i}"}}
+        t0 = time.perf_counter()
+        app.invoke(inputs_for(i), config=config)
+        return time.perf_counter() - t0
+
+    for i in range(args.warmup):
+        once(-1 - i)
+    latencies = [once(i) for i in range(args.runs)]
+
+    # Peak memory from a separate run: tracemalloc would skew the timings
+    tracemalloc.start()
+    once(args.runs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    return {
+        "mode": mode,
+        "tasks": n_tasks,
+        "evidence": n_evidence,
+        "runs": args.runs,
+        "runs_per_s": round(args.runs / total, 2),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "peak_mem_kb": round(peak / 1024, 1),
+        "llm_calls_per_run": round(llm.calls / (args.runs + args.warmup + 1), 1),
+    }
+
+
+def cell_key(row: dict) -> tuple:
+    return (row["mode"], row["tasks"], row["evidence"])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--modes", nargs="+", default=["closed_book", "hybrid", "open_book"])
+    ap.add_argument("--tasks", type=int, nargs="+", default=[5, 7, 9])
+    ap.add_argument("--evidence", type=int, nargs="+", default=[8, 32])
+    ap.add_argument("--runs", type=int, default=10, help="timed runs per cell")
+    ap.add_argument("--warmup", type=int, default=1)
+    ap.add_argument("--llm-latency", type=float, default=0.0)
+    ap.add_argument("--search-latency", type=float, default=0.0)
+    ap.add_argument("--section-words", type=int, default=250, help="fake section size (output tokens)")
+    ap.add_argument("--snippet-words", type=int, default=40, help="extra words per search snippet (input tokens)")
+    ap.add_argument("--no-durable", action="store_true", help="compile without the checkpointer")
+    ap.add_argument("--json", default=None, help="write results here")
+    ap.add_argument("--compare", default=None, help="previous --json output to diff against")
+    args = ap.parse_args()
+
+    os.chdir(WORKDIR)  # reducer writes <title>.md into CWD
+
+    rows = []
+    print(f"{'mode':>11} {'tasks':>5} {'evid':>4} | {'runs/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'peak KB':>9} {'calls':>5}")
+    for mode in args.modes:
+        for n_tasks in args.tasks:
+            for n_evidence in args.evidence:
+                row = run_cell(args, mode, n_tasks, n_evidence, durable=not args.no_durable)
+                rows.append(row)
+                print(
+                    f"{mode:>11} {n_tasks:>5} {n_evidence:>4} | {row['runs_per_s']:>7} {row['p50_ms']:>8} "
+                    f"{row['p95_ms']:>8} {row['peak_mem_kb']:>9} {row['llm_calls_per_run']:>5}"
+                )
+
+    result = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+        "cells": rows,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            base = json.load(f)
+        if base.get("params") != result["params"]:
+            print("warning: baseline was run with different parameters")
+        old = {cell_key(r): r for r in base["cells"]}
+        print(f"\nvs {base.get('commit', '?')}: p50 / peak memory change per cell")
+        for row in rows:
+            prev = old.get(cell_key(row))
+            if prev is None:
+                continue
+            d_p50 = (row["p50_ms"] / prev["p50_ms"] - 1) * 100 if prev["p50_ms"] else 0.0
+            d_mem = (row["peak_mem_kb"] / prev["peak_mem_kb"] - 1) * 100 if prev["peak_mem_kb"] else 0.0
+            print(f"{row['mode']:>11} {row['tasks']:>5} {row['evidence']:>4} | p50 {d_p50:+6.1f}%  mem {d_mem:+6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Sequential vs. concurrent search fan-out in the research stage.
+
+    python -m benchmarks.bench_research --queries 10 --latency 0.3
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from benchmarks.fakes import FakeSearch, make_queries  # noqa: E402
+from node.Research import _search_many  # noqa: E402
+
+
+def _sequential(queries, search, max_results):
+    out = []
+    for q in queries:
+        try:
+            out.extend(search(q, max_results=max_results))
+        except Exception:
+            pass
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queries", type=int, default=10)
+    ap.add_argument("--max-results", type=int, default=6)
+    ap.add_argument("--latency", type=float, default=0.3)
+    ap.add_argument("--jitter", type=float, default=0.1)
+    ap.add_argument("--concurrency", type=int, default=5)
+    ap.add_argument("--timeout", type=float, default=2.0)
+    ap.add_argument("--slow-latency", type=float, default=3.0)
+    args = ap.parse_args()
+
+    queries = make_queries(args.queries)
+    # One pathological query that hangs and one that errors.
+    search = FakeSearch(
+        latency=args.latency,
+        jitter=args.jitter,
+        slow=queries[:1],
+        slow_latency=args.slow_latency,
+        fail=queries[1:2],
+    )
+
+    t0 = time.perf_counter()
+    seq = _sequential(queries, search, args.max_results)
+    t_seq = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    par = _search_many(
+        queries,
+        max_results=args.max_results,
+        search_fn=search,
+        max_workers=args.concurrency,
+        timeout=args.timeout,
+    )
+    t_par = time.perf_counter() - t0
+
+    ordered = [r["title"] for r in par] == [r["title"] for r in seq if not r["title"].startswith(queries[0] + " ")]
+    print(f"queries={len(queries)} latency={args.latency}s concurrency={args.concurrency} timeout={args.timeout}s")
+    print(f"sequential : {t_seq:6.2f}s  results={len(seq)}")
+    print(f"concurrent : {t_par:6.2f}s  results={len(par)}  (slow query dropped, order preserved={ordered})")
+    print(f"speedup    : {t_seq / t_par:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Cost of recovering from failed workers: a run with failures injected into
+chosen sections, then a resume of the same checkpoint thread, compared with
+rerunning the whole graph from scratch. Uses the local fake LLM and search.
+
+    python -m benchmarks.bench_resume --fail 2 5 --tasks 9
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("SEARCH_CACHE", "off")
+os.environ.setdefault("LLM_CACHE", "off")
+os.environ["CHECKPOINT_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_resume_"), "checkpoints.sqlite")
+
+from benchmarks.bench_async_load import inputs_for  # noqa: E402
+from benchmarks.fakes import FakeChatModel, FakeSearch, install_fakes  # noqa: E402
+from workflow.graph import create_app  # noqa: E402
+
+
+def run(app, llm: FakeChatModel, inputs, thread_id: str):
+    calls0, t0 = llm.calls, time.perf_counter()
+    config = {"configurable": {"thread_id": thread_id}}
+    try:
+        out = app.invoke(inputs, config=config)
+    except RuntimeError as exc:
+        out = exc
+    return out, llm.calls - calls0, time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fail", type=int, nargs="+", default=[3], help="task ids whose worker fails once")
+    ap.add_argument("--tasks", type=int, default=9)
+    ap.add_argument("--llm-latency", type=float, default=0.2)
+    ap.add_argument("--search-latency", type=float, default=0.2)
+    args = ap.parse_args()
+
+    llm = FakeChatModel(latency=args.llm_latency, n_tasks=args.tasks)
+    install_fakes(llm, FakeSearch(latency=args.search_latency))
+    os.chdir(os.path.dirname(os.environ["CHECKPOINT_PATH"]))  # reducer writes <title>.md into CWD
+    app = create_app()
+
+    _, full_calls, full_s = run(app, llm, inputs_for(0), "baseline")
+
+    # Inject the failures, let them take the run down, then resume that thread
+    llm.fail_tasks = list(args.fail)
+    out, failed_calls, failed_s = run(app, llm, inputs_for(1), "flaky")
+    assert isinstance(out, RuntimeError), "injected failure did not fail the run"
+    while True:
+        out, calls, secs = run(app, llm, None, "flaky")
+        if not isinstance(out, RuntimeError):
+            break
+        failed_calls, failed_s = failed_calls + calls, failed_s + secs
+    sections = len(out["sections"])
+
+    print(f"tasks={args.tasks} failing={args.fail} llm={args.llm_latency}s search={args.search_latency}s")
+    print(f"{'':>16} {'llm calls':>9} {'seconds':>8}")
+    print(f"{'full run':>16} {full_calls:>9} {full_s:8.2f}")
+    print(f"{'failed attempts':>16} {failed_calls:>9} {failed_s:8.2f}")
+    print(f"{'resume':>16} {calls:>9} {secs:8.2f}   ({sections}/{args.tasks} sections in final state)")
+    print(f"resume saves {full_calls - calls} of {full_calls} LLM calls vs. rerunning from scratch")
+
+
+if __name__ == "__main__":
+    main()
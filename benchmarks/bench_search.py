@@ -0,0 +1,140 @@
+"""
+Search latency over a synthetic corpus of saved blogs plus evidence items
+(100k documents by default): full-text only (FTS5, bm25) and hybrid, where
+an embedding nearest-neighbour list is fused in with RRF, plus one page of
+the Past Blogs search (BlogIndex.page) against ranking and counting every
+match. Embeddings come
+from langchain's DeterministicFakeEmbedding, so only the vector math and
+the SQLite lookups are measured, not an embedding model.
+
+    python -m benchmarks.bench_search --blogs 20000 --evidence 80000 --queries 200
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix="bench_search_")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ["BLOG_INDEX_PATH"] = os.path.join(WORKDIR, "blog_index.sqlite")
+os.environ["EVIDENCE_STORE_PATH"] = os.path.join(WORKDIR, "evidence.sqlite")
+os.environ["SEARCH_VECTORS_PATH"] = os.path.join(WORKDIR, "vectors.sqlite")
+
+from langchain_core.embeddings import DeterministicFakeEmbedding  # noqa: E402
+
+from core import search  # noqa: E402
+from core.blog_index import COLUMNS, fts_query, get_blog_index  # noqa: E402
+from core.evidence_store import get_evidence_store  # noqa: E402
+
+WORDS = (
+    "agents langgraph retrieval vector database pgvector hnsw latency throughput gpu inference "
+    "batching pricing tokens evaluation benchmark regression guardrails prompt injection privacy "
+    "fine tuning distillation quantization streaming cache embeddings rerank search kubernetes "
+    "serverless observability tracing cost release model open source license compliance"
+).split()
+
+
+# Zipf-distributed vocabulary, so common terms match many documents and
+# rare ones few, roughly like real text
+_letters = random.Random(1)
+VOCAB = WORDS + ["".join(_letters.choices(string.ascii_lowercase, k=7)) for _ in range(20000)]
+CUM_WEIGHTS = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(VOCAB))))
+
+
+def text(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choices(VOCAB, cum_weights=CUM_WEIGHTS, k=n))
+
+
+def build(args, rng: random.Random) -> float:
+    t0 = time.perf_counter()
+    blogs = get_blog_index()
+    for i in range(args.blogs):
+        title = f"{text(rng, 4).title()} {i}"
+        body = f"# {title}\n\n" + "\n\n".join(text(rng, 60) for _ in range(5))
+        blogs.add(os.path.join(WORKDIR, "blogs", f"blog_{i}.md"), body, title=title, topic=text(rng, 5), mode="hybrid")
+
+    store = get_evidence_store()
+    batch = []
+    for i in range(args.evidence):
+        batch.append({
+            "title": text(rng, 8),
+            "url": f"https://news{i % 97}.example.com/{i}",
+            "snippet": text(rng, 30),
+            "published_at": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}",
+        })
+        if len(batch) == 1000:
+            store.add_many(batch)
+            batch = []
+    store.add_many(batch)
+    return time.perf_counter() - t0
+
+
+def page_full_rank(blogs, query: str, offset: int = 0, limit: int = 20):
+    """
+    BlogIndex.page before the rank window: bm25 over every match plus a full
+    COUNT(*).
+    """
+    conn = blogs._conn()
+    match = fts_query(query)
+    total = conn.execute("SELECT COUNT(*) FROM blogs_fts WHERE blogs_fts MATCH ?", (match,)).fetchone()[0]
+    cols = ", ".join(f"b.{c}" for c in COLUMNS)
+    rows = conn.execute(
+        f"SELECT {cols} FROM blogs_fts JOIN blogs b ON b.id = blogs_fts.rowid "
+        "WHERE blogs_fts MATCH ? ORDER BY bm25(blogs_fts, 10.0, 4.0, 1.0) LIMIT ? OFFSET ?",
+        (match, limit, offset),
+    ).fetchall()
+    return [dict(zip(COLUMNS, r)) for r in rows], total
+
+
+def timed(queries, fn) -> dict:
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        lat.append((time.perf_counter() - t0) * 1000)
+    lat.sort()
+    return {
+        "p50_ms": round(statistics.median(lat), 2),
+        "p95_ms": round(lat[int(len(lat) * 0.95) - 1], 2),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--blogs", type=int, default=20000)
+    ap.add_argument("--evidence", type=int, default=80000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--dim", type=int, default=768)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    build_s = build(args, rng)
+    print(f"indexed {args.blogs} blogs + {args.evidence} evidence in {build_s:.1f}s")
+
+    queries = [text(rng, rng.randint(1, 3)) for _ in range(args.queries)]
+    results = {"fts": timed(queries, lambda q: search.search(q, limit=20, semantic=False))}
+    blogs = get_blog_index()
+    results["page_all"] = timed(queries, lambda q: page_full_rank(blogs, q))
+    results["page"] = timed(queries, lambda q: blogs.page(q, limit=20))
+
+    search.set_embedder(DeterministicFakeEmbedding(size=args.dim), model="fake")
+    t0 = time.perf_counter()
+    counts = search.backfill(WORKDIR, batch_size=1000)
+    print(f"embedded {counts['blogs_embedded'] + counts['evidence_embedded']} docs in {time.perf_counter() - t0:.1f}s")
+
+    vectors = search.get_vector_index()
+    vectors.query("warm up")  # first query loads the matrix
+    results["vector"] = timed(queries, lambda q: vectors.query(q, limit=20))
+    results["hybrid"] = timed(queries, lambda q: search.search(q, limit=20, semantic=True))
+
+    print(f"{'path':>8} | {'p50 ms':>7} {'p95 ms':>7}")
+    for name, row in results.items():
+        print(f"{name:>8} | {row['p50_ms']:>7} {row['p95_ms']:>7}")
+
+
+if __name__ == "__main__":
+    main()
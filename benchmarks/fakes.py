@@ -0,0 +1,223 @@
+"""
+Local stand-ins for the network backends, used by the benchmark scripts.
+"""
+import ast
+import asyncio
+import random
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+from schemas.EvidenceSchema import EvidenceItem, EvidencePack
+from schemas.PlanSchema import Plan, PlanPatch, Task, TaskPatch
+from schemas.RouterSchema import RouterDecision
+
+
+class FakeSearch:
+    """
+    Deterministic replacement for node.Research._tavily_search.
+
+    Every call sleeps `latency` seconds (plus up to `jitter`) before returning
+    `max_results` synthetic results (snippets padded by `snippet_words` words).
+    Queries listed in `slow` sleep `slow_latency` instead, and queries listed in
+    `fail` raise.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        jitter: float = 0.0,
+        slow: Iterable[str] = (),
+        slow_latency: float = 5.0,
+        fail: Iterable[str] = (),
+        seed: int = 0,
+        snippet_words: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.slow = set(slow)
+        self.slow_latency = slow_latency
+        self.fail = set(fail)
+        self.snippet_words = snippet_words
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    def _delay(self, query: str) -> float:
+        self.calls += 1
+        delay = self.slow_latency if query in self.slow else self.latency
+        if self.jitter:
+            delay += self._rng.uniform(0, self.jitter)
+        return delay
+
+    def _results(self, query: str, max_results: int) -> List[dict]:
+        if query in self.fail:
+            raise RuntimeError(f"fake search failure for {query!r}")
+        slug = query.lower().replace(" ", "-")
+        padding = " ".join(f"detail{j % 53}" for j in range(self.snippet_words))
+        return [
+            {
+                "title": f"{query} result {i}",
+                "url": f"https://example.com/{slug}/{i}",
+                "snippet": f"Synthetic snippet {i} about {query}, covering release {i} and its trade-offs. {padding}".strip(),
+            }
+            for i in range(max_results)
+        ]
+
+    def __call__(self, query: str, max_results: int = 5) -> List[dict]:
+        time.sleep(self._delay(query))
+        return self._results(query, max_results)
+
+    async def asearch(self, query: str, max_results: int = 5) -> List[dict]:
+        await asyncio.sleep(self._delay(query))
+        return self._results(query, max_results)
+
+
+def make_queries(n: int, prefix: Optional[str] = "query") -> List[str]:
+    return [f"{prefix} {i}" for i in range(n)]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic chat model: sleeps `latency` seconds per call, answers plain
+    calls with a `section_words`-word Markdown section and structured-output
+    calls with a synthetic RouterDecision / EvidencePack / Plan / PlanPatch.
+    """
+
+    latency: float = 0.05
+    mode: str = "hybrid"
+    n_queries: int = 5
+    n_tasks: int = 6
+    n_evidence: int = 8
+    section_words: int = 250
+    calls: int = 0
+    # Task ids whose section call raises once (failure injection for resume tests)
+    fail_tasks: List[int] = []
+    # Per-schema latency for structured calls, e.g. {"Plan": 2.0}; others use `latency`
+    schema_latency: Dict[str, float] = {}
+    # EvidencePack keeps the URLs of the raw results in the prompt, like a
+    # real extractor, instead of inventing `n_evidence` new ones
+    echo_results: bool = False
+    # Every Nth planned task needs research and citations (0: none does)
+    research_every: int = 2
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _section(self) -> str:
+        words = " ".join(f"word{i % 97}" for i in range(self.section_words))
+        return f"## Section\n\n{words}\n"
+
+    def _maybe_fail(self, messages) -> None:
+        text = " ".join(str(m.content) for m in messages)
+        for task_id in list(self.fail_tasks):
+            if f"Section title: Section {task_id}\n" in text:
+                self.fail_tasks.remove(task_id)
+                raise RuntimeError(f"injected failure in section {task_id}")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        time.sleep(self.latency)
+        self._maybe_fail(messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._section()))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        self._maybe_fail(messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._section()))])
+
+    def _structured(self, schema: Any, messages: Any) -> Any:
+        if schema is RouterDecision:
+            research = self.mode != "closed_book"
+            return RouterDecision(
+                needs_research=research,
+                mode=self.mode,
+                reason="fake",
+                queries=[f"fake query {i}" for i in range(self.n_queries)] if research else [],
+            )
+        if schema is EvidencePack and self.echo_results:
+            raw = ast.literal_eval(str(messages[-1].content).split("Raw results:\n", 1)[1])
+            return EvidencePack(
+                evidence=[
+                    EvidenceItem(title=r["title"], url=r["url"], published_at="2026-01-20", snippet=r["snippet"][:80])
+                    for r in raw
+                ]
+            )
+        if schema is EvidencePack:
+            # crc32, not hash(): stable across processes regardless of PYTHONHASHSEED
+            seed = zlib.crc32(str(messages).encode("utf-8")) % 10_000
+            return EvidencePack(
+                evidence=[
+                    EvidenceItem(
+                        title=f"Source {seed}-{i}",
+                        url=f"https://example.com/{seed}/{i}",
+                        published_at="2026-01-20",
+                        snippet="Synthetic evidence snippet.",
+                    )
+                    for i in range(self.n_evidence)
+                ]
+            )
+        if schema is Plan:
+            return Plan(
+                blog_title="Fake benchmark blog",
+                audience="developers",
+                tone="practical",
+                tasks=[
+                    Task(
+                        id=i,
+                        title=f"Section {i}",
+                        goal="Explain the thing.",
+                        bullets=["first point", "second point", "third point"],
+                        target_words=self.section_words,
+                        requires_research=self._needs_research(i),
+                        requires_citations=self._needs_research(i),
+                    )
+                    for i in range(1, self.n_tasks + 1)
+                ],
+            )
+        if schema is PlanPatch:
+            # Same ids as the research-dependent tasks of the fake Plan
+            return PlanPatch(
+                tasks=[
+                    TaskPatch(id=i, goal="Explain the thing with fresh evidence.", bullets=["fresh point", "second point", "third point"])
+                    for i in range(1, self.n_tasks + 1)
+                    if self._needs_research(i)
+                ]
+            )
+        raise TypeError(f"FakeChatModel has no structured output for {schema!r}")
+
+    def _needs_research(self, task_id: int) -> bool:
+        return self.research_every > 0 and task_id % self.research_every == 0
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        latency = self.schema_latency.get(schema.__name__, self.latency)
+
+        def invoke(messages):
+            self.calls += 1
+            time.sleep(latency)
+            return self._structured(schema, messages)
+
+        async def ainvoke(messages):
+            self.calls += 1
+            await asyncio.sleep(latency)
+            return self._structured(schema, messages)
+
+        return RunnableLambda(invoke, afunc=ainvoke)
+
+
+def install_fakes(llm: BaseChatModel, search: FakeSearch) -> None:
+    """
+    Makes the fake the shared LLM (core.llm.set_llm) and points research at the fake search.
+    """
+    import node.Research
+    from core.llm import set_llm
+
+    set_llm(llm)
+    node.Research._tavily_search = search
+    node.Research._atavily_search = search.asearch
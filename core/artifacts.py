@@ -0,0 +1,185 @@
+from __future__ import annotations
+from typing import Callable, Dict, Mapping, Optional, Tuple, Union
+from dataclasses import dataclass
+import hashlib
+import os
+import tempfile
+import threading
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+
+ARTIFACTS_DIR = os.environ.get("ARTIFACTS_DIR", "downloads")
+
+# Fixed member timestamp, so the same files always zip to the same bytes
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+Data = Union[bytes, str]
+
+# mkstemp creates 0600 files; artifacts get the mode open() would give them.
+# Read once: os.umask() can only be queried by setting it, which races with threads.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+
+def content_hash(data: Data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def zip_bytes(files: Mapping[str, Data]) -> bytes:
+    """
+    Deflated zip of {member name: content}, byte-identical for identical input.
+    """
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        for name, data in files.items():
+            info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            z.writestr(info, data.encode("utf-8") if isinstance(data, str) else data)
+    return buf.getvalue()
+
+
+@dataclass(frozen=True)
+class Artifact:
+    path: Path
+    sha256: str
+    size: int
+    written: bool  # False when the file already had this content
+
+
+class ArtifactStore:
+    """
+    Files under `root` written only when their content changes.
+
+    put() hashes the new content and compares it with what is on disk: a
+    file whose size and mtime match the last put/read is known by hash
+    without reading it, anything else is read and hashed once. Changed
+    content goes to a temp file in the same directory and is renamed over
+    the target, so readers never see a half-written file.
+
+    derived() is for artifacts computed from others (zips, exports): it is
+    keyed by the hash of the source and only calls `build` when that source
+    has not been built into `name` yet.
+    """
+
+    def __init__(self, root: Union[str, Path] = ARTIFACTS_DIR):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        # path -> (size, mtime_ns, sha256) as of our last write or read
+        self._known: Dict[Path, Tuple[int, int, str]] = {}
+        # name -> source hash it was last built from
+        self._built: Dict[str, str] = {}
+        self.stats = {"written": 0, "unchanged": 0, "bytes_written": 0, "built": 0}
+
+    def path(self, name: str) -> Path:
+        return self.root / name
+
+    def _hash_on_disk(self, p: Path, size: int) -> Optional[str]:
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            return None
+        if st.st_size != size:
+            return None  # different size, different content
+        with self._lock:
+            known = self._known.get(p)
+        if known is not None and known[:2] == (st.st_size, st.st_mtime_ns):
+            return known[2]
+        sha = content_hash(p.read_bytes())
+        with self._lock:
+            self._known[p] = (st.st_size, st.st_mtime_ns, sha)
+        return sha
+
+    def put(self, name: str, data: Data, sha256: Optional[str] = None) -> Artifact:
+        """
+        Stores `data` as `name` unless the file already holds exactly that.
+        Pass `sha256` when the caller already knows the content hash.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        p = self.path(name)
+        sha = sha256 or content_hash(data)
+        if self._hash_on_disk(p, len(data)) == sha:
+            with self._lock:
+                self.stats["unchanged"] += 1
+            return Artifact(p, sha, len(data), written=False)
+
+        p.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=p.parent, prefix=f".{p.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp, FILE_MODE)
+            os.replace(tmp, p)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        st = p.stat()
+        with self._lock:
+            self._known[p] = (st.st_size, st.st_mtime_ns, sha)
+            self.stats["written"] += 1
+            self.stats["bytes_written"] += len(data)
+        return Artifact(p, sha, len(data), written=True)
+
+    def _derived(self, name: str, source: Data, build: Callable[[], Data]) -> Tuple[Artifact, Optional[bytes]]:
+        source_sha = content_hash(source)
+        p = self.path(name)
+        with self._lock:
+            built = self._built.get(name) == source_sha
+            known = self._known.get(p)
+        if built and known is not None:
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                st = None
+            if st is not None and known[:2] == (st.st_size, st.st_mtime_ns):
+                return Artifact(p, known[2], known[0], written=False), None
+
+        data = build()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        artifact = self.put(name, data)
+        with self._lock:
+            self._built[name] = source_sha
+            self.stats["built"] += 1
+        return artifact, data
+
+    def derived(self, name: str, source: Data, build: Callable[[], Data]) -> Artifact:
+        """
+        The artifact `name` built from `source`; `build` runs only when `name`
+        was not built from this exact source yet (or the file changed since).
+        """
+        return self._derived(name, source, build)[0]
+
+    def derived_bytes(self, name: str, source: Data, build: Callable[[], Data]) -> bytes:
+        """
+        Content of derived(): the bytes just built, else one read of the file.
+        """
+        artifact, data = self._derived(name, source, build)
+        return data if data is not None else artifact.path.read_bytes()
+
+    def read(self, name: str) -> bytes:
+        return self.path(name).read_bytes()
+
+
+_stores: Dict[str, ArtifactStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_artifact_store(root: Union[str, Path] = ARTIFACTS_DIR) -> ArtifactStore:
+    """
+    Returns the process-wide store for `root`, so its hash memo is shared.
+    """
+    key = str(Path(root).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ArtifactStore(root)
+    return store
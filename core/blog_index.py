@@ -0,0 +1,307 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from core.sqlite_util import ThreadLocalConnection, add_column
+
+
+BLOG_INDEX = os.environ.get("BLOG_INDEX", "on")  # on | off
+BLOG_INDEX_PATH = os.environ.get("BLOG_INDEX_PATH", ".cache/blog_index.sqlite")
+FTS_RANK_WINDOW = int(os.environ.get("FTS_RANK_WINDOW", "2000"))  # newest matches ranked per query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blogs (
+    id          INTEGER PRIMARY KEY,
+    path        TEXT NOT NULL UNIQUE,
+    slug        TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    topic       TEXT NOT NULL DEFAULT '',
+    mode        TEXT NOT NULL DEFAULT '',
+    as_of       TEXT NOT NULL DEFAULT '',
+    word_count  INTEGER NOT NULL,
+    body        TEXT NOT NULL,
+    mtime       REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    sha256      TEXT           -- of the indexed body, so unchanged blogs are not re-indexed
+);
+CREATE INDEX IF NOT EXISTS ix_blogs_updated ON blogs(updated_at DESC);
+CREATE VIRTUAL TABLE IF NOT EXISTS blogs_fts USING fts5(
+    title, topic, body,
+    content='blogs', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS blogs_ai AFTER INSERT ON blogs BEGIN
+    INSERT INTO blogs_fts(rowid, title, topic, body) VALUES (new.id, new.title, new.topic, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS blogs_ad AFTER DELETE ON blogs BEGIN
+    INSERT INTO blogs_fts(blogs_fts, rowid, title, topic, body) VALUES ('delete', old.id, old.title, old.topic, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS blogs_au AFTER UPDATE ON blogs BEGIN
+    INSERT INTO blogs_fts(blogs_fts, rowid, title, topic, body) VALUES ('delete', old.id, old.title, old.topic, old.body);
+    INSERT INTO blogs_fts(rowid, title, topic, body) VALUES (new.id, new.title, new.topic, new.body);
+END;
+"""
+
+# Metadata only: listing never touches the (large) body column
+COLUMNS = ("path", "slug", "title", "topic", "mode", "as_of", "word_count", "updated_at")
+
+
+def safe_slug(title: str) -> str:
+    s = title.strip().lower()
+    s = re.sub(r"[^a-z0-9 _-]+", "", s)
+    s = re.sub(r"\s+", "_", s).strip("_")
+    return s or "blog"
+
+
+def title_from_md(md: str, fallback: str) -> str:
+    for line in md.splitlines():
+        if line.startswith("# "):
+            return line[2:].strip() or fallback
+    return fallback
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    Turns free text into an FTS5 query: every word must match, as a prefix,
+    in any column. Quoting keeps FTS syntax characters in user input literal.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    return " ".join('"' + w.replace('"', '""') + '"*' for w in words)
+
+
+def fts_rank(
+    conn: sqlite3.Connection,
+    table: str,
+    match: str,
+    weights: str,
+    limit: int,
+    window: int = FTS_RANK_WINDOW,
+) -> List[Tuple[int, float]]:
+    """
+    (rowid, bm25) of the best `limit` matches in the FTS5 `table`. bm25 costs
+    time per matching row, so when a query matches more than `window` rows
+    (very common words) only the newest `window` of them are ranked.
+    """
+    floor = conn.execute(
+        f"SELECT rowid FROM {table} WHERE {table} MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+        (match, window - 1),
+    ).fetchone()
+    return conn.execute(
+        f"SELECT rowid, bm25({table}, {weights}) AS score FROM {table} "
+        f"WHERE {table} MATCH ? AND rowid >= ? ORDER BY score LIMIT ?",
+        (match, floor[0] if floor else 0, limit),
+    ).fetchall()
+
+
+def excerpt(text: str, query: str, words: int = 16) -> str:
+    """
+    The `words`-word window of `text` containing the most query words (prefix
+    matches, like fts_query), with matches wrapped in ** and … where it was
+    cut. Built for the returned hits only, instead of FTS5 snippet() for
+    every matching row before the LIMIT.
+    """
+    terms = tuple(w.casefold() for w in re.findall(r"\w+", query or ""))
+    tokens = list(re.finditer(r"\w+", text or ""))
+    if not tokens:
+        return ""
+    hit = [bool(terms) and t.group().casefold().startswith(terms) for t in tokens]
+    best, count = 0, sum(hit[:words])
+    running = count
+    for start in range(1, max(1, len(tokens) - words + 1)):
+        running += hit[start + words - 1] - hit[start - 1]
+        if running > count:
+            best, count = start, running
+    window = range(best, min(best + words, len(tokens)))
+    out, pos = [], tokens[best].start()
+    for i in window:
+        t = tokens[i]
+        out.append(text[pos:t.start()])
+        out.append(f"**{t.group()}**" if hit[i] else t.group())
+        pos = t.end()
+    prefix = "…" if best > 0 else ""
+    suffix = "…" if window[-1] < len(tokens) - 1 else ""
+    return prefix + " ".join("".join(out).split()) + suffix
+
+
+class BlogIndex:
+    """
+    SQLite index of saved blogs: metadata for listing plus an FTS5 index over
+    title, topic and body for search. The reducer adds every blog it writes;
+    `sync_directory` picks up Markdown files written before the index existed.
+
+    Connections come from core.sqlite_util.ThreadLocalConnection.
+    """
+
+    def __init__(self, path: str = BLOG_INDEX_PATH):
+        self.path = path
+        self._db = ThreadLocalConnection(path, SCHEMA)
+        add_column(self._conn(), "blogs", "sha256", "TEXT")
+
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    def content_hash(self, path: str) -> Optional[str]:
+        """
+        sha256 of the body indexed for `path` (None if it is not indexed).
+        """
+        row = self._conn().execute("SELECT sha256 FROM blogs WHERE path = ?", (str(Path(path).resolve()),)).fetchone()
+        return row[0] if row else None
+
+    def add(
+        self,
+        path: str,
+        markdown: str,
+        title: Optional[str] = None,
+        topic: str = "",
+        mode: str = "",
+        as_of: str = "",
+    ) -> None:
+        """
+        Adds or refreshes the entry for the blog saved at `path`.
+        """
+        p = Path(path).resolve()
+        title = title or title_from_md(markdown, p.stem)
+        now = time.time()
+        self._conn().execute(
+            "INSERT INTO blogs(path, slug, title, topic, mode, as_of, word_count, body, mtime, updated_at, sha256) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET slug = excluded.slug, title = excluded.title, "
+            "topic = CASE WHEN excluded.topic != '' THEN excluded.topic ELSE topic END, "
+            "mode = CASE WHEN excluded.mode != '' THEN excluded.mode ELSE mode END, "
+            "as_of = CASE WHEN excluded.as_of != '' THEN excluded.as_of ELSE as_of END, "
+            "word_count = excluded.word_count, body = excluded.body, mtime = excluded.mtime, updated_at = excluded.updated_at, "
+            "sha256 = excluded.sha256",
+            (
+                str(p),
+                safe_slug(title),
+                title,
+                topic or "",
+                mode or "",
+                as_of or "",
+                len(markdown.split()),
+                markdown,
+                p.stat().st_mtime if p.exists() else now,
+                now,
+                hashlib.sha256(markdown.encode("utf-8")).hexdigest(),
+            ),
+        )
+
+    def remove(self, path: str) -> None:
+        self._conn().execute("DELETE FROM blogs WHERE path = ?", (str(Path(path).resolve()),))
+
+    def page(self, query: str = "", offset: int = 0, limit: int = 20) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        One page of blogs (newest first, or best match first when `query` is
+        given) and the total number of matches. A query ranks only its newest
+        FTS_RANK_WINDOW matches (see fts_rank), and counts no further.
+        """
+        conn = self._conn()
+        match = fts_query(query)
+        if match is None:
+            total = conn.execute("SELECT COUNT(*) FROM blogs").fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM blogs ORDER BY updated_at DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+            return [dict(zip(COLUMNS, r)) for r in rows], total
+
+        total = conn.execute(
+            "SELECT COUNT(*) FROM (SELECT rowid FROM blogs_fts WHERE blogs_fts MATCH ? LIMIT ?)",
+            (match, FTS_RANK_WINDOW),
+        ).fetchone()[0]
+        if offset >= total:
+            return [], total
+        ranked = fts_rank(conn, "blogs_fts", match, "10.0, 4.0, 1.0", offset + limit, FTS_RANK_WINDOW)
+        ranked = [rowid for rowid, _ in ranked[offset:]]
+        marks = ", ".join("?" * len(ranked))
+        rows = {r[0]: r[1:] for r in conn.execute(f"SELECT id, {', '.join(COLUMNS)} FROM blogs WHERE id IN ({marks})", ranked)}
+        return [dict(zip(COLUMNS, rows[i])) for i in ranked if i in rows], total
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Best FTS matches for `query`, each with a short highlighted `match`
+        excerpt of the body.
+        """
+        match = fts_query(query)
+        if match is None:
+            return []
+        conn = self._conn()
+        ranked = [rowid for rowid, _ in fts_rank(conn, "blogs_fts", match, "10.0, 4.0, 1.0", limit)]
+        if not ranked:
+            return []
+        cols = ", ".join(COLUMNS)
+        marks = ", ".join("?" * len(ranked))
+        rows = {r[0]: r[1:] for r in conn.execute(f"SELECT id, {cols}, body FROM blogs WHERE id IN ({marks})", ranked)}
+        return [
+            {**dict(zip(COLUMNS, rows[i][:-1])), "match": excerpt(rows[i][-1], query)}
+            for i in ranked if i in rows
+        ]
+
+    def get_many(self, paths: List[str], with_body: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Rows for the given indexed paths, keyed by path (plus `body` if asked).
+        """
+        columns = COLUMNS + (("body",) if with_body else ())
+        cols = ", ".join(columns)
+        out: Dict[str, Dict[str, Any]] = {}
+        conn = self._conn()
+        # Stay well below SQLite's bound-parameter limit
+        for i in range(0, len(paths), 500):
+            chunk = paths[i:i + 500]
+            marks = ", ".join("?" * len(chunk))
+            for r in conn.execute(f"SELECT {cols} FROM blogs WHERE path IN ({marks})", chunk):
+                out[r[0]] = dict(zip(columns, r))
+        return out
+
+    def paths(self) -> List[str]:
+        return [r[0] for r in self._conn().execute("SELECT path FROM blogs ORDER BY id")]
+
+    def sync_directory(self, directory: str = ".") -> int:
+        """
+        Indexes *.md files in `directory` that are new or changed since they
+        were indexed, and drops entries whose file is gone from it. Only those
+        files are read. Returns the number of files (re)indexed.
+        """
+        base = Path(directory).resolve()
+        conn = self._conn()
+        known = dict(conn.execute("SELECT path, mtime FROM blogs WHERE path LIKE ?", (f"{base}{os.sep}%",)).fetchall())
+        changed = 0
+        seen = set()
+        for p in base.glob("*.md"):
+            if not p.is_file():
+                continue
+            key = str(p)
+            seen.add(key)
+            if known.get(key) == p.stat().st_mtime:
+                continue
+            self.add(key, p.read_text(encoding="utf-8", errors="replace"))
+            changed += 1
+        gone = [(k,) for k in known if k not in seen and Path(k).parent == base]
+        if gone:
+            conn.executemany("DELETE FROM blogs WHERE path = ?", gone)
+        return changed
+
+
+_index: Optional[BlogIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_blog_index() -> Optional[BlogIndex]:
+    """
+    Returns the process-wide blog index, or None when BLOG_INDEX=off.
+    """
+    global _index
+    if BLOG_INDEX.lower() in ("0", "off", "false", "no"):
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = BlogIndex()
+    return _index
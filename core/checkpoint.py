@@ -0,0 +1,307 @@
+from __future__ import annotations
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from core.sqlite_util import ThreadLocalConnection, add_column, transaction
+
+
+CHECKPOINTS = os.environ.get("CHECKPOINTS", "on")  # on | off
+CHECKPOINT_PATH = os.environ.get("CHECKPOINT_PATH", ".cache/checkpoints.sqlite")
+# Threads whose last checkpoint is older than this are deleted when the
+# checkpointer opens (0 keeps everything). Resume and section regeneration
+# only need recent runs.
+CHECKPOINT_RETENTION_DAYS = float(os.environ.get("CHECKPOINT_RETENTION_DAYS", "14"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id            TEXT NOT NULL,
+    checkpoint_ns        TEXT NOT NULL DEFAULT '',
+    checkpoint_id        TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type                 TEXT,
+    checkpoint           BLOB,
+    metadata_type        TEXT,
+    metadata             BLOB,
+    created_at           REAL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id     TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id       TEXT NOT NULL,
+    idx           INTEGER NOT NULL,
+    channel       TEXT NOT NULL,
+    type          TEXT,
+    value         BLOB,
+    task_path     TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+def new_thread_id() -> str:
+    return uuid.uuid4().hex
+
+
+def thread_config(thread_id: str) -> RunnableConfig:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+class SQLiteSaver(BaseCheckpointSaver[str]):
+    """
+    Durable LangGraph checkpointer in a local SQLite file.
+
+    Stores every superstep's checkpoint plus the writes of each finished task,
+    so re-invoking a failed thread with `None` input replays the completed
+    tasks from disk and re-executes only the rest of that superstep: the
+    `worker` Send that raised, plus any sibling still in flight (and thus
+    cancelled) when it did. Connections come from core.sqlite_util, so it is
+    safe across threads and Streamlit sessions.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH, *, serde=None, retention_days: float = CHECKPOINT_RETENTION_DAYS):
+        super().__init__(serde=serde or JsonPlusSerializer())
+        self.path = path
+        self._db = ThreadLocalConnection(path, SCHEMA)
+        # Files from before retention: their threads start a fresh retention window
+        if add_column(self._conn(), "checkpoints", "created_at", "REAL"):
+            self._conn().execute("UPDATE checkpoints SET created_at = ?", (time.time(),))
+        if retention_days > 0:
+            self.prune(retention_days)
+
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def _tuple(self, conn: sqlite3.Connection, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata = row
+        writes = conn.execute(
+            "SELECT task_id, idx, channel, type, value, task_path FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        # Same order live execution applies a superstep's writes in: task path, task id, idx
+        writes.sort(key=lambda w: (w[5], w[0], w[1]))
+
+        def config_for(cid: str) -> RunnableConfig:
+            return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": cid}}
+
+        return CheckpointTuple(
+            config=config_for(checkpoint_id),
+            checkpoint=self.serde.loads_typed((type_, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=config_for(parent_id) if parent_id else None,
+            pending_writes=[(task_id, channel, self.serde.loads_typed((t, v))) for task_id, _, channel, t, v, _ in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        conf = config["configurable"]
+        thread_id = conf["thread_id"]
+        checkpoint_ns = conf.get("checkpoint_ns", "")
+        conn = self._conn()
+        cols = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        if checkpoint_id := get_checkpoint_id(config):
+            row = conn.execute(
+                f"SELECT {cols} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchone()
+        else:
+            row = conn.execute(
+                f"SELECT {cols} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+        return self._tuple(conn, thread_id, checkpoint_ns, row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        where, params = [], []
+        if config:
+            conf = config["configurable"]
+            where.append("thread_id = ?")
+            params.append(conf["thread_id"])
+            if conf.get("checkpoint_ns") is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(conf["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_id)
+
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+            f"FROM checkpoints {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY checkpoint_id DESC",
+            params,
+        ).fetchall()
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            item = self._tuple(conn, thread_id, checkpoint_ns, tuple(row))
+            if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield item
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        conf = config["configurable"]
+        thread_id = conf["thread_id"]
+        checkpoint_ns = conf.get("checkpoint_ns", "")
+        type_, blob = self.serde.dumps_typed(checkpoint)
+        meta_type, meta = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        self._conn().execute(
+            "INSERT OR REPLACE INTO checkpoints"
+            "(thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (thread_id, checkpoint_ns, checkpoint["id"], conf.get("checkpoint_id"), type_, blob, meta_type, meta, time.time()),
+        )
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        conf = config["configurable"]
+        # Regular writes are immutable once saved; error/interrupt markers may be replaced
+        verb = "INSERT OR REPLACE" if all(c in WRITES_IDX_MAP for c, _ in writes) else "INSERT OR IGNORE"
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            rows.append((
+                conf["thread_id"],
+                conf.get("checkpoint_ns", ""),
+                conf["checkpoint_id"],
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                type_,
+                blob,
+                task_path,
+            ))
+        conn = self._conn()
+        with transaction(conn):
+            conn.executemany(
+                f"{verb} INTO writes(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def delete_thread(self, thread_id: str) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+        conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+
+    def prune(self, max_age_days: float) -> int:
+        """
+        Deletes every thread (checkpoints and writes) whose newest checkpoint
+        is older than `max_age_days`. Returns the number of threads removed.
+        """
+        cutoff = time.time() - max_age_days * 86400
+        conn = self._conn()
+        with transaction(conn):
+            stale = [
+                (r[0],)
+                for r in conn.execute(
+                    "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?", (cutoff,)
+                )
+            ]
+            conn.executemany("DELETE FROM checkpoints WHERE thread_id = ?", stale)
+            conn.executemany("DELETE FROM writes WHERE thread_id = ?", stale)
+        return len(stale)
+
+    def get_next_version(self, current: Optional[str], channel: None = None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # -----------------------------
+    # Async: same SQLite calls, off the event loop
+    # -----------------------------
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+_saver: Optional[SQLiteSaver] = None
+_saver_lock = threading.Lock()
+
+
+def get_checkpointer() -> Optional[SQLiteSaver]:
+    """
+    Returns the process-wide checkpointer, or None when CHECKPOINTS=off.
+    """
+    global _saver
+    if CHECKPOINTS.lower() in ("0", "off", "false", "no"):
+        return None
+    if _saver is None:
+        with _saver_lock:
+            if _saver is None:
+                _saver = SQLiteSaver()
+    return _saver
@@ -0,0 +1,22 @@
+import threading
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """
+    Loads .env into os.environ once per process (variables already set win).
+
+    Entry points (main.py, workflow.batch) call this before importing the
+    core modules, which read their settings from the environment at import.
+    """
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            _loaded = True
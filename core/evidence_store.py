@@ -0,0 +1,213 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import os
+import sqlite3
+import threading
+import time
+
+from core.blog_index import excerpt, fts_query, fts_rank
+from core.sqlite_util import ThreadLocalConnection, add_column, transaction
+
+
+EVIDENCE_STORE = os.environ.get("EVIDENCE_STORE", "on")  # on | off
+EVIDENCE_STORE_PATH = os.environ.get("EVIDENCE_STORE_PATH", ".cache/evidence.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evidence (
+    id           INTEGER PRIMARY KEY,
+    url          TEXT NOT NULL UNIQUE,  -- canonical_url(), the dedup key
+    link         TEXT,                  -- the URL as first seen, for citations
+    title        TEXT NOT NULL,
+    snippet      TEXT NOT NULL DEFAULT '',
+    published_at TEXT,
+    source       TEXT,
+    first_seen   REAL NOT NULL,
+    last_seen    REAL NOT NULL
+);
+-- Recency filter: this run's URLs AND published_at >= cutoff, answered from the index alone
+DROP INDEX IF EXISTS ix_evidence_published;
+CREATE INDEX IF NOT EXISTS ix_evidence_url_published ON evidence(url, published_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS evidence_fts USING fts5(
+    title, snippet,
+    content='evidence', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS evidence_ai AFTER INSERT ON evidence BEGIN
+    INSERT INTO evidence_fts(rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS evidence_ad AFTER DELETE ON evidence BEGIN
+    INSERT INTO evidence_fts(evidence_fts, rowid, title, snippet) VALUES ('delete', old.id, old.title, old.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS evidence_au AFTER UPDATE OF title, snippet ON evidence BEGIN
+    INSERT INTO evidence_fts(evidence_fts, rowid, title, snippet) VALUES ('delete', old.id, old.title, old.snippet);
+    INSERT INTO evidence_fts(rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+END;
+"""
+
+# Rows come back with the citable URL as "url" and the canonical one as "key"
+COLUMNS = ("url", "key", "title", "snippet", "published_at", "source", "first_seen", "last_seen")
+_SELECT = "COALESCE(e.link, e.url), e.url, e.title, e.snippet, e.published_at, e.source, e.first_seen, e.last_seen"
+
+_TRACKING_PARAMS = {
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref_src", "ref_url", "cmpid", "spm", "_ga", "_hsenc", "_hsmi",
+}
+
+
+def canonical_url(url: Optional[str]) -> str:
+    """
+    Dedup key for a URL: https, lowercase host without www./default port, no
+    fragment, no tracking params (utm_* etc.), sorted query, no trailing
+    slash. Only a key: citations keep the URL as given. Returns "" for empty
+    or hostless URLs and the URL itself when it can't be parsed.
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url if "://" in url else f"https://{url}")
+        port = parts.port  # raises on a malformed netloc, e.g. "host:abc"
+    except ValueError:
+        return url
+    host = (parts.hostname or "").lower()
+    if not host:
+        return ""
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or ""
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+class EvidenceStore:
+    """
+    Every EvidenceItem ever collected, one row per canonical URL (the URL
+    first seen is kept for citations), with an FTS5 index over title and snippet. Re-adding a URL refreshes last_seen
+    and fills in fields that were missing before. Research records what it
+    extracts and skips extraction for URLs already stored.
+
+    Connections come from core.sqlite_util.ThreadLocalConnection.
+    """
+
+    def __init__(self, path: str = EVIDENCE_STORE_PATH):
+        self.path = path
+        self._db = ThreadLocalConnection(path, SCHEMA)
+        # Stores created before the link column existed; their rows cite the key
+        add_column(self._conn(), "evidence", "link", "TEXT")
+
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    def add_many(self, items: Iterable[Any]) -> int:
+        """
+        Upserts EvidenceItems (or dicts with the same fields). Returns the
+        number of items stored; items without a usable URL are skipped.
+        """
+        now = time.time()
+        rows = []
+        for item in items:
+            e = item if isinstance(item, dict) else item.model_dump()
+            link = (e.get("url") or "").strip()
+            key = canonical_url(link)
+            if not key:
+                continue
+            rows.append((key, link, e.get("title") or link, e.get("snippet") or "", e.get("published_at"), e.get("source"), now, now))
+        if not rows:
+            return 0
+        conn = self._conn()
+        with transaction(conn):
+            conn.executemany(
+                "INSERT INTO evidence(url, link, title, snippet, published_at, source, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET "
+                "link = COALESCE(link, excluded.link), "
+                "title = excluded.title, "
+                "snippet = CASE WHEN excluded.snippet != '' THEN excluded.snippet ELSE snippet END, "
+                "published_at = COALESCE(excluded.published_at, published_at), "
+                "source = COALESCE(excluded.source, source), "
+                "last_seen = excluded.last_seen",
+                rows,
+            )
+        return len(rows)
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Best FTS matches for `query` (bm25, title weighted over snippet), each
+        with a short highlighted `match` excerpt.
+        """
+        match = fts_query(query)
+        if match is None:
+            return []
+        conn = self._conn()
+        ranked = [rowid for rowid, _ in fts_rank(conn, "evidence_fts", match, "4.0, 1.0", limit)]
+        if not ranked:
+            return []
+        marks = ", ".join("?" * len(ranked))
+        rows = {r[0]: dict(zip(COLUMNS, r[1:])) for r in conn.execute(f"SELECT e.id, {_SELECT} FROM evidence e WHERE e.id IN ({marks})", ranked)}
+        return [{**rows[i], "match": excerpt(rows[i]["snippet"] or "", query)} for i in ranked if i in rows]
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Stored rows for the given URLs (any form), keyed by canonical URL.
+        """
+        keys = sorted({u for u in (canonical_url(x) for x in urls) if u})
+        out: Dict[str, Dict[str, Any]] = {}
+        conn = self._conn()
+        # Stay well below SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ", ".join("?" * len(chunk))
+            for r in conn.execute(f"SELECT {_SELECT} FROM evidence e WHERE e.url IN ({marks})", chunk):
+                out[r[1]] = dict(zip(COLUMNS, r))
+        return out
+
+    def published_since(self, since: str, urls: Iterable[str]) -> Dict[str, str]:
+        """
+        {canonical url: published_at} for those of `urls` published on or after
+        the ISO date `since`. Only ISO dates compare correctly as strings, so
+        anything else never matches.
+        """
+        keys = sorted({u for u in (canonical_url(x) for x in urls) if u})
+        out: Dict[str, str] = {}
+        conn = self._conn()
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ", ".join("?" * len(chunk))
+            out.update(conn.execute(
+                f"SELECT url, published_at FROM evidence WHERE url IN ({marks}) AND published_at >= ? "
+                "AND published_at GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'",
+                (*chunk, since),
+            ))
+        return out
+
+    def urls(self) -> List[str]:
+        # Canonical keys, as used by get_many() and the search vectors
+        return [r[0] for r in self._conn().execute("SELECT url FROM evidence ORDER BY id")]
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM evidence").fetchone()[0]
+
+
+_store: Optional[EvidenceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_evidence_store() -> Optional[EvidenceStore]:
+    """
+    Returns the process-wide evidence store, or None when EVIDENCE_STORE=off.
+    """
+    global _store
+    if EVIDENCE_STORE.lower() in ("0", "off", "false", "no"):
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EvidenceStore()
+    return _store
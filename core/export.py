@@ -0,0 +1,524 @@
+"""
+Export formats for a finished blog: standalone HTML with heading anchors and
+a table of contents, print-ready HTML (save as PDF from the browser), a JSON
+bundle (metadata, plan, evidence, sections) and a zip with all of them plus
+the Markdown.
+
+The Markdown is converted in one streaming pass that also collects the
+heading outline and splits the H2 sections, so every format comes from the
+same pass. Renders are cached in memory by a hash of their inputs; the zip
+is only built when it is asked for.
+
+Only the Markdown the section writer produces is supported: ATX headings,
+paragraphs, nested lists, fenced code, block quotes, GFM tables, rules, and
+inline code / emphasis / links.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from collections import OrderedDict
+from html import escape
+import json
+import os
+import re
+import threading
+
+from core.artifacts import ArtifactStore, content_hash, zip_bytes
+from core.blog_index import safe_slug, title_from_md
+
+
+EXPORT_CACHE_ENTRIES = int(os.environ.get("EXPORT_CACHE_ENTRIES", "16"))
+
+# format -> (file suffix, MIME type)
+FORMATS: Dict[str, Tuple[str, str]] = {
+    "md": (".md", "text/markdown"),
+    "html": (".html", "text/html"),
+    "print": (".print.html", "text/html"),
+    "json": (".json", "application/json"),
+    "zip": (".zip", "application/zip"),
+}
+
+BUNDLE_VERSION = 1
+
+
+# -----------------------------
+# Inline Markdown
+# -----------------------------
+_CODE_SPAN = re.compile(r"(`+)(.+?)\1")
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)(?:\s+&quot;[^)]*&quot;)?\)")
+_AUTOLINK = re.compile(r"&lt;(https?://[^\s&]+)&gt;")
+_STRONG = re.compile(r"\*\*(?=\S)(.+?)(?<=\S)\*\*|__(?=\S)(.+?)(?<=\S)__")
+_EM = re.compile(r"(?<![\w*])\*(?=\S)(.+?)(?<=\S)\*(?![\w*])|(?<![\w_])_(?=\S)(.+?)(?<=\S)_(?![\w_])")
+_DEL = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~")
+_SAFE_URL = re.compile(r"^(https?:|mailto:|#|/|\.)", re.I)
+
+
+def _link(m: re.Match) -> str:
+    url = m.group(2)
+    if not _SAFE_URL.match(url):
+        return m.group(0)  # javascript: and friends stay text
+    return f'<a href="{url}">{m.group(1)}</a>'
+
+
+def inline(text: str) -> str:
+    """
+    Escaped HTML for one line / paragraph of inline Markdown.
+    """
+    if "`" not in text:
+        return _inline_text(text)
+    out = []
+    pos = 0
+    for m in _CODE_SPAN.finditer(text):
+        out.append(_inline_text(text[pos:m.start()]))
+        out.append(f"<code>{escape(m.group(2).strip(), quote=False)}</code>")
+        pos = m.end()
+    out.append(_inline_text(text[pos:]))
+    return "".join(out)
+
+
+def _inline_text(text: str) -> str:
+    if not text:
+        return ""
+    s = escape(text)
+    # Most text has no markup at all; only run the patterns that can match
+    if "](" in s:
+        s = _LINK.sub(_link, s)
+    if "&lt;http" in s:
+        s = _AUTOLINK.sub(r'<a href="\1">\1</a>', s)
+    if "*" in s or "_" in s:
+        s = _STRONG.sub(lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>", s)
+        s = _EM.sub(lambda m: f"<em>{m.group(1) or m.group(2)}</em>", s)
+    if "~~" in s:
+        s = _DEL.sub(r"<del>\1</del>", s)
+    return s
+
+
+def _plain(text: str) -> str:
+    # Heading text without Markdown markup, for anchors and the outline
+    text = _CODE_SPAN.sub(lambda m: m.group(2), text)
+    text = re.sub(r"\[([^\]]+)\]\([^)]*\)", r"\1", text)
+    return re.sub(r"[*_~]", "", text).strip()
+
+
+def anchor_slug(text: str) -> str:
+    s = re.sub(r"[^\w\- ]+", "", _plain(text).lower())
+    return re.sub(r"\s+", "-", s.strip()) or "section"
+
+
+# -----------------------------
+# Block Markdown: one pass over the lines
+# -----------------------------
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+_FENCE = re.compile(r"^\s*(`{3,}|~{3,})\s*([\w+-]*)")
+_RULE = re.compile(r"^\s{0,3}([-*_])(?:\s*\1){2,}\s*$")
+_ITEM = re.compile(r"^(\s*)([-*+]|\d{1,9}[.)])\s+(.*)$")
+_QUOTE = re.compile(r"^\s{0,3}>\s?(.*)$")
+_TABLE_SEP = re.compile(r"^\s*\|?\s*:?-{1,}:?\s*(\|\s*:?-{1,}:?\s*)*\|?\s*$")
+
+
+def _cells(line: str) -> List[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [c.strip().replace("\\|", "|") for c in re.split(r"(?<!\\)\|", line)]
+
+
+class _Converter:
+    """
+    Line-at-a-time Markdown to HTML. Besides the HTML chunks it records the
+    heading outline and, per H2 section, that section's Markdown and HTML.
+    """
+
+    def __init__(self) -> None:
+        self.headings: List[Dict[str, Any]] = []
+        # Content before the first H2 (title, intro) is section 0 with no heading
+        self.sections: List[Dict[str, Any]] = [{"title": None, "anchor": None, "md": [], "html": []}]
+        self._anchors: Dict[str, int] = {}
+        self._para: List[str] = []
+        self._quote: List[str] = []
+        self._lists: List[Tuple[int, str]] = []  # open lists: (indent, "ul" | "ol")
+        self._item_open = False
+        self._fence: Optional[str] = None
+        self._table: Optional[List[str]] = None  # alignments while inside a table
+
+    # -- output helpers --
+    def _emit(self, chunk: str) -> None:
+        self.sections[-1]["html"].append(chunk)
+
+    def _anchor(self, text: str) -> str:
+        base = anchor_slug(text)
+        n = self._anchors.get(base, 0)
+        self._anchors[base] = n + 1
+        return base if n == 0 else f"{base}-{n}"
+
+    # -- closing open blocks --
+    def _close_para(self) -> None:
+        if self._para:
+            self._emit(f"<p>{inline(' '.join(self._para))}</p>\n")
+            self._para = []
+
+    def _close_quote(self) -> None:
+        if self._quote:
+            paras = " ".join(self._quote).split("\x00")
+            body = "".join(f"<p>{inline(p.strip())}</p>" for p in paras if p.strip())
+            self._emit(f"<blockquote>{body}</blockquote>\n")
+            self._quote = []
+
+    def _close_lists(self, indent: int = -1) -> None:
+        # Closes every open list nested deeper than `indent`
+        while self._lists and self._lists[-1][0] > indent:
+            _, kind = self._lists.pop()
+            self._emit(f"</li></{kind}>\n")
+            self._item_open = bool(self._lists)
+
+    def _close_table(self) -> None:
+        if self._table is not None:
+            self._emit("</tbody></table>\n")
+            self._table = None
+
+    def _close_blocks(self) -> None:
+        self._close_para()
+        self._close_quote()
+        self._close_lists()
+        self._close_table()
+
+    # -- feeding lines --
+    def feed(self, line: str) -> None:
+        line = line.rstrip("\n")
+        if not line.startswith(("## ", "##\t")) or self._fence is not None:
+            self.sections[-1]["md"].append(line)
+
+        if self._fence is not None:
+            if line.strip().startswith(self._fence):
+                self._emit("</code></pre>\n")
+                self._fence = None
+            else:
+                self._emit(escape(line, quote=False) + "\n")
+            return
+
+        if not line.strip():
+            self._close_para()
+            self._close_table()
+            if self._quote:
+                self._quote.append("\x00")
+            return
+
+        m = _FENCE.match(line)
+        if m:
+            self._close_blocks()
+            self._fence = m.group(1)[0] * 3
+            lang = f' class="language-{m.group(2)}"' if m.group(2) else ""
+            self._emit(f"<pre><code{lang}>")
+            return
+
+        m = _HEADING.match(line)
+        if m:
+            self._close_blocks()
+            level, text = len(m.group(1)), m.group(2)
+            anchor = self._anchor(text)
+            if level == 2:
+                self.sections.append({"title": _plain(text), "anchor": anchor, "md": [line], "html": []})
+            self.headings.append({"level": level, "text": _plain(text), "anchor": anchor})
+            self._emit(
+                f'<h{level} id="{anchor}">{inline(text)}'
+                f'<a class="anchor" href="#{anchor}" aria-label="Link to this section">#</a></h{level}>\n'
+            )
+            return
+
+        if _RULE.match(line):
+            self._close_blocks()
+            self._emit("<hr>\n")
+            return
+
+        m = _QUOTE.match(line)
+        if m:
+            self._close_para()
+            self._close_lists()
+            self._close_table()
+            self._quote.append(m.group(1))
+            return
+        self._close_quote()
+
+        if self._table is not None:
+            if "|" in line:
+                cells = _cells(line)
+                row = "".join(
+                    f"<td{self._table[i] if i < len(self._table) else ''}>{inline(c)}</td>" for i, c in enumerate(cells)
+                )
+                self._emit(f"<tr>{row}</tr>\n")
+                return
+            self._close_table()
+
+        if _TABLE_SEP.match(line) and len(self._para) == 1 and "|" in self._para[0] and "-" in line:
+            header = _cells(self._para[0])
+            self._para = []
+            aligns = []
+            for spec in _cells(line):
+                left, right = spec.startswith(":"), spec.endswith(":")
+                align = "center" if left and right else "right" if right else "left" if left else ""
+                aligns.append(f' style="text-align:{align}"' if align else "")
+            self._table = aligns
+            head = "".join(f"<th{aligns[i] if i < len(aligns) else ''}>{inline(c)}</th>" for i, c in enumerate(header))
+            self._emit(f"<table><thead><tr>{head}</tr></thead><tbody>\n")
+            return
+
+        m = _ITEM.match(line)
+        if m and not (self._para and not self._lists and m.group(2)[0].isdigit() and m.group(2) != "1."):
+            self._close_para()
+            indent, marker, text = len(m.group(1).expandtabs(4)), m.group(2), m.group(3)
+            kind = "ul" if marker in "-*+" else "ol"
+            self._close_lists(indent)
+            if self._lists and self._lists[-1][0] == indent:
+                if self._lists[-1][1] != kind:
+                    self._close_lists(indent - 1)
+                else:
+                    self._emit("</li>\n")
+            if not self._lists or self._lists[-1][0] < indent:
+                start = ""
+                if kind == "ol" and int(marker[:-1]) != 1:
+                    start = f' start="{int(marker[:-1])}"'
+                self._emit(f"<{kind}{start}>\n")
+                self._lists.append((indent, kind))
+            self._emit(f"<li>{inline(text)}")
+            self._item_open = True
+            return
+
+        if self._lists and line.startswith((" ", "\t")) and not self._para:
+            # Lazy continuation of the current list item
+            self._emit(" " + inline(line.strip()))
+            return
+        self._close_lists()
+        self._para.append(line.strip())
+
+    def close(self) -> None:
+        if self._fence is not None:
+            self._emit("</code></pre>\n")
+            self._fence = None
+        self._close_blocks()
+
+
+def markdown_to_html(md: str) -> str:
+    conv = _Converter()
+    for line in md.splitlines():
+        conv.feed(line)
+    conv.close()
+    return "".join(chunk for s in conv.sections for chunk in s["html"])
+
+
+# -----------------------------
+# Pages
+# -----------------------------
+_BASE_CSS = """
+body { font: 17px/1.65 -apple-system, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; color: #1f2328; max-width: 46rem; margin: 2rem auto; padding: 0 1rem; }
+h1, h2, h3, h4 { line-height: 1.25; margin-top: 2em; }
+h1 { margin-top: 0; }
+a.anchor { margin-left: .35em; color: #8c959f; text-decoration: none; visibility: hidden; }
+h1:hover a.anchor, h2:hover a.anchor, h3:hover a.anchor, h4:hover a.anchor, h5:hover a.anchor, h6:hover a.anchor { visibility: visible; }
+pre { background: #f6f8fa; padding: .9em 1em; overflow: auto; border-radius: 6px; }
+code { font: .9em ui-monospace, SFMono-Regular, Menlo, Consolas, monospace; }
+:not(pre) > code { background: #f0f2f4; padding: .1em .3em; border-radius: 4px; }
+blockquote { margin: 0; padding: 0 1em; color: #59636e; border-left: .25em solid #d1d9e0; }
+table { border-collapse: collapse; margin: 1em 0; }
+th, td { border: 1px solid #d1d9e0; padding: .35em .7em; }
+nav.toc { background: #f6f8fa; padding: .6em 1.2em; border-radius: 6px; }
+nav.toc ul { padding-left: 1.2em; margin: .3em 0; }
+"""
+
+_PRINT_CSS = """
+@page { size: A4; margin: 20mm 18mm; }
+body { max-width: none; margin: 0; padding: 0; font-size: 11pt; }
+a.anchor { display: none; }
+h2 { break-before: page; }
+nav.toc + h2, h1 + h2 { break-before: avoid; }
+h1, h2, h3, h4 { break-after: avoid; }
+pre, blockquote, table, tr, img { break-inside: avoid; }
+pre { white-space: pre-wrap; }
+a { color: inherit; }
+a[href^="http"]::after { content: " (" attr(href) ")"; font-size: .85em; color: #59636e; word-break: break-all; }
+"""
+
+
+def _toc(headings: List[Dict[str, Any]]) -> str:
+    entries = [h for h in headings if h["level"] in (2, 3)]
+    if len(entries) < 2:
+        return ""
+    out = ['<nav class="toc"><strong>Contents</strong>\n<ul>\n']
+    depth = 2
+    for h in entries:
+        if h["level"] > depth:
+            out.append("<ul>\n")
+        elif h["level"] < depth:
+            out.append("</ul>\n")
+        depth = h["level"]
+        out.append(f'<li><a href="#{h["anchor"]}">{escape(h["text"])}</a></li>\n')
+    if depth == 3:
+        out.append("</ul>\n")
+    out.append("</ul></nav>\n")
+    return "".join(out)
+
+
+def _page(title: str, body_parts: Iterable[str], toc: str, css: str) -> str:
+    head = (
+        "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">\n"
+        f"<title>{escape(title)}</title>\n<style>{css}</style>\n</head>\n<body>\n<article>\n"
+    )
+    parts = list(body_parts)
+    # The outline goes right after the H1 when the blog starts with one
+    if parts and parts[0].startswith("<h1"):
+        return head + parts[0] + toc + "".join(parts[1:]) + "</article>\n</body>\n</html>\n"
+    return head + toc + "".join(parts) + "</article>\n</body>\n</html>\n"
+
+
+# -----------------------------
+# Export
+# -----------------------------
+def _dump(obj: Any) -> Any:
+    if obj is None:
+        return None
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return obj
+
+
+def export_inputs(result: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    The parts of a finished run (graph state, or {"final": md} for a loaded
+    blog) that exports depend on, in JSON form.
+    """
+    final_md = result.get("final") or ""
+    plan = _dump(result.get("plan"))
+    title = (plan or {}).get("blog_title") or _plain(title_from_md(final_md, "blog"))
+    # sections is append-only; the latest text per task id wins, as in the reducer
+    task_ids = sorted(dict(result.get("sections") or []))
+    return {
+        "title": title,
+        "slug": safe_slug(title),
+        "topic": result.get("topic") or "",
+        "mode": result.get("mode") or "",
+        "as_of": result.get("as_of") or "",
+        "plan": plan,
+        "evidence": [_dump(e) for e in result.get("evidence") or []],
+        "task_ids": task_ids,
+        "markdown": final_md,
+    }
+
+
+class Export:
+    """
+    Every format of one blog, rendered together. `key` is the content hash
+    of the inputs; the zip is built on first use.
+    """
+
+    def __init__(self, inputs: Dict[str, Any], key: str):
+        self.key = key
+        self.title = inputs["title"]
+        self.slug = inputs["slug"]
+        md = inputs["markdown"]
+
+        conv = _Converter()
+        for line in md.splitlines():
+            conv.feed(line)
+        conv.close()
+
+        body = ["".join(s["html"]) for s in conv.sections]
+        toc = _toc(conv.headings)
+        self._data: Dict[str, bytes] = {
+            "md": md.encode("utf-8"),
+            "html": _page(self.title, body, toc, _BASE_CSS).encode("utf-8"),
+            "print": _page(self.title, body, toc, _BASE_CSS + _PRINT_CSS).encode("utf-8"),
+        }
+
+        # Task ids line up with the H2 sections when every section has one
+        sections = [s for s in conv.sections if s["title"] is not None]
+        task_ids = inputs["task_ids"] if len(inputs["task_ids"]) == len(sections) else [None] * len(sections)
+        bundle = {
+            "version": BUNDLE_VERSION,
+            "id": key[:16],
+            "title": self.title,
+            "slug": self.slug,
+            "topic": inputs["topic"],
+            "mode": inputs["mode"],
+            "as_of": inputs["as_of"],
+            "word_count": len(md.split()),
+            "headings": conv.headings,
+            "intro_html": body[0],
+            "sections": [
+                {
+                    "task_id": task_id,
+                    "title": s["title"],
+                    "anchor": s["anchor"],
+                    "markdown": "\n".join(s["md"]).strip() + "\n",
+                    "html": html,
+                }
+                for task_id, s, html in zip(task_ids, sections, body[1:])
+            ],
+            "plan": inputs["plan"],
+            "evidence": inputs["evidence"],
+            "markdown": md,
+        }
+        self._data["json"] = json.dumps(bundle, ensure_ascii=False, indent=2).encode("utf-8")
+        self._sha: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def sha256(self, fmt: str) -> str:
+        # Hashed once per format, so saving it again is only a stat()
+        with self._lock:
+            sha = self._sha.get(fmt)
+        if sha is None:
+            sha = content_hash(self.get(fmt))
+            with self._lock:
+                self._sha[fmt] = sha
+        return sha
+
+    def filename(self, fmt: str) -> str:
+        return f"{self.slug}{FORMATS[fmt][0]}"
+
+    def get(self, fmt: str) -> bytes:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format: {fmt!r} (expected one of {', '.join(FORMATS)})")
+        if fmt == "zip":
+            with self._lock:
+                if "zip" not in self._data:
+                    self._data["zip"] = zip_bytes({self.filename(f): self._data[f] for f in ("md", "html", "print", "json")})
+        return self._data[fmt]
+
+
+_cache: "OrderedDict[str, Export]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def render_export(result: Mapping[str, Any]) -> Export:
+    """
+    The Export for a finished run, rendered once per distinct content.
+    """
+    inputs = export_inputs(result)
+    # The Markdown is hashed as bytes; JSON-escaping a large blog just to hash it costs more
+    rest = {k: v for k, v in inputs.items() if k != "markdown"}
+    key = content_hash(
+        content_hash(inputs["markdown"]) + json.dumps(rest, sort_keys=True, ensure_ascii=False, default=str)
+    )
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+            return hit
+    export = Export(inputs, key)
+    with _cache_lock:
+        _cache[key] = export
+        while len(_cache) > max(1, EXPORT_CACHE_ENTRIES):
+            _cache.popitem(last=False)
+    return export
+
+
+def export_bytes(result: Mapping[str, Any], fmt: str, store: Optional[ArtifactStore] = None) -> bytes:
+    """
+    One format of a finished run; with `store`, also saved there as
+    <slug><suffix> (not rewritten when unchanged).
+    """
+    export = render_export(result)
+    data = export.get(fmt)
+    if store is not None:
+        store.put(export.filename(fmt), data, sha256=export.sha256(fmt))
+    return data
@@ -1,41 +1,167 @@
-from langchain_google_genai import ChatGoogleGenerativeAI 
-from dotenv import load_dotenv 
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Optional
+from dataclasses import dataclass, replace
 import getpass
-import os 
-from langchain_ollama import ChatOllama
-
-load_dotenv() 
-
-
-
-if "GOOGLE_API_KEY" not in os.environ:
-    os.environ["GOOGLE_API_KEY"] = getpass.getpass("Enter your Google AI API key: ")
-
-def get_llm()->ChatGoogleGenerativeAI:
-
-    return ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=1.0,  # Gemini 3.0+ defaults to 1.0
-    max_tokens=None,
-    timeout=None,
-    streaming=True
-    
-)
-"""
-def get_llm() -> ChatOllama:
-    
-    Creates and returns a ChatOllama LLM instance.
-
-    return ChatOllama(
-        model="deepseek-v3.2:cloud",
-        base_url="https://ollama.com",
-        client_kwargs={
-            "headers": {
-                "Authorization": f"Bearer {os.environ.get('OLLAMA_API_KEY')}"
-            }
-        },
-        
-            
-         
+import os
+import threading
+
+from core.env import load_env
+
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    backend: str  # gemini | ollama
+    model: str
+    temperature: float
+    max_tokens: Optional[int] = None
+    timeout: Optional[float] = None  # seconds per attempt; None = LLM_CALL_TIMEOUT
+
+
+# One place for what each node runs on. Routing, evidence extraction and plan
+# reconciliation are small structured-output calls: a fast model at temperature 0 (which also
+# makes them cacheable, see core/llm_cache.py). Planning and writing keep the
+# stronger model. Every field can be overridden per role from the environment:
+#   LLM_<ROLE>_BACKEND / _MODEL / _TEMPERATURE / _MAX_TOKENS / _TIMEOUT
+PROFILES: Dict[str, ModelProfile] = {
+    "router": ModelProfile("gemini", "gemini-2.5-flash-lite", 0.0, max_tokens=1024, timeout=30),
+    "research": ModelProfile("gemini", "gemini-2.5-flash-lite", 0.0, max_tokens=4096, timeout=60),
+    "orchestrator": ModelProfile("gemini", "gemini-2.5-flash", 1.0),
+    "reconcile": ModelProfile("gemini", "gemini-2.5-flash-lite", 0.0, max_tokens=2048, timeout=60),
+    "worker": ModelProfile("gemini", "gemini-2.5-flash", 1.0),  # Gemini 3.0+ defaults to 1.0
+}
+DEFAULT_ROLE = "worker"
+
+# Model used for every role when LLM_BACKEND=ollama (unless overridden per role)
+OLLAMA_MODEL = "deepseek-v3.2:cloud"
+
+
+def _env(role: str, field: str) -> Optional[str]:
+    value = os.environ.get(f"LLM_{role.upper()}_{field}")
+    return value if value not in (None, "") else None
+
+
+def resolve_profile(role: str = DEFAULT_ROLE) -> ModelProfile:
+    """
+    The profile for `role` after LLM_BACKEND and per-role env overrides.
+    """
+    load_env()
+    profile = PROFILES.get(role, PROFILES[DEFAULT_ROLE])
+
+    backend = (_env(role, "BACKEND") or os.environ.get("LLM_BACKEND") or profile.backend).lower()
+    if backend != profile.backend:
+        # Gemini model names mean nothing to Ollama and vice versa
+        default_model = os.environ.get("OLLAMA_MODEL", OLLAMA_MODEL) if backend == "ollama" else profile.model
+        profile = replace(profile, backend=backend, model=default_model)
+
+    overrides = {}
+    if (model := _env(role, "MODEL")) is not None:
+        overrides["model"] = model
+    if (temperature := _env(role, "TEMPERATURE")) is not None:
+        overrides["temperature"] = float(temperature)
+    if (max_tokens := _env(role, "MAX_TOKENS")) is not None:
+        overrides["max_tokens"] = int(max_tokens) or None
+    if (timeout := _env(role, "TIMEOUT")) is not None:
+        overrides["timeout"] = float(timeout)
+    return replace(profile, **overrides) if overrides else profile
+
+
+def _build_gemini(profile: ModelProfile, timeout: float, cache) -> "BaseChatModel":
+    if "GOOGLE_API_KEY" not in os.environ:
+        os.environ["GOOGLE_API_KEY"] = getpass.getpass("Enter your Google AI API key: ")
+
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    from core.ratelimit import governed
+
+    return governed(ChatGoogleGenerativeAI)(
+        model=profile.model,
+        temperature=profile.temperature,
+        max_tokens=profile.max_tokens,
+        timeout=timeout,
+        max_retries=1,  # single attempt per request; the governor owns retries
+        streaming=True,
+        cache=cache,
     )
- """   
\ No newline at end of file
+
+
+def _build_ollama(profile: ModelProfile, timeout: float, cache) -> "BaseChatModel":
+    from langchain_ollama import ChatOllama
+
+    from core.ratelimit import governed
+
+    # Local server by default; OLLAMA_BASE_URL=https://ollama.com + OLLAMA_API_KEY for the hosted API
+    client_kwargs = {"timeout": timeout}
+    if os.environ.get("OLLAMA_API_KEY"):
+        client_kwargs["headers"] = {"Authorization": f"Bearer {os.environ['OLLAMA_API_KEY']}"}
+
+    return governed(ChatOllama)(
+        model=profile.model,
+        temperature=profile.temperature,
+        num_predict=profile.max_tokens,
+        base_url=os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434"),
+        client_kwargs=client_kwargs,
+        cache=cache,
+    )
+
+
+_BUILDERS = {"gemini": _build_gemini, "ollama": _build_ollama}
+
+
+def _build_llm(profile: ModelProfile) -> "BaseChatModel":
+    # Deferred so importing the graph doesn't pay for the client import trees,
+    # and a missing key only prompts when a model is actually needed
+    from core.llm_cache import get_llm_cache
+    from core.ratelimit import LLM_CALL_TIMEOUT
+
+    if profile.backend not in _BUILDERS:
+        raise ValueError(f"Unknown LLM backend: {profile.backend!r} (expected gemini or ollama)")
+    # Calls go through the shared governor (core/ratelimit.py): RPM/TPM budgets,
+    # adaptive concurrency and jittered retries on 429/5xx.
+    # Response cache (core/llm_cache.py) is None at temperature > 0 unless opted in.
+    return _BUILDERS[profile.backend](
+        profile,
+        profile.timeout or LLM_CALL_TIMEOUT,
+        get_llm_cache(profile.temperature),
+    )
+
+
+_llms: Dict[ModelProfile, "BaseChatModel"] = {}
+_overrides: Dict[Optional[str], "BaseChatModel"] = {}
+_llm_lock = threading.Lock()
+
+
+def get_llm(role: str = DEFAULT_ROLE) -> "BaseChatModel":
+    """
+    Returns the shared chat model for `role` (router, research, orchestrator,
+    reconcile, worker), built on first use. Thread-safe; roles with the same profile
+    share one instance and its HTTP client.
+    """
+    override = _overrides.get(role) or _overrides.get(None)
+    if override is not None:
+        return override
+
+    profile = resolve_profile(role)
+    llm = _llms.get(profile)
+    if llm is None:
+        with _llm_lock:
+            llm = _llms.get(profile)
+            if llm is None:
+                llm = _llms[profile] = _build_llm(profile)
+    return llm
+
+
+def set_llm(llm: Optional["BaseChatModel"], role: Optional[str] = None) -> None:
+    """
+    Replaces the model for `role`, or for every role when role is None
+    (offline benchmarks, fakes). llm=None removes the override.
+    """
+    with _llm_lock:
+        if llm is None:
+            _overrides.pop(role, None)
+            if role is None:
+                _overrides.clear()
+        else:
+            _overrides[role] = llm
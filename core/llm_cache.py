@@ -0,0 +1,201 @@
+from __future__ import annotations
+from typing import Iterator, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import warnings
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from core.sqlite_util import ThreadLocalConnection
+
+
+LLM_CACHE = os.environ.get("LLM_CACHE", "sqlite")  # sqlite | memory | off
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", ".cache/llm_cache.sqlite")
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+# Sampling at temperature > 0 makes a cached answer a different answer; opt in explicitly.
+LLM_CACHE_NONZERO_TEMPERATURE = os.environ.get("LLM_CACHE_NONZERO_TEMPERATURE", "").lower() in ("1", "true", "yes", "on")
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache() -> Iterator[None]:
+    """
+    Skips the response cache (no read, no write) for LLM calls made inside the block.
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """
+    LangChain's llm_string already carries the model, temperature and bound
+    kwargs (structured-output schema, tools, stop), and prompt is the
+    serialized message list, so one hash over both covers all of them.
+    """
+    h = hashlib.sha256()
+    h.update(llm_string.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(prompt.encode("utf-8"))
+    return h.hexdigest()
+
+
+class MemoryLLMCache(BaseCache):
+    """
+    In-process LRU cache bounded by entry count and serialized size.
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, tuple[RETURN_VAL_TYPE, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if _bypass.get():
+            return None
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            self._data.move_to_end(key)
+            return item[0]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if _bypass.get():
+            return
+        key = cache_key(prompt, llm_string)
+        size = len(dumps(list(return_val)))
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (return_val, size)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, dropped) = self._data.popitem(last=False)
+                self._bytes -= dropped
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    On-disk LRU cache shared across processes (WAL mode, one connection per thread).
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._db = ThreadLocalConnection(
+            path,
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key         TEXT PRIMARY KEY,
+                payload     TEXT NOT NULL,
+                size        INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_llm_cache_access ON llm_cache(last_access);
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if _bypass.get():
+            return None
+        key = cache_key(prompt, llm_string)
+        conn = self._conn()
+        row = conn.execute("SELECT payload FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        try:
+            with warnings.catch_warnings():
+                # loads() is flagged beta; the cache only round-trips payloads it wrote itself.
+                warnings.filterwarnings("ignore", message=r"The function `loads` is in beta")
+                return loads(row[0], allowed_objects="core")
+        except Exception:
+            # Written by an incompatible langchain version; treat as a miss.
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if _bypass.get():
+            return
+        payload = dumps(list(return_val))
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache(key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+            (cache_key(prompt, llm_string), payload, len(payload), time.time()),
+        )
+        self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        drop = []
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            drop.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", drop)
+
+    def clear(self, **kwargs) -> None:
+        self._conn().execute("DELETE FROM llm_cache")
+
+
+_caches: dict = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(temperature: float, backend: Optional[str] = None, allow_nonzero_temperature: Optional[bool] = None) -> Optional[BaseCache]:
+    """
+    Returns the shared response cache for `backend`, or None when caching is
+    off. Caching is switched off for temperature > 0 unless explicitly allowed.
+    """
+    backend = (backend or LLM_CACHE).lower()
+    if allow_nonzero_temperature is None:
+        allow_nonzero_temperature = LLM_CACHE_NONZERO_TEMPERATURE
+
+    if backend in ("", "0", "off", "false", "no", "none"):
+        return None
+    if temperature and temperature > 0 and not allow_nonzero_temperature:
+        return None
+
+    with _caches_lock:
+        if backend not in _caches:
+            if backend == "memory":
+                _caches[backend] = MemoryLLMCache()
+            elif backend == "sqlite":
+                _caches[backend] = SQLiteLLMCache()
+            else:
+                raise ValueError(f"Unknown LLM_CACHE backend: {backend!r} (expected sqlite, memory or off)")
+        return _caches[backend]
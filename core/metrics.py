@@ -0,0 +1,332 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+
+
+METRICS = os.environ.get("METRICS", "on")  # on | off
+METRICS_PORT = os.environ.get("METRICS_PORT")  # serve Prometheus text on this port when set
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")  # 0.0.0.0 to expose it beyond this machine
+# USD per 1M tokens (input, output), for the cost estimate only. Models not
+# listed use LLM_PRICE_*_PER_MTOK (gemini-2.5-flash list price by default).
+LLM_PRICE_INPUT_PER_MTOK = float(os.environ.get("LLM_PRICE_INPUT_PER_MTOK", "0.30"))
+LLM_PRICE_OUTPUT_PER_MTOK = float(os.environ.get("LLM_PRICE_OUTPUT_PER_MTOK", "2.50"))
+MODEL_PRICES = {
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("calls", "wall_s", "llm_calls", "queue_wait_s", "llm_s", "input_tokens", "output_tokens", "cost_usd")
+
+
+def enabled() -> bool:
+    return METRICS.lower() not in ("0", "off", "false", "no")
+
+
+def cost_usd(input_tokens: int, output_tokens: int, model: Optional[str] = None) -> float:
+    name = (model or "").removeprefix("models/")
+    price_in, price_out = MODEL_PRICES.get(name, (LLM_PRICE_INPUT_PER_MTOK, LLM_PRICE_OUTPUT_PER_MTOK))
+    return (input_tokens * price_in + output_tokens * price_out) / 1e6
+
+
+class RunMetrics:
+    """
+    Per-run counters: one row per node and per worker task, plus search totals.
+    Safe to update from the graph's worker threads.
+    """
+
+    def __init__(self, run_id: str = ""):
+        self.run_id = run_id
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.nodes: Dict[str, Dict[str, float]] = {}
+        self.tasks: Dict[int, Dict[str, float]] = {}
+        self.search = {"calls": 0, "cache_hits": 0, "results": 0, "bytes": 0}
+        # (node, task_id, graph step, start, end), times relative to `started`
+        self.spans: List[Tuple[str, Optional[int], Optional[int], float, float]] = []
+        self._lock = threading.Lock()
+
+    def _rows(self, node: str, task_id: Optional[int]) -> List[Dict[str, float]]:
+        rows = [self.nodes.setdefault(node, dict.fromkeys(FIELDS, 0))]
+        if task_id is not None:
+            rows.append(self.tasks.setdefault(task_id, dict.fromkeys(FIELDS, 0)))
+        return rows
+
+    def add(self, node: str, task_id: Optional[int] = None, **values: float) -> None:
+        with self._lock:
+            for row in self._rows(node, task_id):
+                for k, v in values.items():
+                    row[k] += v
+
+    def add_search(self, results: List[dict], cached: bool) -> None:
+        with self._lock:
+            self.search["calls"] += 1
+            self.search["cache_hits"] += int(cached)
+            self.search["results"] += len(results)
+            self.search["bytes"] += len(json.dumps(results, ensure_ascii=False).encode("utf-8"))
+
+    def add_span(self, node: str, task_id: Optional[int], step: Optional[int], start: float, end: float) -> None:
+        with self._lock:
+            self.spans.append((node, task_id, step, start - self.started, end - self.started))
+
+    def critical_path(self) -> Dict[str, Any]:
+        """
+        The slowest node execution of every graph step, in order. Steps run
+        back to back, so their sum is the run's wall time minus scheduling
+        overhead; shortening anything off this path doesn't make a run faster.
+        """
+        slowest: Dict[int, tuple] = {}
+        for span in self.spans:
+            node, task_id, step, start, end = span
+            if step is not None and (step not in slowest or end - start > slowest[step][4] - slowest[step][3]):
+                slowest[step] = span
+        path = [
+            {"step": step, "node": node, "task_id": task_id, "start_s": round(start, 3), "s": round(end - start, 3)}
+            for step, (node, task_id, _, start, end) in sorted(slowest.items())
+        ]
+        return {"total_s": round(sum(p["s"] for p in path), 3), "steps": path}
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter()
+
+    def report(self) -> Dict[str, Any]:
+        critical_path = self.critical_path()
+        with self._lock:
+            end = self.finished or time.perf_counter()
+
+            def rounded(row: Dict[str, float]) -> Dict[str, float]:
+                return {k: round(v, 6) if isinstance(v, float) else v for k, v in row.items()}
+
+            totals = dict.fromkeys(FIELDS, 0)
+            for row in self.nodes.values():
+                for k in FIELDS:
+                    totals[k] += row[k]
+            return {
+                "run_id": self.run_id,
+                "wall_s": round(end - self.started, 3),
+                "totals": rounded(totals),
+                "nodes": {name: rounded(row) for name, row in self.nodes.items()},
+                "tasks": {task_id: rounded(row) for task_id, row in sorted(self.tasks.items())},
+                "search": dict(self.search),
+                "critical_path": critical_path,
+            }
+
+
+# -----------------------------
+# Process-wide totals (Prometheus)
+# -----------------------------
+_totals: Dict[Tuple[str, str], float] = {}
+_totals_lock = threading.Lock()
+
+
+def _bump_total(metric: str, label: str, value: float) -> None:
+    with _totals_lock:
+        _totals[(metric, label)] = _totals.get((metric, label), 0) + value
+
+
+# -----------------------------
+# Recording (no-ops unless a run is being collected)
+# -----------------------------
+_run: ContextVar[Optional[RunMetrics]] = ContextVar("metrics_run", default=None)
+_scope: ContextVar[Tuple[str, Optional[int]]] = ContextVar("metrics_scope", default=("other", None))
+
+
+def current() -> Optional[RunMetrics]:
+    return _run.get()
+
+
+@contextmanager
+def collect(run_id: str = "") -> Iterator[Optional[RunMetrics]]:
+    """
+    Collects metrics for everything run inside the block (including graph
+    nodes on worker threads, which inherit the context). Yields None when
+    METRICS=off.
+    """
+    if not enabled():
+        yield None
+        return
+    run = RunMetrics(run_id)
+    token = _run.set(run)
+    try:
+        yield run
+    finally:
+        run.finish()
+        _run.reset(token)
+        _bump_total("runs", "", 1)
+
+
+def record_llm(queue_wait_s: float, llm_s: float, input_tokens: int, output_tokens: int, model: Optional[str] = None) -> None:
+    run = _run.get()
+    if run is None:
+        return
+    node, task_id = _scope.get()
+    cost = cost_usd(input_tokens, output_tokens, model)
+    run.add(
+        node,
+        task_id,
+        llm_calls=1,
+        queue_wait_s=queue_wait_s,
+        llm_s=llm_s,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cost_usd=cost,
+    )
+    _bump_total("llm_calls", node, 1)
+    _bump_total("llm_queue_wait_seconds", node, queue_wait_s)
+    _bump_total("llm_input_tokens", node, input_tokens)
+    _bump_total("llm_output_tokens", node, output_tokens)
+    _bump_total("llm_cost_usd", node, cost)
+
+
+def record_search(results: List[dict], cached: bool) -> None:
+    run = _run.get()
+    if run is None:
+        return
+    run.add_search(results, cached)
+    _bump_total("search_calls", "cached" if cached else "network", 1)
+
+
+def _task_id(state: Any) -> Optional[int]:
+    task = state.get("task") if isinstance(state, dict) else None
+    if task is None:
+        return None
+    return getattr(task, "id", None) if not isinstance(task, dict) else task.get("id")
+
+
+def _graph_step() -> Optional[int]:
+    try:
+        from langgraph.config import get_config
+
+        return get_config()["metadata"].get("langgraph_step")
+    except Exception:  # called outside a graph run
+        return None
+
+
+def instrument(node: str, fn: Callable) -> Callable:
+    """
+    Wraps a graph node (sync or async) to record its wall time and graph step,
+    and tags LLM / search calls made inside it with the node name (and the
+    task id for workers).
+    """
+    def begin(state):
+        task_id = _task_id(state)
+        return task_id, _scope.set((node, task_id)), time.perf_counter()
+
+    def end(run, task_id, token, t0):
+        _scope.reset(token)
+        t1 = time.perf_counter()
+        elapsed = t1 - t0
+        run.add(node, task_id, calls=1, wall_s=elapsed)
+        run.add_span(node, task_id, _graph_step(), t0, t1)
+        _bump_total("node_calls", node, 1)
+        _bump_total("node_seconds", node, elapsed)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(state, *args, **kwargs):
+            run = _run.get()
+            if run is None:
+                return await fn(state, *args, **kwargs)
+            task_id, token, t0 = begin(state)
+            try:
+                return await fn(state, *args, **kwargs)
+            finally:
+                end(run, task_id, token, t0)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state, *args, **kwargs):
+        run = _run.get()
+        if run is None:
+            return fn(state, *args, **kwargs)
+        task_id, token, t0 = begin(state)
+        try:
+            return fn(state, *args, **kwargs)
+        finally:
+            end(run, task_id, token, t0)
+
+    return wrapper
+
+
+# -----------------------------
+# Exposition
+# -----------------------------
+_PROM = {
+    "runs": ("counter", "Graph runs collected", None),
+    "node_calls": ("counter", "Node executions", "node"),
+    "node_seconds": ("counter", "Wall time spent in each node", "node"),
+    "llm_calls": ("counter", "LLM calls that reached the provider", "node"),
+    "llm_queue_wait_seconds": ("counter", "Time LLM calls waited for rate/concurrency limits", "node"),
+    "llm_input_tokens": ("counter", "LLM input tokens", "node"),
+    "llm_output_tokens": ("counter", "LLM output tokens", "node"),
+    "llm_cost_usd": ("counter", "Estimated LLM cost in USD", "node"),
+    "search_calls": ("counter", "Search calls", "source"),
+}
+
+
+def prometheus_text() -> str:
+    with _totals_lock:
+        items = sorted(_totals.items())
+    lines = []
+    for metric, (kind, help_text, label) in _PROM.items():
+        name = f"blog_{metric}_total"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (m, value_label), value in items:
+            if m != metric:
+                continue
+            labels = f'{{{label}="{value_label}"}}' if label else ""
+            lines.append(f"{name}{labels} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def serve_prometheus(port: Optional[int] = None, host: Optional[str] = None) -> Optional[ThreadingHTTPServer]:
+    """
+    Starts (once per process) a background HTTP server returning
+    prometheus_text() on any path. No-op unless a port is given or METRICS_PORT is set.
+    Binds to METRICS_HOST (loopback by default). Series are process totals
+    labelled by node name or search source only, never by run or topic.
+    """
+    global _server
+    port = port or (int(METRICS_PORT) if METRICS_PORT else None)
+    host = host or METRICS_HOST
+    if not port or not enabled():
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _Handler)
+            except OSError as exc:
+                logger.warning("metrics endpoint not started on %s:%s: %s", host, port, exc)
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    return _server
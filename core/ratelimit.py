@@ -0,0 +1,553 @@
+from __future__ import annotations
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+from collections import deque
+from contextvars import ContextVar
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+
+from core import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`.
+    Sync callers block with time.sleep, async callers with asyncio.sleep.
+
+    A request for more than `capacity` tokens waits for a full bucket and
+    then overdraws it, so it is admitted instead of waiting forever and the
+    excess still delays later callers.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate: float, capacity: Optional[float] = None) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            self.capacity = capacity if capacity is not None else max(1.0, rate)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_take(self, n: float) -> float:
+        """
+        Takes `n` tokens if available and returns 0, else returns seconds to wait.
+        """
+        with self._lock:
+            self._refill()
+            needed = min(n, self.capacity)
+            if self._tokens >= needed:
+                self._tokens -= n
+                return 0.0
+            if self.rate <= 0:
+                return float("inf")
+            return (needed - self._tokens) / self.rate
+
+    def debit(self, n: float) -> None:
+        """
+        Charges `n` tokens after the fact (may go negative, delaying later callers).
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= n
+
+    def acquire(self, n: float = 1.0, blocking: bool = True) -> bool:
+        while True:
+            wait_s = self._try_take(n)
+            if wait_s == 0.0:
+                return True
+            if not blocking:
+                return False
+            time.sleep(min(wait_s, 1.0))
+
+    async def aacquire(self, n: float = 1.0, blocking: bool = True) -> bool:
+        while True:
+            wait_s = self._try_take(n)
+            if wait_s == 0.0:
+                return True
+            if not blocking:
+                return False
+            await asyncio.sleep(min(wait_s, 1.0))
+
+
+# -----------------------------
+# Process-wide limiters, shared by every node and every concurrent run
+# -----------------------------
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+_ENV = {
+    "llm": "LLM_REQUESTS_PER_MINUTE",
+    "llm_tokens": "LLM_TOKENS_PER_MINUTE",
+    "search": "SEARCH_REQUESTS_PER_MINUTE",
+}
+
+
+def configure_limit(name: str, per_minute: Optional[float]) -> None:
+    """
+    Sets (or with None / <= 0 removes) the global limit `name` in requests
+    (or tokens) per minute. The bucket holds one minute's budget, like the
+    provider's per-minute quota, so a single prompt of a few thousand tokens
+    fits under any realistic TPM limit.
+    """
+    with _buckets_lock:
+        if not per_minute or per_minute <= 0:
+            _buckets.pop(name, None)
+            return
+        rate = per_minute / 60.0
+        if name in _buckets:
+            _buckets[name].set_rate(rate, capacity=per_minute)
+        else:
+            _buckets[name] = TokenBucket(rate, capacity=per_minute)
+
+
+def get_limit(name: str) -> Optional[TokenBucket]:
+    return _buckets.get(name)
+
+
+def acquire(name: str, n: float = 1.0) -> None:
+    bucket = _buckets.get(name)
+    if bucket is not None:
+        bucket.acquire(n)
+
+
+async def aacquire(name: str, n: float = 1.0) -> None:
+    bucket = _buckets.get(name)
+    if bucket is not None:
+        await bucket.aacquire(n)
+
+
+def debit(name: str, n: float) -> None:
+    bucket = _buckets.get(name)
+    if bucket is not None and n > 0:
+        bucket.debit(n)
+
+
+def _load_env() -> None:
+    for name, var in _ENV.items():
+        value = os.environ.get(var)
+        if value:
+            configure_limit(name, float(value))
+
+
+_load_env()
+
+
+# -----------------------------
+# LLM governor: RPM/TPM budgets, AIMD concurrency, jittered retries, deadlines
+# -----------------------------
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "16"))
+LLM_MIN_CONCURRENCY = int(os.environ.get("LLM_MIN_CONCURRENCY", "1"))
+LLM_MAX_ATTEMPTS = int(os.environ.get("LLM_MAX_ATTEMPTS", "5"))
+LLM_CALL_TIMEOUT = float(os.environ.get("LLM_CALL_TIMEOUT", "120"))  # per attempt, seconds
+LLM_DEADLINE = float(os.environ.get("LLM_DEADLINE", "300"))  # per call incl. retries, seconds
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+
+def _resolve(waiter: "asyncio.Future") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on in-flight calls: +1 per `limit` successes (additive increase),
+    halved on every throttle (multiplicative decrease), within [minimum, maximum].
+    """
+
+    def __init__(self, minimum: int = LLM_MIN_CONCURRENCY, maximum: int = LLM_MAX_CONCURRENCY):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(self.maximum)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        # (loop, future) per waiting aenter(); the governor is shared across
+        # threads and event loops, so async waiters are woken thread-safely
+        self._waiters: deque = deque()
+
+    def enter(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait(0.5)
+            self.in_flight += 1
+
+    async def aenter(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with self._cond:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+
+    def _wake(self) -> None:
+        # Under self._cond. Every waiter re-checks, like notify_all()
+        self._cond.notify_all()
+        while self._waiters:
+            loop, waiter = self._waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_resolve, waiter)
+            except RuntimeError:  # loop already closed
+                pass
+
+    def exit(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._wake()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._wake()
+
+    def on_throttle(self) -> None:
+        with self._cond:
+            self.limit = max(self.minimum, self.limit / 2)
+
+
+class Metrics:
+    """
+    Counters plus a rolling window of queue waits (time from call to dispatch).
+    """
+
+    def __init__(self, window: int = 2048):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.failures = 0
+        self.queue_wait_total = 0.0
+        self._waits: deque = deque(maxlen=window)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.queue_wait_total += seconds
+            self._waits.append(seconds)
+
+    def bump(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            pick = lambda q: round(waits[min(len(waits) - 1, int(q * len(waits)))], 4) if waits else 0.0  # noqa: E731
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "server_errors": self.server_errors,
+                "failures": self.failures,
+                "queue_wait_total_s": round(self.queue_wait_total, 3),
+                "queue_wait_p50_s": pick(0.5),
+                "queue_wait_p95_s": pick(0.95),
+                "queue_wait_max_s": round(waits[-1], 4) if waits else 0.0,
+            }
+
+
+def classify_error(exc: BaseException) -> Optional[str]:
+    """
+    "throttle" for 429 / RESOURCE_EXHAUSTED, "server" for 5xx and timeouts, None if not retryable.
+    """
+    code = None
+    # Provider wrappers often re-raise the SDK error; its status code lives on __cause__
+    for err in (exc, exc.__cause__):
+        for value in (getattr(err, "status_code", None), getattr(err, "code", None),
+                      getattr(getattr(err, "response", None), "status_code", None)):
+            if isinstance(value, int):
+                code = value
+                break
+        if code is not None:
+            break
+
+    # Numbers in the message (URLs, token counts, request ids) say nothing
+    # about the status; only the code and gRPC status names are trusted
+    text = str(exc)
+    if code == 429 or "RESOURCE_EXHAUSTED" in text:
+        return "throttle"
+    if isinstance(code, int) and 500 <= code < 600:
+        return "server"
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError)) or "UNAVAILABLE" in text or "DEADLINE_EXCEEDED" in text:
+        return "server"
+    return None
+
+
+def estimate_tokens(messages: Any) -> int:
+    return sum(len(str(getattr(m, "content", m))) for m in messages) // 4 + 1
+
+
+def _output_tokens(message: Any) -> int:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return int(usage.get("output_tokens") or 0)
+
+
+def _input_tokens(message: Any) -> int:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return int(usage.get("input_tokens") or 0)
+
+
+class LLMGovernor:
+    """
+    Process-wide admission control for chat model calls. Every attempt waits
+    for a concurrency slot, one "llm" request token and its estimated input
+    tokens from "llm_tokens"; output tokens are charged after the call. 429s
+    halve the concurrency limit and 429/5xx/timeouts retry with full jitter
+    until LLM_MAX_ATTEMPTS or the per-call LLM_DEADLINE.
+    """
+
+    def __init__(self):
+        self.concurrency = AdaptiveConcurrency()
+        self.metrics = Metrics()
+
+    def _backoff(self, attempt: int, deadline: float) -> Optional[float]:
+        delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+        if attempt + 1 >= LLM_MAX_ATTEMPTS or time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    def _failed(self, exc: BaseException, attempt: int, deadline: float) -> float:
+        """
+        Books the failure and returns how long to sleep before retrying, or re-raises.
+        """
+        kind = classify_error(exc)
+        if kind == "throttle":
+            self.metrics.bump("throttled")
+            self.concurrency.on_throttle()
+        elif kind == "server":
+            self.metrics.bump("server_errors")
+        delay = self._backoff(attempt, deadline) if kind else None
+        if delay is None:
+            self.metrics.bump("failures")
+            raise exc
+        self.metrics.bump("retries")
+        logger.warning("LLM call failed (%s), retry %d in %.1fs: %s", kind, attempt + 1, delay, exc)
+        return delay
+
+    def _admit(self, est_tokens: int) -> float:
+        t0 = time.monotonic()
+        self.concurrency.enter()
+        try:
+            acquire("llm")
+            acquire("llm_tokens", est_tokens)
+        except BaseException:
+            self.concurrency.exit()
+            raise
+        waited = time.monotonic() - t0
+        self.metrics.record_wait(waited)
+        self.metrics.bump("calls")
+        return waited
+
+    async def _aadmit(self, est_tokens: int) -> float:
+        t0 = time.monotonic()
+        await self.concurrency.aenter()
+        try:
+            await aacquire("llm")
+            await aacquire("llm_tokens", est_tokens)
+        except BaseException:  # cancelled while waiting for budget
+            self.concurrency.exit()
+            raise
+        waited = time.monotonic() - t0
+        self.metrics.record_wait(waited)
+        self.metrics.bump("calls")
+        return waited
+
+    def _succeeded(self, est_tokens: int, waited: float, started: float, messages_out: list, model: Optional[str]) -> None:
+        self.concurrency.on_success()
+        input_tokens = max((_input_tokens(m) for m in messages_out), default=0) or est_tokens
+        output_tokens = sum(_output_tokens(m) for m in messages_out)
+        debit("llm_tokens", output_tokens)
+        metrics.record_llm(waited, time.monotonic() - started, input_tokens, output_tokens, model)
+
+    def call(self, fn, messages, *args, _model: Optional[str] = None, **kwargs):
+        est = estimate_tokens(messages)
+        deadline = time.monotonic() + LLM_DEADLINE
+        attempt = 0
+        while True:
+            waited = self._admit(est)
+            started = time.monotonic()
+            # The slot is released however the attempt ends, including
+            # cancellation and other BaseExceptions
+            try:
+                result = fn(messages, *args, **kwargs)
+            except Exception as exc:
+                delay = self._failed(exc, attempt, deadline)
+            else:
+                self._succeeded(est, waited, started, [g.message for g in result.generations], _model)
+                return result
+            finally:
+                self.concurrency.exit()
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(self, fn, messages, *args, _model: Optional[str] = None, **kwargs):
+        est = estimate_tokens(messages)
+        deadline = time.monotonic() + LLM_DEADLINE
+        attempt = 0
+        while True:
+            waited = await self._aadmit(est)
+            started = time.monotonic()
+            # CancelledError (e.g. LangGraph cancelling sibling tasks) lands in finally too
+            try:
+                result = await fn(messages, *args, **kwargs)
+            except Exception as exc:
+                delay = self._failed(exc, attempt, deadline)
+            else:
+                self._succeeded(est, waited, started, [g.message for g in result.generations], _model)
+                return result
+            finally:
+                self.concurrency.exit()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stream(self, fn, messages, *args, _model: Optional[str] = None, **kwargs) -> Iterator:
+        # Only retried until the first chunk; a half-streamed answer can't be replayed
+        est = estimate_tokens(messages)
+        deadline = time.monotonic() + LLM_DEADLINE
+        attempt = 0
+        while True:
+            waited = self._admit(est)
+            started = time.monotonic()
+            chunks = []
+            # GeneratorExit from a consumer that stops reading releases the slot too
+            try:
+                for chunk in fn(messages, *args, **kwargs):
+                    chunks.append(chunk.message)
+                    yield chunk
+            except Exception as exc:
+                if chunks:
+                    self.metrics.bump("failures")
+                    raise
+                delay = self._failed(exc, attempt, deadline)
+            else:
+                self._succeeded(est, waited, started, chunks, _model)
+                return
+            finally:
+                self.concurrency.exit()
+            time.sleep(delay)
+            attempt += 1
+
+    async def astream(self, fn, messages, *args, _model: Optional[str] = None, **kwargs) -> AsyncIterator:
+        est = estimate_tokens(messages)
+        deadline = time.monotonic() + LLM_DEADLINE
+        attempt = 0
+        while True:
+            waited = await self._aadmit(est)
+            started = time.monotonic()
+            chunks = []
+            try:
+                async for chunk in fn(messages, *args, **kwargs):
+                    chunks.append(chunk.message)
+                    yield chunk
+            except Exception as exc:
+                if chunks:
+                    self.metrics.bump("failures")
+                    raise
+                delay = self._failed(exc, attempt, deadline)
+            else:
+                self._succeeded(est, waited, started, chunks, _model)
+                return
+            finally:
+                self.concurrency.exit()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.metrics.snapshot(),
+            "in_flight": self.concurrency.in_flight,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+        }
+
+
+governor = LLMGovernor()
+
+# Set while a governed call is running, so a default _agenerate that falls back
+# to _generate (or _astream to _stream) in an executor isn't admitted twice.
+_inside: ContextVar[bool] = ContextVar("llm_governed", default=False)
+
+
+class GovernedChatModelMixin:
+    """
+    Routes a chat model's network calls (_generate/_agenerate/_stream/_astream)
+    through the shared governor. Sits below LangChain's cache lookup, so cache
+    hits cost no quota.
+    """
+
+    def _model_name(self) -> Optional[str]:
+        return getattr(self, "model", None) or getattr(self, "model_name", None)
+
+    def _generate(self, messages, *args, **kwargs):
+        if _inside.get():
+            return super()._generate(messages, *args, **kwargs)
+        token = _inside.set(True)
+        try:
+            return governor.call(super()._generate, messages, *args, _model=self._model_name(), **kwargs)
+        finally:
+            _inside.reset(token)
+
+    async def _agenerate(self, messages, *args, **kwargs):
+        if _inside.get():
+            return await super()._agenerate(messages, *args, **kwargs)
+        token = _inside.set(True)
+        try:
+            return await governor.acall(super()._agenerate, messages, *args, _model=self._model_name(), **kwargs)
+        finally:
+            _inside.reset(token)
+
+    def _stream(self, messages, *args, **kwargs):
+        if _inside.get():
+            yield from super()._stream(messages, *args, **kwargs)
+            return
+        token = _inside.set(True)
+        try:
+            yield from governor.stream(super()._stream, messages, *args, _model=self._model_name(), **kwargs)
+        finally:
+            _inside.reset(token)
+
+    async def _astream(self, messages, *args, **kwargs):
+        if _inside.get():
+            async for chunk in super()._astream(messages, *args, **kwargs):
+                yield chunk
+            return
+        token = _inside.set(True)
+        try:
+            async for chunk in governor.astream(super()._astream, messages, *args, _model=self._model_name(), **kwargs):
+                yield chunk
+        finally:
+            _inside.reset(token)
+
+
+_governed: Dict[type, type] = {}
+
+
+def governed(cls: type) -> type:
+    """
+    Returns a subclass of chat model class `cls` whose calls go through the governor.
+    """
+    if cls not in _governed:
+        _governed[cls] = type(f"Governed{cls.__name__}", (GovernedChatModelMixin, cls), {})
+    return _governed[cls]
@@ -0,0 +1,96 @@
+from __future__ import annotations
+from typing import Dict, List, Sequence
+import math
+import os
+import re
+from collections import Counter
+from urllib.parse import urlparse
+
+from schemas.EvidenceSchema import EvidenceItem
+from schemas.PlanSchema import Task
+
+
+EVIDENCE_TOP_K = int(os.environ.get("WORKER_EVIDENCE_TOP_K", "8"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.+#-][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    """
+    a an and are as at be by can do for from has have how in into is it its of on or
+    that the their this to was we what when which who why will with you your vs via
+    www com https http html
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+class BM25Index:
+    """
+    Minimal Okapi BM25 over pre-tokenized documents (pure Python, no deps).
+    """
+
+    def __init__(self, docs: Sequence[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.tfs = [Counter(d) for d in docs]
+        self.lens = [len(d) for d in docs]
+        self.avgdl = (sum(self.lens) / len(self.lens)) if self.lens else 0.0
+
+        df: Counter = Counter()
+        for tf in self.tfs:
+            df.update(tf.keys())
+        n = len(self.tfs)
+        self.idf = {t: math.log(1 + (n - f + 0.5) / (f + 0.5)) for t, f in df.items()}
+
+    def scores(self, query: List[str]) -> List[float]:
+        out = []
+        for tf, dl in zip(self.tfs, self.lens):
+            norm = self.k1 * (1 - self.b + self.b * dl / self.avgdl) if self.avgdl else self.k1
+            s = 0.0
+            for t in query:
+                f = tf.get(t)
+                if f:
+                    s += self.idf[t] * f * (self.k1 + 1) / (f + norm)
+            out.append(s)
+        return out
+
+
+def evidence_terms(e: EvidenceItem) -> List[str]:
+    url = urlparse(e.url or "")
+    return tokenize(" ".join([e.title or "", e.snippet or "", e.source or "", url.netloc, url.path.replace("/", " ")]))
+
+
+def task_terms(task: Task) -> List[str]:
+    # Title and tags are the strongest signal, so they count twice
+    return tokenize(" ".join([task.title, task.title, task.goal, *task.bullets, *task.tags, *task.tags]))
+
+
+def route_evidence(
+    tasks: Sequence[Task],
+    evidence: Sequence[EvidenceItem],
+    k: int = EVIDENCE_TOP_K,
+    mode: str = "closed_book",
+) -> Dict[int, List[EvidenceItem]]:
+    """
+    Picks the top-k evidence items for every task using one BM25 index over
+    the evidence. Tasks with requires_citations=False get none, except in
+    open_book mode where every section must cite its claims.
+    Items keep their research order within each task's slice.
+    """
+    routed: Dict[int, List[EvidenceItem]] = {t.id: [] for t in tasks}
+    if not evidence or k <= 0:
+        return routed
+
+    index = BM25Index([evidence_terms(e) for e in evidence])
+    for task in tasks:
+        if not task.requires_citations and mode != "open_book":
+            continue
+        scores = index.scores(task_terms(task))
+        ranked = sorted((i for i, s in enumerate(scores) if s > 0), key=lambda i: -scores[i])[:k]
+        if not ranked:
+            # Nothing matched lexically; a citing section still needs sources
+            ranked = list(range(min(k, len(evidence))))
+        routed[task.id] = [evidence[i] for i in sorted(ranked)]
+    return routed
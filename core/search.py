@@ -0,0 +1,333 @@
+"""
+Search over everything the app has produced: saved blogs (core/blog_index.py)
+and every evidence item ever collected (core/evidence_store.py).
+
+Full-text search uses the FTS5 indexes of those two stores. With
+SEARCH_EMBEDDINGS=ollama, blogs and evidence are also embedded by a local
+Ollama embedding model and queries add nearest neighbours by cosine
+similarity; both result lists are merged with reciprocal rank fusion.
+
+The reducer calls index_blog() after writing each blog; search() is what the
+UI and `python -m workflow.search` call.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from core.blog_index import get_blog_index
+from core.evidence_store import canonical_url, get_evidence_store
+from core.sqlite_util import ThreadLocalConnection, transaction
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+
+
+SEARCH_EMBEDDINGS = os.environ.get("SEARCH_EMBEDDINGS", "off")  # off | ollama
+SEARCH_EMBED_MODEL = os.environ.get("SEARCH_EMBED_MODEL", "nomic-embed-text")
+SEARCH_VECTORS_PATH = os.environ.get("SEARCH_VECTORS_PATH", ".cache/search_vectors.sqlite")
+EMBED_TEXT_CHARS = 2000  # blog prefix embedded per document
+RRF_K = 60
+
+KINDS = ("blog", "evidence")
+
+logger = logging.getLogger(__name__)
+
+VECTOR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vectors (
+    id     INTEGER PRIMARY KEY,
+    kind   TEXT NOT NULL,
+    ref    TEXT NOT NULL,
+    model  TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    UNIQUE (model, kind, ref)
+);
+-- Each query picks up rows added since the last one: keep that a range seek
+CREATE INDEX IF NOT EXISTS ix_vectors_model_id ON vectors(model, id);
+"""
+
+
+class VectorIndex:
+    """
+    Unit-normalized float32 embeddings in SQLite, searched by brute-force
+    cosine similarity over an in-memory matrix. The matrix is loaded once
+    and then only extended with rows added since the last query, so queries
+    stay a single matrix-vector product (~50ms per 100k x 768, memory bound).
+    """
+
+    def __init__(self, embedder: "Embeddings", model: str, path: str = SEARCH_VECTORS_PATH):
+        import numpy as np
+
+        self._np = np
+        self.embedder = embedder
+        self.model = model
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded_id = 0
+        self._rows: Dict[Tuple[str, str], int] = {}
+        self._keys: List[Tuple[str, str]] = []
+        self._matrix = None
+        self._kinds = None  # KINDS index per matrix row, for filtering
+        self._n = 0
+        self._db = ThreadLocalConnection(path, VECTOR_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    def _normalize(self, vectors: Sequence[Sequence[float]]):
+        np = self._np
+        m = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(m, axis=1, keepdims=True)
+        return m / np.where(norms == 0, 1, norms)
+
+    def missing(self, kind: str, refs: Iterable[str]) -> List[str]:
+        refs = list(dict.fromkeys(refs))
+        have = set()
+        conn = self._conn()
+        for i in range(0, len(refs), 500):
+            chunk = refs[i:i + 500]
+            marks = ", ".join("?" * len(chunk))
+            have.update(r[0] for r in conn.execute(
+                f"SELECT ref FROM vectors WHERE model = ? AND kind = ? AND ref IN ({marks})",
+                [self.model, kind, *chunk],
+            ))
+        return [r for r in refs if r not in have]
+
+    def add(self, docs: List[Tuple[str, str, str]]) -> int:
+        """
+        Embeds and stores (kind, ref, text) documents, replacing earlier
+        vectors for the same (kind, ref).
+        """
+        if not docs:
+            return 0
+        vectors = self._normalize(self.embedder.embed_documents([text for _, _, text in docs]))
+        conn = self._conn()
+        with transaction(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO vectors(kind, ref, model, vector) VALUES (?, ?, ?, ?)",
+                [(kind, ref, self.model, vec.tobytes()) for (kind, ref, _), vec in zip(docs, vectors)],
+            )
+        return len(docs)
+
+    def _refresh(self) -> None:
+        np = self._np
+        new = self._conn().execute(
+            "SELECT id, kind, ref, vector FROM vectors WHERE model = ? AND id > ? ORDER BY id",
+            (self.model, self._loaded_id),
+        ).fetchall()
+        if not new:
+            return
+        dim = len(new[0][3]) // 4
+        if self._matrix is None:
+            self._matrix = np.empty((max(1024, len(new)), dim), dtype=np.float32)
+            self._kinds = np.empty(len(self._matrix), dtype=np.int8)
+        for row_id, kind, ref, blob in new:
+            key = (kind, ref)
+            pos = self._rows.get(key)
+            if pos is None:
+                if self._n == len(self._matrix):
+                    # Amortized growth: double instead of re-stacking per row
+                    grown = np.empty((len(self._matrix) * 2, dim), dtype=np.float32)
+                    grown[: self._n] = self._matrix[: self._n]
+                    self._matrix = grown
+                    self._kinds = np.resize(self._kinds, len(grown))
+                pos = self._rows[key] = self._n
+                self._keys.append(key)
+                self._n += 1
+            self._matrix[pos] = np.frombuffer(blob, dtype=np.float32)
+            self._kinds[pos] = KINDS.index(kind)
+            self._loaded_id = row_id
+
+    def query(self, text: str, kinds: Sequence[str] = KINDS, limit: int = 20) -> List[Tuple[str, str, float]]:
+        """
+        The `limit` nearest (kind, ref, cosine) documents of the given kinds.
+        """
+        np = self._np
+        q = self._normalize([self.embedder.embed_query(text)])[0]
+        with self._lock:
+            self._refresh()
+            if not self._n:
+                return []
+            scores = self._matrix[: self._n] @ q
+            keys = self._keys
+            if set(KINDS) <= set(kinds):
+                k = min(limit, self._n)
+            else:
+                wanted = np.isin(self._kinds[: self._n], [KINDS.index(k) for k in kinds])
+                scores = np.where(wanted, scores, -np.inf)
+                k = min(limit, int(wanted.sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(keys[i][0], keys[i][1], float(scores[i])) for i in top]
+
+
+_vectors: Optional[VectorIndex] = None
+_vectors_override: Optional["Embeddings"] = None
+_vectors_lock = threading.Lock()
+
+
+def set_embedder(embedder: Optional["Embeddings"], model: str = "custom") -> None:
+    """
+    Uses `embedder` for the vector index regardless of SEARCH_EMBEDDINGS
+    (offline benchmarks, fakes); None goes back to the environment setting.
+    """
+    global _vectors, _vectors_override
+    with _vectors_lock:
+        _vectors_override = embedder
+        _vectors = VectorIndex(embedder, model) if embedder is not None else None
+
+
+def get_vector_index() -> Optional[VectorIndex]:
+    """
+    Returns the process-wide vector index, or None when SEARCH_EMBEDDINGS=off.
+    """
+    global _vectors
+    if _vectors is not None:
+        return _vectors
+    if _vectors_override is None and SEARCH_EMBEDDINGS.lower() in ("", "0", "off", "false", "no"):
+        return None
+    with _vectors_lock:
+        if _vectors is None:
+            if SEARCH_EMBEDDINGS.lower() != "ollama":
+                raise ValueError(f"Unknown SEARCH_EMBEDDINGS backend: {SEARCH_EMBEDDINGS!r} (expected ollama or off)")
+            from langchain_ollama import OllamaEmbeddings
+
+            embedder = OllamaEmbeddings(
+                model=SEARCH_EMBED_MODEL,
+                base_url=os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434"),
+            )
+            _vectors = VectorIndex(embedder, SEARCH_EMBED_MODEL)
+    return _vectors
+
+
+# -----------------------------
+# Indexing
+# -----------------------------
+def _blog_text(title: str, body: str) -> str:
+    return f"{title}\n{body[:EMBED_TEXT_CHARS]}"
+
+
+def _evidence_text(row: Dict[str, Any]) -> str:
+    return f"{row.get('title') or ''}\n{row.get('snippet') or ''}"
+
+
+def index_blog(state: Dict[str, Any], path: str, markdown: str) -> None:
+    """
+    Incremental update after the reducer saved a blog: with embeddings on,
+    vectors for it and the run's evidence (research has already recorded
+    that evidence in the evidence store), then the blog itself. The blog row
+    goes last: it records the content hash the reducer checks, so a failure
+    before it is retried on the next save.
+    """
+    blogs = get_blog_index()
+    plan = state.get("plan")
+    vectors = get_vector_index()
+    if vectors is not None:
+        store = get_evidence_store()
+        evidence = state.get("evidence") or []
+        docs = []
+        if blogs is not None:
+            resolved = str(Path(path).resolve())
+            docs.append(("blog", resolved, _blog_text(plan.blog_title if plan is not None else "", markdown)))
+        if store is not None and evidence:
+            urls = [canonical_url(e["url"] if isinstance(e, dict) else e.url) for e in evidence]
+            rows = store.get_many(vectors.missing("evidence", [u for u in urls if u]))
+            docs.extend(("evidence", url, _evidence_text(row)) for url, row in rows.items())
+        vectors.add(docs)
+
+    if blogs is not None:
+        blogs.add(
+            path,
+            markdown,
+            title=plan.blog_title if plan is not None else None,
+            topic=state.get("topic", ""),
+            mode=state.get("mode", ""),
+            as_of=state.get("as_of", ""),
+        )
+
+
+def backfill(directory: str = ".", batch_size: int = 64) -> Dict[str, int]:
+    """
+    Indexes blogs saved outside the reducer (sync_directory) and embeds every
+    blog / evidence item that has no vector yet. Safe to re-run.
+    """
+    counts = {"blogs_synced": 0, "blogs_embedded": 0, "evidence_embedded": 0}
+    blogs, store, vectors = get_blog_index(), get_evidence_store(), get_vector_index()
+    if blogs is not None:
+        counts["blogs_synced"] = blogs.sync_directory(directory)
+    if vectors is None:
+        return counts
+
+    if blogs is not None:
+        todo = vectors.missing("blog", blogs.paths())
+        for i in range(0, len(todo), batch_size):
+            rows = blogs.get_many(todo[i:i + batch_size], with_body=True)
+            counts["blogs_embedded"] += vectors.add(
+                [("blog", path, _blog_text(row["title"], row["body"])) for path, row in rows.items()]
+            )
+    if store is not None:
+        todo = vectors.missing("evidence", store.urls())
+        for i in range(0, len(todo), batch_size):
+            rows = store.get_many(todo[i:i + batch_size])
+            counts["evidence_embedded"] += vectors.add(
+                [("evidence", url, _evidence_text(row)) for url, row in rows.items()]
+            )
+    return counts
+
+
+# -----------------------------
+# Querying
+# -----------------------------
+def search(
+    query: str,
+    kinds: Sequence[str] = KINDS,
+    limit: int = 20,
+    semantic: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Blogs and/or evidence matching `query`, best first. Each hit has `kind`
+    ("blog" | "evidence"), `ref` (file path or canonical URL), `title`,
+    `match` (highlighted excerpt, FTS hits only), `score` and the stored
+    metadata. semantic=None uses the vector index when one is configured.
+    """
+    blogs = get_blog_index() if "blog" in kinds else None
+    store = get_evidence_store() if "evidence" in kinds else None
+    vectors = get_vector_index() if semantic is not False else None
+    if semantic and vectors is None:
+        raise ValueError("Semantic search needs SEARCH_EMBEDDINGS=ollama")
+
+    # Reciprocal rank fusion over every ranked list
+    scores: Dict[Tuple[str, str], float] = {}
+    hits: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def rank(kind: str, ref: str, position: int, row: Optional[Dict[str, Any]]) -> None:
+        key = (kind, ref)
+        scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + position)
+        if row is not None and key not in hits:
+            hits[key] = {"kind": kind, "ref": ref, **row}
+
+    if blogs is not None:
+        for i, row in enumerate(blogs.search(query, limit)):
+            rank("blog", row["path"], i, row)
+    if store is not None:
+        for i, row in enumerate(store.search(query, limit)):
+            rank("evidence", row["key"], i, row)
+    if vectors is not None:
+        for i, (kind, ref, _) in enumerate(vectors.query(query, [k for k in kinds if k in KINDS], limit)):
+            rank(kind, ref, i, None)
+        # Rows for neighbours the full-text search didn't return
+        unseen = [key for key in scores if key not in hits]
+        if blogs is not None:
+            for path, row in blogs.get_many([r for k, r in unseen if k == "blog"]).items():
+                hits[("blog", path)] = {"kind": "blog", "ref": path, **row}
+        if store is not None:
+            for url, row in store.get_many([r for k, r in unseen if k == "evidence"]).items():
+                hits[("evidence", url)] = {"kind": "evidence", "ref": url, **row}
+
+    ranked = sorted((key for key in scores if key in hits), key=lambda k: scores[k], reverse=True)
+    return [{**hits[key], "score": round(scores[key], 6)} for key in ranked[:limit]]
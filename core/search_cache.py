@@ -0,0 +1,214 @@
+from __future__ import annotations
+from typing import List, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from core.sqlite_util import ThreadLocalConnection
+
+
+CACHE_PATH = os.environ.get("SEARCH_CACHE_PATH", ".cache/search_cache.sqlite")
+CACHE_MAX_ENTRIES = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+CACHE_MAX_BYTES = int(os.environ.get("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+def ttl_for_recency(recency_days: Optional[int]) -> int:
+    """
+    Maps the router's recency window to a cache TTL in seconds.
+
+    open_book (7 days) results go stale within hours; hybrid (45 days) and
+    closed_book (3650 days) queries are stable for much longer.
+    """
+    days = int(recency_days or 0)
+    if days <= 7:
+        return 6 * HOUR
+    if days <= 45:
+        return 3 * DAY
+    return 30 * DAY
+
+
+def normalize_query(query: str) -> str:
+    q = unicodedata.normalize("NFKC", query or "")
+    return " ".join(q.lower().split())
+
+
+def cache_key(query: str, max_results: int) -> str:
+    raw = f"{normalize_query(query)}\x00{int(max_results)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    key         TEXT PRIMARY KEY,
+    query       TEXT NOT NULL,
+    max_results INTEGER NOT NULL,
+    payload     TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    expires_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_search_cache_access ON search_cache(last_access);
+CREATE INDEX IF NOT EXISTS ix_search_cache_expires ON search_cache(expires_at);
+CREATE TABLE IF NOT EXISTS search_cache_stats (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class SearchCache:
+    """
+    SQLite-backed cache of normalized search results.
+
+    Safe to share between threads and between processes (e.g. several
+    Streamlit sessions): every thread gets its own connection and the
+    database runs in WAL mode with a busy timeout.
+    Entries expire by TTL and the least recently used ones are evicted once
+    the cache holds more than `max_entries` rows or `max_bytes` of payload.
+    """
+
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = ThreadLocalConnection(path, SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    def _bump(self, conn: sqlite3.Connection, name: str, n: int = 1) -> None:
+        conn.execute(
+            "INSERT INTO search_cache_stats(name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, n),
+        )
+
+    def get(self, query: str, max_results: int, ttl_s: Optional[int] = None) -> Optional[List[dict]]:
+        """
+        Cached results, or None. With `ttl_s`, an entry older than that is a
+        miss for this caller even if it was stored with a longer TTL (an
+        open_book lookup must not be served a closed_book entry's results).
+        """
+        key = cache_key(query, max_results)
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT payload, expires_at, created_at FROM search_cache WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is not None and row[1] <= now:
+            conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+            row = None
+        if row is None or (ttl_s is not None and now - row[2] > ttl_s):
+            # Too old for this caller only; the entry stays for longer-TTL lookups
+            with self._lock:
+                self.misses += 1
+            self._bump(conn, "misses")
+            return None
+
+        conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+        with self._lock:
+            self.hits += 1
+        self._bump(conn, "hits")
+        return json.loads(row[0])
+
+    def put(self, query: str, max_results: int, results: List[dict], ttl_s: int) -> None:
+        payload = json.dumps(results, ensure_ascii=False)
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO search_cache"
+            "(key, query, max_results, payload, size, created_at, expires_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                cache_key(query, max_results),
+                normalize_query(query),
+                int(max_results),
+                payload,
+                len(payload),
+                now,
+                now + ttl_s,
+                now,
+            ),
+        )
+        self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        evicted = conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,)).rowcount
+
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_cache"
+        ).fetchone()
+        if count > self.max_entries or total > self.max_bytes:
+            # Walk rows from least recently used until both bounds hold.
+            drop = []
+            for key, size in conn.execute(
+                "SELECT key, size FROM search_cache ORDER BY last_access ASC"
+            ).fetchall():
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                drop.append((key,))
+                count -= 1
+                total -= size
+            conn.executemany("DELETE FROM search_cache WHERE key = ?", drop)
+            evicted += len(drop)
+
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+            self._bump(conn, "evictions", evicted)
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM search_cache")
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_cache"
+        ).fetchone()
+        persisted = dict(conn.execute("SELECT name, value FROM search_cache_stats").fetchall())
+        return {
+            "entries": count,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "total_hits": persisted.get("hits", 0),
+            "total_misses": persisted.get("misses", 0),
+            "total_evictions": persisted.get("evictions", 0),
+        }
+
+
+_cache: Optional[SearchCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """
+    Returns the process-wide search cache, or None when SEARCH_CACHE=off.
+    """
+    global _cache
+    if os.environ.get("SEARCH_CACHE", "on").lower() in ("0", "off", "false", "no"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SearchCache()
+    return _cache
@@ -0,0 +1,69 @@
+"""
+SQLite plumbing shared by the local stores (search cache, LLM cache,
+checkpoints, blog index, evidence store, search vectors): each thread gets
+its own autocommit connection to a WAL-mode file with a busy timeout, so a
+store is safe to share between threads, processes and Streamlit sessions.
+"""
+from __future__ import annotations
+from typing import Iterator, Optional
+from contextlib import contextmanager
+import sqlite3
+import threading
+from pathlib import Path
+
+
+BUSY_TIMEOUT_S = 30
+
+
+def connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class ThreadLocalConnection:
+    """
+    One lazily opened connection per thread to the SQLite file at `path`.
+    Creates the parent directory and applies `schema` (idempotent DDL) once.
+    """
+
+    def __init__(self, path: str, schema: Optional[str] = None):
+        self.path = path
+        self._local = threading.local()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if schema:
+            self.get().executescript(schema)
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Explicit transaction on an autocommit connection: COMMIT on success,
+    ROLLBACK on any exception (including cancellation).
+    """
+    conn.execute("BEGIN")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def add_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> bool:
+    """
+    Adds `column` to a table created by an older schema. Returns True if it
+    was missing.
+    """
+    if column in {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}:
+        return False
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    return True
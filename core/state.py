@@ -15,6 +15,7 @@ class State(TypedDict):
     queries: List[str]
     evidence: List[EvidenceItem]
     plan: Optional[Plan]
+    research_stats: dict  # prefilter counts (raw / dropped / kept, prompt chars), evidence store hits
 
     # NEW: recency control
     as_of: str           # ISO date, e.g. "2026-01-29"
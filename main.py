@@ -1,90 +1,57 @@
 from __future__ import annotations
 
 import json
-import os
-import re
-import zipfile
 from datetime import date
-from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict, Optional, List, Iterator, Tuple
+from typing import Optional
 import pandas as pd 
 import streamlit as st 
+from core.env import load_env
+
+load_env()  # before the core modules below read their settings
+
 from workflow.graph import create_app  
+from workflow.stream import try_stream, extract_latest_state
+from core.checkpoint import new_thread_id
+from core.metrics import serve_prometheus
+from workflow.regenerate import regenerate_sections
+from core.artifacts import get_artifact_store
+from core.export import FORMATS as EXPORT_FORMATS, export_bytes
+from core.blog_index import FTS_RANK_WINDOW, BlogIndex, get_blog_index, safe_slug, title_from_md
+from core.search import KINDS as SEARCH_KINDS, search as search_all
 
 
 
 graph_app = create_app()
+serve_prometheus()  # only when METRICS_PORT is set; started once per process
 # -----------------------------
-# Helpers
+# Export downloads (core/export.py formats)
 # -----------------------------
-def safe_slug(title: str) -> str:
-    s = title.strip().lower()
-    s = re.sub(r"[^a-z0-9 _-]+", "", s)
-    s = re.sub(r"\s+", "_", s).strip("_")
-    return s or "blog"
-
-
-def bundle_zip(md_text: str, md_filename: str) -> bytes:
-    
-    buf = BytesIO()
-    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as z:
-        z.writestr(md_filename, md_text.encode("utf-8"))
-    return buf.getvalue()
-
-
-def try_stream(graph_app, inputs: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
-    try:
-        for step in graph_app.stream(inputs, stream_mode="updates"):
-            yield ("updates", step)
-        out = graph_app.invoke(inputs)
-        yield ("final", out)
-        return
-    except Exception:
-        pass
-
-    try:
-        for step in graph_app.stream(inputs, stream_mode="values"):
-            yield ("values", step)
-        out = graph_app.invoke(inputs)
-        yield ("final", out)
-        return
-    except Exception:
-        pass
-
-    out = graph_app.invoke(inputs)
-    yield ("final", out)
-
-
-def extract_latest_state(current_state: Dict[str, Any], step_payload: Any) -> Dict[str, Any]:
-    if isinstance(step_payload, dict):
-        if len(step_payload) == 1 and isinstance(next(iter(step_payload.values())), dict):
-            inner = next(iter(step_payload.values()))
-            current_state.update(inner)
-        else:
-            current_state.update(step_payload)
-    return current_state
+EXPORT_BUTTONS = {
+    "html": "🌐 HTML",
+    "print": "🖨️ PDF-ready HTML",
+    "json": "🧾 JSON bundle",
+    "zip": "📦 ZIP (all formats)",
+}
 
 
 # -----------------------------
 # Past blogs helpers
 # -----------------------------
-def list_past_blogs() -> List[Path]:
-    cwd = Path(".")
-    files = [p for p in cwd.glob("*.md") if p.is_file()]
-    files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-    return files
+PAST_BLOGS_PAGE_SIZE = 20
 
 
-def read_md_file(p: Path) -> str:
-    return p.read_text(encoding="utf-8", errors="replace")
+@st.cache_resource
+def sync_blog_index() -> Optional[BlogIndex]:
+    # Once per process: index blogs saved before the index existed (or outside the app)
+    index = get_blog_index()
+    if index is not None:
+        index.sync_directory(".")
+    return index
 
 
-def extract_title_from_md(md: str, fallback: str) -> str:
-    for line in md.splitlines():
-        if line.startswith("# "):
-            return line[2:].strip() or fallback
-    return fallback
+def read_md_file(p: Path) -> str:
+    return p.read_text(encoding="utf-8", errors="replace")
 
 
 # -----------------------------
@@ -205,37 +172,68 @@ with st.sidebar:
     as_of = st.date_input("As-of date", value=date.today())
     run_btn = st.button("🚀 Generate Blog", type="primary")
 
+    # A failed run is checkpointed; resuming skips every step that already finished
+    resume_btn = False
+    if st.session_state.get("failed_thread"):
+        resume_btn = st.button("🔁 Resume failed run")
+
     # Past blogs
     st.divider()
     st.subheader("Past Blogs")
 
-    past_files = list_past_blogs()
-    if not past_files:
+    # Metadata comes from the blog index; a file is only read when it is loaded
+    blog_index = sync_blog_index()
+    if blog_index is None:
+        st.caption("Blog index is off (BLOG_INDEX=off).")
+        rows, total = [], 0
+    else:
+        blog_query = st.text_input("Search blogs", placeholder="title, topic or text")
+        if st.session_state.get("past_query") != blog_query:
+            st.session_state["past_query"] = blog_query
+            st.session_state["past_page"] = 0
+        page = st.session_state.get("past_page", 0)
+        rows, total = blog_index.page(blog_query, offset=page * PAST_BLOGS_PAGE_SIZE, limit=PAST_BLOGS_PAGE_SIZE)
+
+    if not rows:
         st.caption("No saved blogs found.")
         selected_md_file = None
     else:
-        options = []
+        pages = (total + PAST_BLOGS_PAGE_SIZE - 1) // PAST_BLOGS_PAGE_SIZE
         file_by_label = {}
-        for p in past_files[:50]:
-            try:
-                md_text = read_md_file(p)
-                title = extract_title_from_md(md_text, p.stem)
-            except Exception:
-                title = p.stem
-            label = f"{title} · {p.name}"
-            options.append(label)
-            file_by_label[label] = p
-
-        selected_label = st.radio("Select blog", options=options)
+        for row in rows:
+            details = " · ".join(str(v) for v in (row["mode"], row["as_of"], f"{row['word_count']} words") if v)
+            label = f"{row['title']} · {details}"
+            if label in file_by_label:
+                label = f"{label} · {Path(row['path']).name}"
+            file_by_label[label] = Path(row["path"])
+
+        selected_label = st.radio("Select blog", options=list(file_by_label))
         selected_md_file = file_by_label[selected_label]
 
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        if prev_col.button("◀", disabled=page == 0):
+            st.session_state["past_page"] = page - 1
+            st.rerun()
+        # A search counts at most FTS_RANK_WINDOW matches (the ones it ranks)
+        shown = f"{total}+" if blog_query and total >= FTS_RANK_WINDOW else str(total)
+        page_col.caption(f"Page {page + 1} / {pages} · {shown} blogs")
+        if next_col.button("▶", disabled=page + 1 >= pages):
+            st.session_state["past_page"] = page + 1
+            st.rerun()
+
         if st.button("📂 Load Blog"):
-            md_text = read_md_file(selected_md_file)
-            st.session_state["last_out"] = {
-                "plan": None,
-                "evidence": [],
-                "final": md_text,
-            }
+            if not selected_md_file.exists():
+                blog_index.remove(str(selected_md_file))
+                st.error(f"{selected_md_file.name} no longer exists; removed it from the list.")
+            else:
+                md_text = read_md_file(selected_md_file)
+                st.session_state.pop("thread_id", None)
+                st.session_state.pop("run_metrics", None)
+                st.session_state["last_out"] = {
+                    "plan": None,
+                    "evidence": [],
+                    "final": md_text,
+                }
 
 
 # Storage
@@ -244,8 +242,8 @@ if "last_out" not in st.session_state:
 
 
 # Tabs (NO IMAGES TAB)
-tab_plan, tab_evidence, tab_preview, tab_logs = st.tabs(
-    ["🧩 Plan", "🔎 Evidence", "📝 Markdown Preview", "🧾 Logs"]
+tab_plan, tab_evidence, tab_preview, tab_logs, tab_search = st.tabs(
+    ["🧩 Plan", "🔎 Evidence", "📝 Markdown Preview", "🧾 Logs", "🗂️ Search"]
 )
 
 logs = []
@@ -256,53 +254,97 @@ def log(msg: str):
 
 
 # Run Agent
-if run_btn:
-    if not topic.strip():
+if run_btn or resume_btn:
+    if run_btn and not topic.strip():
         st.warning("Enter topic")
         st.stop()
 
-    inputs = {
-        "topic": topic.strip(),
-        "mode": "",
-        "needs_research": False,
-        "queries": [],
-        "evidence": [],
-        "plan": None,
-        "as_of": as_of.isoformat(),
-        "recency_days": 7,
-        "sections": [],
-        "final": "",
-    }
+    if resume_btn:
+        thread_id = st.session_state["failed_thread"]
+        inputs = None
+    else:
+        thread_id = new_thread_id()
+        inputs = {
+            "topic": topic.strip(),
+            "mode": "",
+            "needs_research": False,
+            "queries": [],
+            "evidence": [],
+            "plan": None,
+            "as_of": as_of.isoformat(),
+            "recency_days": 7,
+            "sections": [],
+            "final": "",
+        }
 
     status = st.status("Running graph...", expanded=True)
     progress_area = st.empty()
+    drafts_area = st.container()
     current_state = {}
     last_node = None
 
-    for kind, payload in try_stream(graph_app, inputs):
-        if kind in ("updates", "values"):
-            node_name = None
-            if isinstance(payload, dict) and len(payload) == 1:
-                node_name = list(payload.keys())[0]
-
-            if node_name and node_name != last_node:
-                status.write(f"➡️ Node: `{node_name}`")
-                last_node = node_name
+    # Live section drafts: one placeholder per task, in plan order
+    section_slots = {}
+    section_text = {}
 
-            current_state = extract_latest_state(current_state, payload)
+    def ensure_section_slots():
+        plan = current_state.get("plan")
+        if plan is None or section_slots:
+            return
+        drafts_area.subheader("Drafting sections")
+        for task in plan.tasks:
+            section_slots[task.id] = drafts_area.empty()
+            section_slots[task.id].caption(f"⏳ {task.title}")
 
-            summary = {
-                "mode": current_state.get("mode"),
-                "needs_research": current_state.get("needs_research"),
-                "queries": current_state.get("queries", [])[:3],
-                "evidence_count": len(current_state.get("evidence", []) or []),
-            }
-            progress_area.json(summary)
-            log(json.dumps(payload, default=str)[:1000])
-
-        elif kind == "final":
-            st.session_state["last_out"] = payload
-            status.update(label="✅ Done", state="complete", expanded=False)
+    try:
+        for kind, payload in try_stream(graph_app, inputs, stream_tokens=True, thread_id=thread_id):
+            if kind in ("updates", "values"):
+                node_name = None
+                if isinstance(payload, dict) and len(payload) == 1:
+                    node_name = list(payload.keys())[0]
+
+                if node_name and node_name != last_node:
+                    status.write(f"➡️ Node: `{node_name}`")
+                    last_node = node_name
+
+                current_state = extract_latest_state(current_state, payload)
+
+                summary = {
+                    "mode": current_state.get("mode"),
+                    "needs_research": current_state.get("needs_research"),
+                    "queries": current_state.get("queries", [])[:3],
+                    "evidence_count": len(current_state.get("evidence", []) or []),
+                    "research_stats": current_state.get("research_stats"),
+                }
+                progress_area.json(summary)
+                log(json.dumps(payload, default=str)[:1000])
+
+                ensure_section_slots()
+                # Sections come from workers, or from orchestrator when written early
+                for node_update in (payload.get("worker"), payload.get("orchestrator")):
+                    for task_id, section_md in (node_update or {}).get("sections", []):
+                        if task_id in section_slots:
+                            section_slots[task_id].markdown(section_md)
+
+            elif kind == "section_token":
+                ensure_section_slots()
+                task_id, text = payload
+                section_text[task_id] = section_text.get(task_id, "") + text
+                if task_id in section_slots:
+                    section_slots[task_id].markdown(section_text[task_id])
+
+            elif kind == "metrics":
+                st.session_state["run_metrics"] = payload
+
+            elif kind == "final":
+                st.session_state["last_out"] = payload
+                st.session_state["thread_id"] = thread_id
+                st.session_state.pop("failed_thread", None)
+                status.update(label="✅ Done", state="complete", expanded=False)
+    except Exception as exc:
+        st.session_state["failed_thread"] = thread_id
+        status.update(label="❌ Failed", state="error", expanded=True)
+        st.error(f"Run failed: {exc}. Use 'Resume failed run' to retry only the unfinished steps.")
 
 
 # Render Output
@@ -334,40 +376,97 @@ if out:
     # PREVIEW TAB
     with tab_preview:
         st.subheader("Markdown Preview")
+
+        # Rewrite chosen sections of the current run; plan and evidence are reused
+        run_plan = out.get("plan")
+        if st.session_state.get("thread_id") and hasattr(run_plan, "tasks"):
+            with st.expander("♻️ Regenerate sections"):
+                titles = {t.id: t.title for t in run_plan.tasks}
+                picked = st.multiselect("Sections", options=list(titles), format_func=lambda i: f"{i}. {titles[i]}")
+                if st.button("Regenerate selected", disabled=not picked):
+                    with st.spinner(f"Rewriting {len(picked)} section(s)..."):
+                        st.session_state["last_out"] = regenerate_sections(graph_app, st.session_state["thread_id"], picked)
+                    st.rerun()
+
         final_md = out.get("final", "")
         st.markdown(final_md)
 
-        blog_title = extract_title_from_md(final_md, "blog")
+        blog_title = title_from_md(final_md, "blog")
         filename = f"{safe_slug(blog_title)}.md"
-        zip_filename = f"{safe_slug(blog_title)}.zip"
-
-    # ===============================
-    # FIX: SAVE FILE TO DISK
-    # ===============================
-        os.makedirs("downloads", exist_ok=True)
-        md_path = os.path.join("downloads", filename)
-        zip_path = os.path.join("downloads", zip_filename)
-
-    # Save markdown file
-    with open(md_path, "w", encoding="utf-8") as f:
-        f.write(final_md)
 
-    # Save zip file
-    zip_data = bundle_zip(final_md, filename)
-    with open(zip_path, "wb") as f:
-        f.write(zip_data)
-
-    # Download buttons (file-based)
-    with open(md_path, "rb") as f:
-        st.download_button("⬇️ Download Markdown", f, file_name=filename)
-
-    with open(zip_path, "rb") as f:
-        st.download_button("📦 Download ZIP", f, file_name=zip_filename)
+        # The reducer already saved this Markdown (its only copy on disk); the
+        # download is served from the same bytes in memory
+        md_bytes = final_md.encode("utf-8")
+
+    # Download buttons: Markdown from memory; the other formats are rendered
+    # (once per blog content, see core/export.py) and saved only on click
+    st.download_button("⬇️ Download Markdown", md_bytes, file_name=filename, mime="text/markdown", on_click="ignore")
+    export_cols = st.columns(len(EXPORT_BUTTONS))
+    for col, (fmt, label) in zip(export_cols, EXPORT_BUTTONS.items()):
+        col.download_button(
+            label,
+            lambda fmt=fmt: export_bytes(out, fmt, get_artifact_store()),
+            file_name=f"{safe_slug(blog_title)}{EXPORT_FORMATS[fmt][0]}",
+            mime=EXPORT_FORMATS[fmt][1],
+            on_click="ignore",
+        )
 
     # LOGS TAB
     with tab_logs:
+        run_metrics = st.session_state.get("run_metrics")
+        if run_metrics:
+            st.subheader("Run summary")
+            totals = run_metrics["totals"]
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Wall time", f"{run_metrics['wall_s']:.1f}s")
+            c2.metric("LLM calls", int(totals["llm_calls"]))
+            c3.metric("Tokens in / out", f"{int(totals['input_tokens'])} / {int(totals['output_tokens'])}")
+            c4.metric("Est. cost", f"${totals['cost_usd']:.4f}")
+            st.caption("Per node")
+            st.dataframe(pd.DataFrame.from_dict(run_metrics["nodes"], orient="index"), use_container_width=True)
+            if run_metrics["tasks"]:
+                st.caption("Per worker task")
+                st.dataframe(pd.DataFrame.from_dict(run_metrics["tasks"], orient="index"), use_container_width=True)
+            st.caption(f"Search: {run_metrics['search']}")
+            critical_path = run_metrics.get("critical_path") or {}
+            if critical_path.get("steps"):
+                st.caption(f"Critical path ({critical_path['total_s']:.1f}s): slowest node of each graph step")
+                st.dataframe(pd.DataFrame(critical_path["steps"]), use_container_width=True)
+            st.download_button(
+                "⬇️ Run report (JSON)",
+                json.dumps(run_metrics, indent=2),
+                file_name=f"run_{run_metrics['run_id'] or 'report'}.json",
+                mime="application/json",
+            )
+
         st.subheader("Logs")
         st.text_area("Logs", "\n".join(logs[-100:]), height=500)
 
 else:
-    st.info("Enter topic and generate blog.")
\ No newline at end of file
+    st.info("Enter topic and generate blog.")
+
+
+# SEARCH TAB: past blogs and every evidence item collected so far
+with tab_search:
+    st.subheader("Search blogs and evidence")
+    q_col, kind_col = st.columns([3, 1])
+    search_query = q_col.text_input("Query", key="search_query", placeholder="e.g. vector databases")
+    search_kinds = kind_col.multiselect("In", options=list(SEARCH_KINDS), default=list(SEARCH_KINDS))
+    if search_query.strip() and search_kinds:
+        try:
+            hits = search_all(search_query, kinds=search_kinds, limit=30)
+        except Exception as exc:
+            # Semantic search needs the Ollama embedding server; full-text still works without it
+            st.warning(f"Semantic search unavailable ({exc}); showing full-text matches only.")
+            hits = search_all(search_query, kinds=search_kinds, limit=30, semantic=False)
+        if not hits:
+            st.info("No matches.")
+        for hit in hits:
+            if hit["kind"] == "blog":
+                meta = " · ".join(str(v) for v in (hit.get("mode"), hit.get("as_of"), f"{hit.get('word_count')} words") if v)
+                st.markdown(f"**📝 {hit['title']}**  \n`{Path(hit['ref']).name}` · {meta}")
+            else:
+                meta = " · ".join(str(v) for v in (hit.get("source"), hit.get("published_at")) if v)
+                st.markdown(f"**🔗 [{hit['title']}]({hit.get('url') or hit['ref']})**  \n{meta}")
+            if hit.get("match"):
+                st.caption(" ".join(hit["match"].split()))
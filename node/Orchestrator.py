@@ -1,12 +1,25 @@
+from typing import Iterable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import os
 from core.state import State 
-from schemas.PlanSchema import Plan 
+from schemas.PlanSchema import Plan,Task 
 from langchain_core.messages import HumanMessage,SystemMessage 
 from langgraph.types import Send 
 from core.llm import get_llm 
+from core.relevance import route_evidence 
+from core.metrics import instrument 
+from node.worker import worker_node,aworker_node 
 from langsmith import traceable
 
-llm = get_llm()
 
+# Hybrid topics only: draft the plan from the topic while research runs, then
+# patch the research-dependent tasks once evidence arrives (node/Reconcile.py)
+SPECULATIVE_PLANNING = os.environ.get("SPECULATIVE_PLANNING", "off")  # on | off
+# With a speculative draft, also write the sections that need neither research
+# nor citations inside the planning step, while research is still running
+EARLY_DISPATCH = os.environ.get("EARLY_DISPATCH", "off")  # on | off
 
 
 
@@ -49,56 +62,148 @@ Grounding rules:
 
 Output must strictly match the Plan schema.
 """
-@traceable(name="Orchestrator_Node")
-def orchestrator_node(state: State) -> dict:
-    planner = llm.with_structured_output(Plan)
+def _orchestrator_messages(state: State) -> list:
     evidence = state.get("evidence", [])
     mode = state.get("mode", "closed_book")
+    forced_kind = mode == "open_book"
 
-    # Force blog_kind for open_book
-    forced_kind = "news_roundup" if mode == "open_book" else None
-
-    plan = planner.invoke(
-        [
-            SystemMessage(content=ORCH_SYSTEM),
-            HumanMessage(
-                content=(
-                    f"Topic: {state['topic']}\n"
-                    f"Mode: {mode}\n"
-                    f"As-of: {state['as_of']} (recency_days={state['recency_days']})\n"
-                    f"{'Force blog_kind=news_roundup' if forced_kind else ''}\n\n"
-                    f"Evidence (ONLY use for fresh claims; may be empty):\n"
-                    f"{[e.model_dump() for e in evidence][:16]}\n\n"
-                    f"Instruction: If mode=open_book, your plan must NOT drift into a tutorial."
-                )
-            ),
-        ]
-    )
-
+    return [
+        SystemMessage(content=ORCH_SYSTEM),
+        HumanMessage(
+            content=(
+                f"Topic: {state['topic']}\n"
+                f"Mode: {mode}\n"
+                f"As-of: {state['as_of']} (recency_days={state['recency_days']})\n"
+                f"{'Force blog_kind=news_roundup' if forced_kind else ''}\n\n"
+                f"Evidence (ONLY use for fresh claims; may be empty):\n"
+                f"{[e.model_dump() for e in evidence[:16]]}\n\n"
+                f"Instruction: If mode=open_book, your plan must NOT drift into a tutorial."
+            )
+        ),
+    ]
+
+
+def _orchestrator_update(state: State, plan: Plan) -> dict:
     # Ensure open_book forces the kind even if model forgets
-    if forced_kind:
+    if state.get("mode", "closed_book") == "open_book":
         plan.blog_kind = "news_roundup"
 
     return {"plan": plan}
 
 
+def _early_payloads(state: State, plan: Plan) -> List[dict]:
+    if not early_dispatch(state):
+        return []
+    ids = [task.id for task in plan.tasks if evidence_independent(task)]
+    return worker_payloads({**state, "plan": plan}, ids) if ids else []
+
+
+@traceable(name="Orchestrator_Node")
+def orchestrator_node(state: State) -> dict:
+    planner = get_llm("orchestrator").with_structured_output(Plan)
+    plan = planner.invoke(_orchestrator_messages(state))
+    update = _orchestrator_update(state, plan)
+
+    payloads = _early_payloads(state, update["plan"])
+    if payloads:
+        # Recorded as worker calls (per task) in the run metrics
+        write = instrument("worker", worker_node)
+        with ThreadPoolExecutor(max_workers=len(payloads), thread_name_prefix="early-worker") as pool:
+            # Each section runs in a copy of this node's context (run metrics, stream callbacks)
+            futures = [pool.submit(contextvars.copy_context().run, write, p) for p in payloads]
+            results = [f.result() for f in futures]
+        update["sections"] = [section for r in results for section in r["sections"]]
+    return update
+
+
+@traceable(name="Orchestrator_Node")
+async def aorchestrator_node(state: State) -> dict:
+    planner = get_llm("orchestrator").with_structured_output(Plan)
+    plan = await planner.ainvoke(_orchestrator_messages(state))
+    update = _orchestrator_update(state, plan)
+
+    payloads = _early_payloads(state, update["plan"])
+    if payloads:
+        write = instrument("worker", aworker_node)
+        results = await asyncio.gather(*(write(p) for p in payloads))
+        update["sections"] = [section for r in results for section in r["sections"]]
+    return update
+
+
 # -----------------------------
 # 6) Fanout
 # -----------------------------
+def worker_brief(state: State, plan: Plan) -> dict:
+    """
+    The blog-level context every section prompt needs: a few strings instead
+    of the whole Plan (every other task) in each worker's payload.
+    """
+    return {
+        "topic": state["topic"],
+        "mode": state["mode"],
+        "as_of": state["as_of"],
+        "recency_days": state["recency_days"],
+        "blog_title": plan.blog_title,
+        "audience": plan.audience,
+        "tone": plan.tone,
+        "blog_kind": plan.blog_kind,
+        "constraints": list(plan.constraints),
+    }
+
+
+def worker_payloads(state: State, task_ids: Optional[Iterable[int]] = None) -> List[dict]:
+    """
+    Builds the worker input for every task in the plan (or only `task_ids`):
+    the task, its routed evidence slice and the shared brief. With a
+    checkpointer every pending Send is stored on its own, so nothing in a
+    payload should grow with the plan or the full evidence list.
+    """
+    plan = state["plan"]
+    # Built once; in process every payload references the same dict
+    brief = worker_brief(state, plan)
+    # Each worker only sees the evidence ranked relevant to its own section
+    routed = route_evidence(plan.tasks, state.get("evidence", []), mode=state["mode"])
+    wanted = None if task_ids is None else set(task_ids)
+    return [
+        {"brief": brief, "task": task, "evidence": routed[task.id]}
+        for task in plan.tasks
+        if wanted is None or task.id in wanted
+    ]
+
+
 def fanout(state: State):
     assert state["plan"] is not None
-    return [
-        Send(
-            "worker",
-            {
-                "task": task.model_dump(),
-                "topic": state["topic"],
-                "mode": state["mode"],
-                "as_of": state["as_of"],
-                "recency_days": state["recency_days"],
-                "plan": state["plan"].model_dump(),
-                "evidence": [e.model_dump() for e in state.get("evidence", [])],
-            },
-        )
-        for task in state["plan"].tasks
-    ]
\ No newline at end of file
+    payloads = worker_payloads(state)
+    if early_dispatch(state):
+        # Already written during planning (see orchestrator_node)
+        payloads = [p for p in payloads if not evidence_independent(p["task"])]
+    if not payloads:
+        # Every section is written already (or the plan is empty): the reducer
+        # is only reachable through a worker otherwise
+        return "reducer"
+    return [Send("worker", payload) for payload in payloads]
+
+
+def speculative(state: State) -> bool:
+    return (
+        SPECULATIVE_PLANNING.lower() in ("1", "true", "yes", "on")
+        and bool(state.get("needs_research"))
+        and state.get("mode") == "hybrid"
+    )
+
+
+def early_dispatch(state: State) -> bool:
+    return speculative(state) and EARLY_DISPATCH.lower() in ("1", "true", "yes", "on")
+
+
+def evidence_independent(task: Task) -> bool:
+    return not task.requires_research and not task.requires_citations
+
+
+def after_research(state: State) -> str:
+    return "reconcile" if speculative(state) else "orchestrator"
+
+
+def after_plan(state: State):
+    # A speculative draft waits for research in reconcile before fanning out
+    return "reconcile" if speculative(state) else fanout(state)
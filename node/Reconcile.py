@@ -0,0 +1,72 @@
+from typing import Optional
+from core.state import State
+from schemas.PlanSchema import Plan,PlanPatch
+from langchain_core.messages import HumanMessage,SystemMessage
+from core.llm import get_llm
+from langsmith import traceable
+
+
+RECONCILE_SYSTEM = """You are revising a draft outline for a technical blog post.
+The draft was written before web research finished; the evidence is now available.
+
+Only the sections listed below depend on fresh information. For each of them:
+- Keep the section's title and scope.
+- Rewrite goal and 3–6 bullets so fresh claims (models/tools/releases/numbers) come from the evidence.
+- Set requires_citations=true if the section should cite evidence URLs, false if the evidence does not support it.
+
+Do NOT add, remove or reorder sections. Omit a section entirely if it needs no change.
+Output must strictly match the PlanPatch schema.
+"""
+def _reconcile_messages(state: State) -> Optional[list]:
+    plan: Plan = state["plan"]
+    evidence = state.get("evidence", [])
+    flagged = [t for t in plan.tasks if t.requires_research]
+    # Nothing to ground, or nothing that depends on it: keep the draft as is
+    if not flagged or not evidence:
+        return None
+
+    return [
+        SystemMessage(content=RECONCILE_SYSTEM),
+        HumanMessage(
+            content=(
+                f"Topic: {state['topic']}\n"
+                f"As-of: {state['as_of']} (recency_days={state['recency_days']})\n"
+                f"Blog title: {plan.blog_title}\n\n"
+                f"Sections to revise:\n"
+                f"{[t.model_dump(include={'id', 'title', 'goal', 'bullets'}) for t in flagged]}\n\n"
+                f"Evidence:\n"
+                f"{[e.model_dump() for e in evidence[:16]]}"
+            )
+        ),
+    ]
+
+
+def _reconcile_update(state: State, patch: PlanPatch) -> dict:
+    plan: Plan = state["plan"]
+    # Patches only ever touch research-dependent tasks; anything else is ignored
+    patches = {p.id: p for p in patch.tasks}
+    tasks = [
+        task.model_copy(update=patches[task.id].model_dump(exclude={"id"}))
+        if task.requires_research and task.id in patches
+        else task
+        for task in plan.tasks
+    ]
+    return {"plan": plan.model_copy(update={"tasks": tasks})}
+
+
+@traceable(name="Reconcile_Node")
+def reconcile_node(state: State) -> dict:
+    messages = _reconcile_messages(state)
+    if messages is None:
+        return {}
+    patcher = get_llm("reconcile").with_structured_output(PlanPatch)
+    return _reconcile_update(state, patcher.invoke(messages))
+
+
+@traceable(name="Reconcile_Node")
+async def areconcile_node(state: State) -> dict:
+    messages = _reconcile_messages(state)
+    if messages is None:
+        return {}
+    patcher = get_llm("reconcile").with_structured_output(PlanPatch)
+    return _reconcile_update(state, await patcher.ainvoke(messages))
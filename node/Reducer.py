@@ -1,22 +1,63 @@
 from core.state import State 
-from pathlib import Path
+from core.search import index_blog 
+from core.artifacts import get_artifact_store 
+from core.blog_index import get_blog_index 
+import asyncio
+import logging 
 import re 
 from langsmith import traceable
 
 
+logger = logging.getLogger(__name__)
 
 
-@traceable(name = "Reducer_Node")
-def reducer_node(state: State) -> dict:
+
+
+def _render(state: State) -> tuple[str, str]:
     plan = state["plan"]
     if plan is None:
         raise ValueError("Reducer called without a plan.")
 
-    ordered_sections = [md for _, md in sorted(state["sections"], key=lambda x: x[0])]
+    # sections is append-only; a regenerated section supersedes the earlier one
+    latest = dict(state["sections"])
+    ordered_sections = [latest[task_id] for task_id in sorted(latest)]
     body = "\n\n".join(ordered_sections).strip()
     final_md = f"# {plan.blog_title}\n\n{body}\n"
 
     filename = f"{plan.blog_title}.md"
-    Path(filename).write_text(final_md, encoding="utf-8")
+    return filename, final_md
+
+
+def _save(state: State, filename: str, final_md: str) -> None:
+    # Atomic, and skipped when the file already holds this blog (resumed or
+    # regenerated runs whose sections came out the same). This is the only
+    # copy of the Markdown; the UI serves its download from the same content.
+    blog = get_artifact_store(".").put(filename, final_md)
+
+    # Blog index, evidence archive and search vectors only mirror the file and
+    # the run's evidence, so a failure here must not fail the run. Keyed on
+    # the content hash, not on whether the file was written: an unchanged
+    # file whose earlier index update failed is indexed again.
+    try:
+        index = get_blog_index()
+        if index is None or index.content_hash(str(blog.path)) != blog.sha256:
+            index_blog(state, filename, final_md)
+    except Exception as exc:
+        logger.warning("search index update failed for %s: %s", filename, exc)
+
+
+@traceable(name = "Reducer_Node")
+def reducer_node(state: State) -> dict:
+    filename, final_md = _render(state)
+    _save(state, filename, final_md)
+
+    return {"final": final_md}
+
+
+@traceable(name = "Reducer_Node")
+async def areducer_node(state: State) -> dict:
+    filename, final_md = _render(state)
+    # Keep the blocking file write and index update off the event loop
+    await asyncio.to_thread(_save, state, filename, final_md)
 
-    return {"final": final_md}
\ No newline at end of file
+    return {"final": final_md}
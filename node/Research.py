@@ -1,16 +1,39 @@
 from __future__ import annotations
-from typing import List,Optional  
+from typing import Awaitable,Callable,Dict,List,Optional
 from datetime import date,datetime,timedelta 
+from concurrent.futures import FIRST_COMPLETED,ThreadPoolExecutor,wait 
+from functools import partial 
+import asyncio 
+import contextvars 
+import hashlib 
+import logging 
+import os 
+import sqlite3 
+import time 
 from langchain_core.messages import HumanMessage,SystemMessage 
 from core.state import State 
 from schemas.EvidenceSchema import EvidenceItem,EvidencePack 
 import re 
-from langchain_tavily import TavilySearch 
 from core.llm import get_llm 
+from core.search_cache import get_search_cache,ttl_for_recency 
+from core.evidence_store import canonical_url as _canonical_url,get_evidence_store 
+from core import metrics, ratelimit 
 from langsmith  import traceable
 
-llm = get_llm()
 
+logger = logging.getLogger(__name__)
+
+# Bounded fan-out for the search stage (see _search_many)
+SEARCH_CONCURRENCY = int(os.environ.get("RESEARCH_SEARCH_CONCURRENCY", "5"))
+SEARCH_TIMEOUT_S = float(os.environ.get("RESEARCH_SEARCH_TIMEOUT", "20"))
+
+# Map stage of evidence extraction (see _extract_evidence)
+EXTRACT_BATCH_QUERIES = int(os.environ.get("RESEARCH_EXTRACT_BATCH_QUERIES", "2"))
+EXTRACT_CONCURRENCY = int(os.environ.get("RESEARCH_EXTRACT_CONCURRENCY", "4"))
+
+# Pre-filter applied to raw results before extraction (see _prefilter_results)
+SNIPPET_MAX_CHARS = int(os.environ.get("RESEARCH_SNIPPET_MAX_CHARS", "600"))
+NEAR_DUP_THRESHOLD = float(os.environ.get("RESEARCH_NEAR_DUP_THRESHOLD", "0.8"))
 
 
 
@@ -44,9 +67,23 @@ def _tavily_search(query: str, max_results: int = 5) -> List[dict]:
 """
 @traceable(name="Tavily_Node")
 def _tavily_search(query: str, max_results=5):
+    from langchain_tavily import TavilySearch  # imported on first search, not at graph import
+
+    ratelimit.acquire("search")
+    tool = TavilySearch(max_results=max_results)
+    return _normalize_tavily(tool.invoke({"query": query}))
+
+
+@traceable(name="Tavily_Node")
+async def _atavily_search(query: str, max_results=5):
+    from langchain_tavily import TavilySearch
+
+    await ratelimit.aacquire("search")
     tool = TavilySearch(max_results=max_results)
-    response = tool.invoke({"query": query})
+    return _normalize_tavily(await tool.ainvoke({"query": query}))
 
+
+def _normalize_tavily(response) -> List[dict]:
     raw = response.get("results", [])
     normalized = []
 
@@ -63,6 +100,133 @@ def _tavily_search(query: str, max_results=5):
     return normalized
 
 
+def _cached_search(query: str, max_results: int = 5, ttl_s: int = 3600) -> List[dict]:
+    """
+    _tavily_search behind the shared on-disk cache. Empty results are not cached.
+    """
+    cache = get_search_cache()
+    hit = cache.get(query, max_results, ttl_s=ttl_s) if cache is not None else None
+    if hit is not None:
+        metrics.record_search(hit, cached=True)
+        return hit
+
+    results = _tavily_search(query, max_results=max_results)
+    metrics.record_search(results, cached=False)
+    if results and cache is not None:
+        cache.put(query, max_results, results, ttl_s=ttl_s)
+    return results
+
+
+async def _acached_search(query: str, max_results: int = 5, ttl_s: int = 3600) -> List[dict]:
+    """
+    Async twin of _cached_search; SQLite lookups run in a worker thread.
+    """
+    cache = get_search_cache()
+    hit = await asyncio.to_thread(cache.get, query, max_results, ttl_s) if cache is not None else None
+    if hit is not None:
+        metrics.record_search(hit, cached=True)
+        return hit
+
+    results = await _atavily_search(query, max_results=max_results)
+    metrics.record_search(results, cached=False)
+    if results and cache is not None:
+        await asyncio.to_thread(cache.put, query, max_results, results, ttl_s)
+    return results
+
+
+def _search_many(
+    queries: List[str],
+    max_results: int = 5,
+    search_fn: Optional[Callable[..., List[dict]]] = None,
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    grouped: bool = False,
+) -> List:
+    """
+    Runs the queries concurrently on a bounded thread pool.
+
+    Results are concatenated in query order, whatever order the calls finish in
+    (grouped=True returns one list per query instead).
+    A query that raises, or is still running `timeout` seconds after it started,
+    contributes no results instead of failing the whole research stage.
+    """
+    search_fn = search_fn or _tavily_search
+    max_workers = max(1, max_workers or SEARCH_CONCURRENCY)
+    timeout = SEARCH_TIMEOUT_S if timeout is None else timeout
+
+    if not queries:
+        return []
+
+    started: dict = {}
+
+    def run(i: int, q: str) -> List[dict]:
+        started[i] = time.monotonic()
+        return search_fn(q, max_results=max_results)
+
+    per_query: List[List[dict]] = [[] for _ in queries]
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(queries)), thread_name_prefix="research")
+    # Each call runs in a copy of the caller's context so per-run metrics see it
+    futures = {pool.submit(contextvars.copy_context().run, run, i, q): i for i, q in enumerate(queries)}
+    pending = set(futures)
+    try:
+        while pending:
+            deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+            wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else 0.01
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for f in done:
+                i = futures[f]
+                try:
+                    per_query[i] = f.result() or []
+                except Exception as exc:
+                    logger.warning("search failed for query %r: %s", queries[i], exc)
+
+            now = time.monotonic()
+            expired = {f for f in pending if futures[f] in started and now - started[futures[f]] >= timeout}
+            for f in expired:
+                logger.warning("search timed out after %.1fs for query %r", timeout, queries[futures[f]])
+            pending -= expired
+    finally:
+        # Don't wait on timed-out calls; queued ones are cancelled.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if grouped:
+        return per_query
+    return [r for results in per_query for r in results]
+
+
+async def _asearch_many(
+    queries: List[str],
+    max_results: int = 5,
+    search_fn: Optional[Callable[..., Awaitable[List[dict]]]] = None,
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    grouped: bool = False,
+) -> List:
+    """
+    Async twin of _search_many: a semaphore bounds concurrency, each query gets
+    `timeout` seconds once it starts, and failures contribute no results.
+    """
+    search_fn = search_fn or _atavily_search
+    sem = asyncio.Semaphore(max(1, max_concurrency or SEARCH_CONCURRENCY))
+    timeout = SEARCH_TIMEOUT_S if timeout is None else timeout
+
+    async def run(q: str) -> List[dict]:
+        async with sem:
+            try:
+                return await asyncio.wait_for(search_fn(q, max_results=max_results), timeout) or []
+            except asyncio.TimeoutError:
+                logger.warning("search timed out after %.1fs for query %r", timeout, q)
+            except Exception as exc:
+                logger.warning("search failed for query %r: %s", q, exc)
+            return []
+
+    per_query = list(await asyncio.gather(*(run(q) for q in queries)))
+    if grouped:
+        return per_query
+    return [r for results in per_query for r in results]
+
+
 def _iso_to_date(s: Optional[str]) -> Optional[date]:
     if not s:
         return None
@@ -72,6 +236,139 @@ def _iso_to_date(s: Optional[str]) -> Optional[date]:
         return None
 
 
+_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%Y.%m.%d", "%d %B %Y", "%d %b %Y", "%B %d, %Y", "%b %d, %Y", "%B %d %Y", "%b %d %Y")
+
+
+def _normalize_date(s: Optional[str]) -> Optional[str]:
+    """
+    Returns an ISO YYYY-MM-DD string for the date formats extractors commonly
+    emit (ISO / ISO datetime, 2026/01/29, 29 Jan 2026, January 29, 2026), else None.
+    """
+    if not s:
+        return None
+    s = s.strip()
+    d = _iso_to_date(s)
+    if d:
+        return d.isoformat()
+    cleaned = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", s).replace("Sept ", "Sep ")
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(cleaned, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+# -----------------------------
+# Pre-filter: canonical URLs, dedup, near-dup snippets, truncation
+# -----------------------------
+_SHINGLE_RE = re.compile(r"\w+")
+_MINHASH_PERMS = 64
+_MERSENNE = (1 << 61) - 1
+_PERM_COEFFS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE | 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE)
+    for i in range(_MINHASH_PERMS)
+]
+
+
+def _minhash(text: str, k: int = 3) -> Optional[tuple]:
+    """
+    MinHash signature over k-word shingles; None when the text is too short to compare.
+    """
+    words = _SHINGLE_RE.findall(text.lower())
+    if len(words) < k:
+        return None
+    hashes = {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + k]).encode(), digest_size=8).digest(), "big")
+        for i in range(len(words) - k + 1)
+    }
+    return tuple(min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERM_COEFFS)
+
+
+def _similarity(sig_a: tuple, sig_b: tuple) -> float:
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut + "…"
+
+
+def _prefilter_results(per_query: List[List[dict]]) -> tuple[List[List[dict]], dict]:
+    """
+    Pure-Python cleanup of raw search results before the extractor sees them:
+    drop empty-URL results, drop results whose canonical URL an earlier one
+    already had (the URL itself is kept as given, for citations), collapse near-duplicate snippets (MinHash over 3-word shingles)
+    and truncate long snippets. Keeps the per-query grouping and order.
+    """
+    stats = {"raw": 0, "empty_url": 0, "duplicate_url": 0, "near_duplicate": 0, "truncated": 0, "kept": 0,
+             "chars_before": 0, "chars_after": 0}
+    seen_urls: set = set()
+    signatures: List[tuple] = []
+    cleaned: List[List[dict]] = []
+
+    for results in per_query:
+        kept: List[dict] = []
+        for r in results:
+            stats["raw"] += 1
+            stats["chars_before"] += len(str(r))
+
+            key = _canonical_url(r.get("url"))
+            if not key:
+                stats["empty_url"] += 1
+                continue
+            if key in seen_urls:
+                stats["duplicate_url"] += 1
+                continue
+
+            snippet = (r.get("snippet") or "").strip()
+            sig = _minhash(f"{r.get('title', '')} {snippet}")
+            if sig is not None and any(_similarity(sig, other) >= NEAR_DUP_THRESHOLD for other in signatures):
+                stats["near_duplicate"] += 1
+                continue
+
+            if len(snippet) > SNIPPET_MAX_CHARS:
+                snippet = _truncate(snippet, SNIPPET_MAX_CHARS)
+                stats["truncated"] += 1
+
+            seen_urls.add(key)
+            if sig is not None:
+                signatures.append(sig)
+            item = {**r, "url": r["url"].strip(), "snippet": snippet}
+            kept.append(item)
+            stats["kept"] += 1
+            stats["chars_after"] += len(str(item))
+        cleaned.append(kept)
+
+    return cleaned, stats
+
+
+def _merge_evidence(packs: List[EvidencePack]) -> List[EvidenceItem]:
+    """
+    Deterministic reduce step: first occurrence of a (canonical) URL wins its position
+    and keeps its URL, later duplicates only fill fields it is missing. Dates are
+    normalized to ISO.
+    """
+    merged: dict = {}
+    for pack in packs:
+        for e in pack.evidence:
+            key = _canonical_url(e.url)
+            if not key:
+                continue
+            e = e.model_copy(update={"published_at": _normalize_date(e.published_at)})
+            seen = merged.get(key)
+            if seen is None:
+                merged[key] = e
+                continue
+            fill = {k: getattr(e, k) for k in ("published_at", "snippet", "source") if not getattr(seen, k) and getattr(e, k)}
+            if fill:
+                merged[key] = seen.model_copy(update=fill)
+    return list(merged.values())
+
+
 RESEARCH_SYSTEM = """You are a research synthesizer for technical writing.
 
 Given raw web search results, produce a deduplicated list of EvidenceItem objects.
@@ -84,50 +381,210 @@ Rules:
 - Keep snippets short.
 - Deduplicate by URL.
 """
-@traceable(name="Research_Node")
-def research_node(state: State) -> dict:
-    queries = (state.get("queries", []) or [])[:10]
-    max_results = 6
-
-    raw_results: List[dict] = []
-    for q in queries:
-        raw_results.extend(_tavily_search(q, max_results=max_results))
 
-    if not raw_results:
-        return {"evidence": []}
 
-    extractor = llm.with_structured_output(EvidencePack)
-    pack = extractor.invoke(
+def _extraction_prompts(state: State, per_query: List[List[dict]]) -> List[list]:
+    """
+    Map stage input: one extractor prompt per batch of EXTRACT_BATCH_QUERIES queries.
+    """
+    size = max(1, EXTRACT_BATCH_QUERIES)
+    batches = [
+        [r for results in per_query[i:i + size] for r in results]
+        for i in range(0, len(per_query), size)
+    ]
+    return [
         [
             SystemMessage(content=RESEARCH_SYSTEM),
             HumanMessage(
                 content=(
                     f"As-of date: {state['as_of']}\n"
                     f"Recency days: {state['recency_days']}\n\n"
-                    f"Raw results:\n{raw_results}"
+                    f"Raw results:\n{batch}"
                 )
             ),
         ]
-    )
+        for batch in batches
+        if batch
+    ]
+
+
+def _reduce_packs(outputs: list) -> List[EvidenceItem]:
+    """
+    Reduce stage: a failed batch is skipped; if every batch fails the first error is raised.
+    """
+    packs = [o for o in outputs if isinstance(o, EvidencePack)]
+    errors = [o for o in outputs if isinstance(o, Exception)]
+    for exc in errors:
+        logger.warning("evidence extraction batch failed: %s", exc)
+    if errors and not packs:
+        raise errors[0]
+
+    return _merge_evidence(packs)
+
+
+def _extract_evidence(state: State, per_query: List[List[dict]]) -> List[EvidenceItem]:
+    """
+    Map: one structured-output extraction per batch of queries, run in parallel.
+    Reduce: _merge_evidence, no second LLM pass.
+    """
+    prompts = _extraction_prompts(state, per_query)
+    if not prompts:
+        return []
+
+    extractor = get_llm("research").with_structured_output(EvidencePack)
+    outputs = extractor.batch(prompts, config={"max_concurrency": max(1, EXTRACT_CONCURRENCY)}, return_exceptions=True)
+    return _reduce_packs(outputs)
+
+
+async def _aextract_evidence(state: State, per_query: List[List[dict]]) -> List[EvidenceItem]:
+    prompts = _extraction_prompts(state, per_query)
+    if not prompts:
+        return []
+
+    extractor = get_llm("research").with_structured_output(EvidencePack)
+    outputs = await extractor.abatch(prompts, config={"max_concurrency": max(1, EXTRACT_CONCURRENCY)}, return_exceptions=True)
+    return _reduce_packs(outputs)
+
+
+# -----------------------------
+# Evidence store: reuse sources extracted by earlier runs
+# -----------------------------
+def _known_evidence(per_query: List[List[dict]]) -> tuple[List[EvidenceItem], List[List[dict]]]:
+    """
+    Looks the prefiltered URLs up in the evidence store (by canonical URL). Known
+    URLs reuse the stored item; only the remaining results, still grouped
+    per query, go to the extractor.
+    """
+    try:
+        store = get_evidence_store()
+        if store is None:
+            return [], per_query
+        rows = store.get_many(r["url"] for results in per_query for r in results)
+    except (sqlite3.Error, OSError) as exc:
+        logger.warning("evidence store lookup failed: %s", exc)
+        return [], per_query
+
+    fields = EvidenceItem.model_fields
+    keyed = [[(_canonical_url(r["url"]), r) for r in results] for results in per_query]
+    known = [
+        EvidenceItem(**{k: v for k, v in rows[key].items() if k in fields})
+        for results in keyed
+        for key, r in results
+        if key in rows
+    ]
+    # Queries left with nothing new drop out, so new results pack into fewer batches
+    remaining = ([r for key, r in results if key not in rows] for results in keyed)
+    return known, [results for results in remaining if results]
+
+
+def _combine(per_query: List[List[dict]], known: List[EvidenceItem], extracted: List[EvidenceItem]) -> List[EvidenceItem]:
+    """
+    Stored and freshly extracted items in search-result order (items whose
+    URL the extractor changed go last).
+    """
+    if not known:
+        return extracted
+    position = {_canonical_url(r["url"]): i for i, r in enumerate(r for results in per_query for r in results)}
+    merged = _merge_evidence([EvidencePack(evidence=known + extracted)])
+    return sorted(merged, key=lambda e: position.get(_canonical_url(e.url), len(position)))
+
+
+def _remember(evidence: List[EvidenceItem]) -> None:
+    # New items are stored, known ones get last_seen refreshed
+    if not evidence:
+        return
+    try:
+        store = get_evidence_store()
+        if store is not None:
+            store.add_many(evidence)
+    except (sqlite3.Error, OSError) as exc:
+        logger.warning("evidence store update failed: %s", exc)
 
-    # Deduplicate by URL
-    dedup = {}
-    for e in pack.evidence:
-        if e.url:
-            dedup[e.url] = e
-    evidence = list(dedup.values())
 
+def _recency_filter(state: State, evidence: List[EvidenceItem]) -> List[EvidenceItem]:
     # HARD RECENCY FILTER for open_book weekly roundup:
     # keep only items with a parseable ISO date and within the window.
     mode = state.get("mode", "closed_book")
-    if mode == "open_book":
-        as_of = date.fromisoformat(state["as_of"])
-        cutoff = as_of - timedelta(days=int(state["recency_days"]))
-        fresh: List[EvidenceItem] = []
-        for e in evidence:
-            d = _iso_to_date(e.published_at)
-            if d and d >= cutoff:
-                fresh.append(e)
-        evidence = fresh
-
-    return {"evidence": evidence}
\ No newline at end of file
+    if mode != "open_book" or not evidence:
+        return evidence
+
+    as_of = date.fromisoformat(state["as_of"])
+    cutoff = as_of - timedelta(days=int(state["recency_days"]))
+
+    # Indexed date query over this run's URLs (its evidence was just recorded
+    # in the store, which may know a date the extractor missed)
+    keys = [_canonical_url(e.url) for e in evidence]
+    own_dates = [_iso_to_date(e.published_at) for e in evidence]
+    dates: Dict[str, str] = {}
+    stale: set = set()
+    try:
+        store = get_evidence_store()
+        if store is not None:
+            dates = store.published_since(cutoff.isoformat(), keys)
+            # An item that is fresh by its own date but not by the store's is
+            # kept unless the store dates it (before the cutoff); URLs missing
+            # from the store (e.g. the update failed) keep their own date
+            maybe = [k for k, d in zip(keys, own_dates) if k not in dates and d and d >= cutoff]
+            if maybe:
+                stale = {k for k, row in store.get_many(maybe).items() if _iso_to_date(row["published_at"])}
+    except (sqlite3.Error, OSError) as exc:
+        logger.warning("evidence store date query failed, filtering in memory: %s", exc)
+        dates, stale = {}, set()
+
+    fresh: List[EvidenceItem] = []
+    for e, k, d in zip(evidence, keys, own_dates):
+        if k in dates:
+            fresh.append(e.model_copy(update={"published_at": dates[k][:10]}))
+        elif k not in stale and d and d >= cutoff:
+            fresh.append(e)
+    return fresh
+
+
+@traceable(name="Research_Node")
+def research_node(state: State) -> dict:
+    queries = (state.get("queries", []) or [])[:10]
+    max_results = 6
+
+    # Cached results expire faster for fresher (open_book) windows
+    search = partial(_cached_search, ttl_s=ttl_for_recency(state.get("recency_days")))
+    per_query = _search_many(queries, max_results=max_results, search_fn=search, grouped=True)
+
+    per_query, stats = _prefilter_results(per_query)
+
+    known, to_extract = _known_evidence(per_query)
+    stats["store_hits"] = len(known)
+    stats["extracted"] = sum(len(results) for results in to_extract)
+    logger.info("research prefilter: %s", stats)
+
+    if not any(per_query):
+        return {"evidence": [], "research_stats": stats}
+
+    extracted = _extract_evidence(state, to_extract) if any(to_extract) else []
+    evidence = _combine(per_query, known, extracted)
+    _remember(evidence)
+    return {"evidence": _recency_filter(state, evidence), "research_stats": stats}
+
+
+@traceable(name="Research_Node")
+async def aresearch_node(state: State) -> dict:
+    queries = (state.get("queries", []) or [])[:10]
+    max_results = 6
+
+    search = partial(_acached_search, ttl_s=ttl_for_recency(state.get("recency_days")))
+    per_query = await _asearch_many(queries, max_results=max_results, search_fn=search, grouped=True)
+
+    per_query, stats = _prefilter_results(per_query)
+
+    # SQLite work runs in worker threads, as for the search cache
+    known, to_extract = await asyncio.to_thread(_known_evidence, per_query)
+    stats["store_hits"] = len(known)
+    stats["extracted"] = sum(len(results) for results in to_extract)
+    logger.info("research prefilter: %s", stats)
+
+    if not any(per_query):
+        return {"evidence": [], "research_stats": stats}
+
+    extracted = await _aextract_evidence(state, to_extract) if any(to_extract) else []
+    evidence = _combine(per_query, known, extracted)
+    await asyncio.to_thread(_remember, evidence)
+    return {"evidence": await asyncio.to_thread(_recency_filter, state, evidence), "research_stats": stats}
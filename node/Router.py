@@ -2,9 +2,9 @@ from schemas.RouterSchema import RouterDecision
 from core.state import State 
 from langchain_core.messages import HumanMessage,SystemMessage 
 from core.llm import get_llm 
+from node.Orchestrator import speculative 
 from langsmith import traceable
 
-llm=get_llm()
 
 ROUTER_SYSTEM = """You are a routing module for a technical blog planner.
 
@@ -23,17 +23,14 @@ If needs_research=true:
 - Queries should be scoped and specific (avoid generic queries like just "AI" or "LLM").
 - For open_book weekly roundup, include queries that reflect the last 7 days constraint.
 """
-@traceable(name="Router_Node")
-def router_node(state: State) -> dict:
-    topic = state["topic"]
-    decider = llm.with_structured_output(RouterDecision)
-    decision = decider.invoke(
-        [
-            SystemMessage(content=ROUTER_SYSTEM),
-            HumanMessage(content=f"Topic: {topic}\nAs-of date: {state['as_of']}"),
-        ]
-    )
+def _router_messages(state: State) -> list:
+    return [
+        SystemMessage(content=ROUTER_SYSTEM),
+        HumanMessage(content=f"Topic: {state['topic']}\nAs-of date: {state['as_of']}"),
+    ]
+
 
+def _router_update(decision: RouterDecision) -> dict:
     # Set default recency window based on mode
     if decision.mode == "open_book":
         recency_days = 7
@@ -49,6 +46,22 @@ def router_node(state: State) -> dict:
         "recency_days": recency_days,
     }
 
+
+@traceable(name="Router_Node")
+def router_node(state: State) -> dict:
+    decider = get_llm("router").with_structured_output(RouterDecision)
+    decision = decider.invoke(_router_messages(state))
+    return _router_update(decision)
+
+
+@traceable(name="Router_Node")
+async def arouter_node(state: State) -> dict:
+    decider = get_llm("router").with_structured_output(RouterDecision)
+    decision = await decider.ainvoke(_router_messages(state))
+    return _router_update(decision)
+
 @traceable(name="Router_next_node")
-def route_next(state: State) -> str:
+def route_next(state: State):
+    if speculative(state):
+        return ["research", "orchestrator"]  # plan and research in the same step
     return "research" if state["needs_research"] else "orchestrator"
\ No newline at end of file
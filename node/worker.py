@@ -4,7 +4,6 @@ from schemas.EvidenceSchema import EvidenceItem
 from core.llm import get_llm 
 from langsmith import traceable
 
-llm = get_llm()
 
 
 
@@ -41,16 +40,37 @@ Style:
 - Short paragraphs, bullets where helpful, code fences for code.
 - Avoid fluff/marketing. Be precise and implementation-oriented.
 """
-@traceable(name="worker_node")
-def worker_node(payload: dict) -> dict:
-    
-    task = Task(**payload["task"])
-    plan = Plan(**payload["plan"])
-    evidence = [EvidenceItem(**e) for e in payload.get("evidence", [])]
-    topic = payload["topic"]
-    mode = payload.get("mode", "closed_book")
-    as_of = payload.get("as_of")
-    recency_days = payload.get("recency_days")
+def _as_model(cls, value):
+    # fanout passes live models; dicts still come from older payloads/checkpoints
+    return value if isinstance(value, cls) else cls(**value)
+
+
+def _brief(payload: dict) -> dict:
+    if "brief" in payload:
+        return payload["brief"]
+    # Pending Sends checkpointed before the brief carried the whole plan
+    plan = _as_model(Plan, payload["plan"])
+    return {
+        **{k: payload.get(k) for k in ("topic", "mode", "as_of", "recency_days")},
+        "blog_title": plan.blog_title,
+        "audience": plan.audience,
+        "tone": plan.tone,
+        "blog_kind": plan.blog_kind,
+        "constraints": plan.constraints,
+    }
+
+
+def build_worker_messages(payload: dict) -> tuple[Task, list]:
+    """
+    Builds the section prompt for one worker payload (see Orchestrator.fanout).
+    """
+    task = _as_model(Task, payload["task"])
+    brief = _brief(payload)
+    evidence = [_as_model(EvidenceItem, e) for e in payload.get("evidence", [])]
+    topic = brief["topic"]
+    mode = brief.get("mode", "closed_book")
+    as_of = brief.get("as_of")
+    recency_days = brief.get("recency_days")
 
     bullets_text = "\n- " + "\n- ".join(task.bullets)
 
@@ -62,32 +82,53 @@ def worker_node(payload: dict) -> dict:
             for e in evidence[:20]
         )
 
-    section_md = llm.invoke(
-        [
-            SystemMessage(content=WORKER_SYSTEM),
-            HumanMessage(
-                content=(
-                    f"Blog title: {plan.blog_title}\n"
-                    f"Audience: {plan.audience}\n"
-                    f"Tone: {plan.tone}\n"
-                    f"Blog kind: {plan.blog_kind}\n"
-                    f"Constraints: {plan.constraints}\n"
-                    f"Topic: {topic}\n"
-                    f"Mode: {mode}\n"
-                    f"As-of: {as_of} (recency_days={recency_days})\n\n"
-                    f"Section title: {task.title}\n"
-                    f"Goal: {task.goal}\n"
-                    f"Target words: {task.target_words}\n"
-                    f"Tags: {task.tags}\n"
-                    f"requires_research: {task.requires_research}\n"
-                    f"requires_citations: {task.requires_citations}\n"
-                    f"requires_code: {task.requires_code}\n"
-                    f"Bullets:{bullets_text}\n\n"
-                    f"Evidence (ONLY use these URLs when citing):\n{evidence_text}\n"
-                )
-            ),
-        ]
+    messages = [
+        SystemMessage(content=WORKER_SYSTEM),
+        HumanMessage(
+            content=(
+                f"Blog title: {brief['blog_title']}\n"
+                f"Audience: {brief['audience']}\n"
+                f"Tone: {brief['tone']}\n"
+                f"Blog kind: {brief['blog_kind']}\n"
+                f"Constraints: {brief['constraints']}\n"
+                f"Topic: {topic}\n"
+                f"Mode: {mode}\n"
+                f"As-of: {as_of} (recency_days={recency_days})\n\n"
+                f"Section title: {task.title}\n"
+                f"Goal: {task.goal}\n"
+                f"Target words: {task.target_words}\n"
+                f"Tags: {task.tags}\n"
+                f"requires_research: {task.requires_research}\n"
+                f"requires_citations: {task.requires_citations}\n"
+                f"requires_code: {task.requires_code}\n"
+                f"Bullets:{bullets_text}\n\n"
+                f"Evidence (ONLY use these URLs when citing):\n{evidence_text}\n"
+            )
+        ),
+    ]
+    return task, messages
+
+
+@traceable(name="worker_node")
+def worker_node(payload: dict) -> dict:
+    task, messages = build_worker_messages(payload)
+
+    section_md = get_llm("worker").invoke(
+        messages,
+        # Tags the token stream (stream_mode="messages") with the section it belongs to
+        config={"metadata": {"task_id": task.id}},
     ).content.strip()
 
     # deterministic ordering
-    return {"sections": [(task.id, section_md)]}
\ No newline at end of file
+    return {"sections": [(task.id, section_md)]}
+
+
+@traceable(name="worker_node")
+async def aworker_node(payload: dict) -> dict:
+    task, messages = build_worker_messages(payload)
+
+    section = await get_llm("worker").ainvoke(
+        messages,
+        config={"metadata": {"task_id": task.id}},
+    )
+    return {"sections": [(task.id, section.content.strip())]}
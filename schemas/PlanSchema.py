@@ -35,4 +35,16 @@ class Plan(BaseModel):
     blog_kind: Literal["explainer", "tutorial", "news_roundup", "comparison", "system_design"] = "explainer"
 
     constraints: List[str] = Field(default_factory=list)
-    tasks: List[Task]
\ No newline at end of file
+    tasks: List[Task]
+
+
+class TaskPatch(BaseModel):
+    id: int
+    goal: str
+    bullets: List[str] = Field(..., min_length=3, max_length=6)
+    requires_citations: bool = True
+
+
+class PlanPatch(BaseModel):
+    # Revisions for research-dependent tasks of a speculative draft plan
+    tasks: List[TaskPatch] = Field(default_factory=list)
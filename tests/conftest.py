@@ -0,0 +1,75 @@
+"""
+Offline test setup: every store lives in a throwaway directory and the
+network backends are replaced by the fakes in benchmarks/fakes.py.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Module-level settings are read at import time, so they go in before any
+# core/node/workflow import below
+WORKDIR = tempfile.mkdtemp(prefix="blog_tests_")
+os.environ["GOOGLE_API_KEY"] = "offline-test"
+os.environ["SEARCH_CACHE"] = "off"
+os.environ["LLM_CACHE"] = "off"
+os.environ["SEARCH_EMBEDDINGS"] = "off"
+os.environ["CHECKPOINT_PATH"] = os.path.join(WORKDIR, "checkpoints.sqlite")
+os.environ["EVIDENCE_STORE_PATH"] = os.path.join(WORKDIR, "evidence.sqlite")
+os.environ["BLOG_INDEX_PATH"] = os.path.join(WORKDIR, "blog_index.sqlite")
+os.environ["SEARCH_VECTORS_PATH"] = os.path.join(WORKDIR, "search_vectors.sqlite")
+
+from benchmarks.fakes import FakeChatModel, FakeSearch, install_fakes  # noqa: E402
+from core.llm import set_llm  # noqa: E402
+
+
+def _inputs(topic: str = "test topic", mode: str = "") -> dict:
+    return {
+        "topic": topic,
+        "mode": mode,
+        "needs_research": False,
+        "queries": [],
+        "evidence": [],
+        "plan": None,
+        "as_of": "2026-01-29",
+        "recency_days": 30,
+        "sections": [],
+        "final": "",
+    }
+
+
+@pytest.fixture
+def make_inputs():
+    """
+    Builds the initial graph state: make_inputs(topic="...", mode="...").
+    """
+    return _inputs
+
+
+@pytest.fixture(autouse=True)
+def _workdir(tmp_path, monkeypatch):
+    # The reducer writes <title>.md into the working directory
+    monkeypatch.chdir(tmp_path)
+    yield
+    set_llm(None)
+
+
+@pytest.fixture
+def fakes():
+    """
+    Installs a zero-latency fake LLM and fake search; returns (llm, search).
+    Tests adjust the fake (mode, n_tasks, fail_tasks, ...) before running.
+    """
+    import node.Research
+
+    tavily, atavily = node.Research._tavily_search, node.Research._atavily_search
+    llm = FakeChatModel(latency=0.0, section_words=20)
+    search = FakeSearch(latency=0.0)
+    install_fakes(llm, search)
+    yield llm, search
+    node.Research._tavily_search, node.Research._atavily_search = tavily, atavily
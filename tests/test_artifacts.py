@@ -0,0 +1,44 @@
+import stat
+
+from core.artifacts import FILE_MODE, ArtifactStore
+
+
+def test_put_writes_with_umask_mode_and_skips_unchanged(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+
+    first = store.put("blog.md", "# Title\n")
+    again = store.put("blog.md", "# Title\n")
+
+    assert first.written and not again.written
+    assert stat.S_IMODE(first.path.stat().st_mode) == FILE_MODE
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_reducer_reindexes_by_content_hash(monkeypatch, tmp_path):
+    import node.Reducer
+    from core.search import index_blog
+    from schemas.PlanSchema import Plan
+
+    calls = []
+
+    def flaky_index(state, path, markdown):
+        calls.append(path)
+        if len(calls) == 1:
+            raise RuntimeError("index unavailable")
+        index_blog(state, path, markdown)
+
+    monkeypatch.setattr(node.Reducer, "index_blog", flaky_index)
+    state = {
+        "plan": Plan(blog_title="Hash test", audience="devs", tone="plain", tasks=[]),
+        "sections": [(1, "## One\n\nbody")],
+        "topic": "t",
+    }
+
+    for _ in range(3):
+        node.Reducer.reducer_node(state)
+
+    # First index update failed, the unchanged file is indexed on the next
+    # save, and after that the matching hash skips it
+    assert calls == ["Hash test.md", "Hash test.md"]
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".md"] == ["Hash test.md"]
+    assert not (tmp_path / "downloads").exists()
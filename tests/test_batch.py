@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+from workflow.batch import build_report, completed_ids, job_id, main, read_jobs, run_batch, run_job, thread_id
+from workflow.graph import create_async_app
+
+
+def _write_jobs(path, rows):
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+    return str(path)
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_read_jobs_drops_duplicate_ids(tmp_path, caplog):
+    path = _write_jobs(tmp_path / "topics.jsonl", [
+        {"topic": "Vector search", "as_of": "2026-01-29"},
+        {"topic": "Vector search ", "as_of": "2026-01-29"},  # same topic after strip
+        {"topic": "Vector search", "as_of": "2026-01-30"},
+        {"topic": "Other", "as_of": "2026-01-29", "id": "x1"},
+        {"topic": "Another", "as_of": "2026-01-29", "id": "x1"},
+        {"topic": ""},
+    ])
+
+    jobs = read_jobs(path)
+
+    assert [(j["id"], j["topic"]) for j in jobs] == [
+        (job_id("Vector search", "2026-01-29"), "Vector search"),
+        (job_id("Vector search", "2026-01-30"), "Vector search"),
+        ("x1", "Other"),
+    ]
+    assert sum("duplicate job id" in r.getMessage() for r in caplog.records) == 2
+
+
+def test_rerun_skips_ok_records_of_its_out_file(fakes, tmp_path):
+    llm, _ = fakes
+    jobs = _write_jobs(tmp_path / "topics.jsonl", [{"topic": "first", "as_of": "2026-01-29"}])
+    out = tmp_path / "results.jsonl"
+
+    assert main([jobs, "--out", str(out), "--report", str(tmp_path / "r1.json")]) == 0
+    calls = llm.calls
+    _write_jobs(tmp_path / "topics.jsonl", [{"topic": "first", "as_of": "2026-01-29"}, {"topic": "second", "as_of": "2026-01-29"}])
+    assert main([jobs, "--out", str(out), "--report", str(tmp_path / "r2.json")]) == 0
+
+    assert [r["topic"] for r in _records(out)] == ["first", "second"]
+    assert llm.calls - calls == calls  # only "second" ran
+    assert completed_ids(str(out)) == {job_id("first", "2026-01-29"), job_id("second", "2026-01-29")}
+
+
+def test_other_batch_with_same_job_generates_again(fakes, tmp_path):
+    llm, _ = fakes
+    app = create_async_app()
+    jobs = [{"id": job_id("shared", "2026-01-29"), "topic": "shared", "as_of": "2026-01-29"}]
+
+    first = asyncio.run(run_batch(jobs, str(tmp_path / "a.jsonl"), 1, app=app))
+    calls = llm.calls
+    second = asyncio.run(run_batch(jobs, str(tmp_path / "b.jsonl"), 1, app=app))
+
+    assert llm.calls - calls == calls
+    assert [r["resumed"] for r in first + second] == [False, False]
+    assert second[0]["stages"] and second[0]["metrics"]["nodes"]
+
+
+def test_finished_checkpoint_without_record_is_resumed_and_not_timed(fakes, tmp_path):
+    llm, _ = fakes
+    app = create_async_app()
+    out = str(tmp_path / "results.jsonl")
+    done, lost = (
+        {"id": job_id(t, "2026-01-29"), "topic": t, "as_of": "2026-01-29"} for t in ("done", "lost")
+    )
+    # "lost" finished on this batch's thread, then the process died before its record was written
+    asyncio.run(run_job(app, lost, thread_id(out, lost["id"])))
+    calls = llm.calls
+
+    records = asyncio.run(run_batch([done, lost], out, 2, app=app))
+
+    by_id = {r["id"]: r for r in records}
+    assert by_id[lost["id"]]["resumed"] and by_id[lost["id"]]["final"]
+    assert not by_id[done["id"]]["resumed"]
+    assert llm.calls - calls == calls  # only "done" ran
+    report = build_report(records, wall_s=1.0)
+    assert (report["ok"], report["resumed"]) == (2, 1)
+    assert report["latency_s"]["end_to_end"]["n"] == 1
+    assert report["latency_s"]["end_to_end"]["p50"] == by_id[done["id"]]["elapsed_s"]
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+
+from core.checkpoint import SQLiteSaver, new_thread_id, thread_config
+from workflow.graph import create_app, create_async_app
+from workflow.stream import try_stream
+
+
+def _resume(app, thread_id):
+    events = dict(try_stream(app, None, thread_id=thread_id))
+    calls = {node: row["calls"] for node, row in events["metrics"]["nodes"].items()}
+    return events["final"], calls
+
+
+def test_resume_reexecutes_only_failed_workers(fakes, make_inputs):
+    llm, search = fakes
+    llm.mode, llm.n_tasks = "hybrid", 6
+    llm.latency = 0.01  # every worker is running when the failures hit
+    llm.fail_tasks = [3, 5]
+    app = create_app()
+    thread_id = new_thread_id()
+
+    with pytest.raises(RuntimeError, match="injected failure"):
+        app.invoke(make_inputs("flaky topic"), config=thread_config(thread_id))
+    assert app.get_state(thread_config(thread_id)).next == ("worker", "worker")
+    llm_calls, search_calls = llm.calls, search.calls
+
+    final, calls = _resume(app, thread_id)
+
+    # Routing, research, planning and the four finished sections come from the checkpoint
+    assert calls == {"worker": 2, "reducer": 1}
+    assert llm.calls - llm_calls == 2
+    assert search.calls == search_calls
+    assert sorted(task_id for task_id, _ in final["sections"]) == [1, 2, 3, 4, 5, 6]
+    assert final["final"]
+
+
+def test_async_resume_after_failed_worker(fakes, make_inputs):
+    llm, _ = fakes
+    llm.mode, llm.n_tasks = "closed_book", 5
+    llm.fail_tasks = [2]
+    app = create_async_app()
+    config = thread_config(new_thread_id())
+
+    async def run():
+        with pytest.raises(RuntimeError, match="injected failure"):
+            await app.ainvoke(make_inputs("async flaky topic"), config=config)
+        calls = llm.calls
+        out = await app.ainvoke(None, config=config)
+        return out, llm.calls - calls
+
+    out, resumed_calls = asyncio.run(run())
+    # The failed section plus any sibling that was cancelled mid-call; never the router or planner
+    assert 1 <= resumed_calls <= 5
+    assert sorted(task_id for task_id, _ in out["sections"]) == [1, 2, 3, 4, 5]
+
+
+def test_prune_drops_only_stale_threads(tmp_path, fakes, make_inputs):
+    llm, _ = fakes
+    llm.mode, llm.n_tasks = "closed_book", 2
+    saver = SQLiteSaver(str(tmp_path / "checkpoints.sqlite"), retention_days=0)
+    app = create_app(durable=False).builder.compile(checkpointer=saver)
+    old, fresh = new_thread_id(), new_thread_id()
+    app.invoke(make_inputs("old topic"), config=thread_config(old))
+    app.invoke(make_inputs("fresh topic"), config=thread_config(fresh))
+
+    saver._conn().execute("UPDATE checkpoints SET created_at = ? WHERE thread_id = ?", (time.time() - 30 * 86400, old))
+    assert saver.prune(14) == 1
+    assert saver.get_tuple(thread_config(old)) is None
+    assert saver._conn().execute("SELECT COUNT(*) FROM writes WHERE thread_id = ?", (old,)).fetchone()[0] == 0
+    assert app.get_state(thread_config(fresh)).values["final"]
+
+    # Opening the file again applies the retention window on its own
+    saver._conn().execute("UPDATE checkpoints SET created_at = ? WHERE thread_id = ?", (time.time() - 30 * 86400, fresh))
+    SQLiteSaver(str(tmp_path / "checkpoints.sqlite"), retention_days=14)
+    assert saver.get_tuple(thread_config(fresh)) is None
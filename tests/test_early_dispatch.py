@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+import node.Orchestrator
+from core import metrics
+from workflow.graph import create_app, create_async_app
+from workflow.stream import try_stream
+
+
+@pytest.fixture
+def early(monkeypatch):
+    monkeypatch.setattr(node.Orchestrator, "SPECULATIVE_PLANNING", "on")
+    monkeypatch.setattr(node.Orchestrator, "EARLY_DISPATCH", "on")
+
+
+def _run(app, inputs):
+    events = dict(try_stream(app, inputs))
+    calls = {node: row["calls"] for node, row in events["metrics"]["nodes"].items()}
+    return events["final"], calls, events["metrics"]
+
+
+@pytest.mark.parametrize("durable", [False, True])
+def test_all_independent_plan_still_reaches_reducer(fakes, early, durable, make_inputs):
+    llm, _ = fakes
+    llm.mode, llm.n_tasks, llm.research_every = "hybrid", 4, 0
+
+    final, calls, _ = _run(create_app(durable=durable), make_inputs("all independent"))
+
+    # Every section was written during planning, so nothing fans out to `worker`
+    assert calls["worker"] == 4
+    assert calls["reducer"] == 1
+    assert sorted(task_id for task_id, _ in final["sections"]) == [1, 2, 3, 4]
+    assert final["final"].startswith("# Fake benchmark blog")
+
+
+def test_all_independent_plan_async(fakes, early, make_inputs):
+    llm, _ = fakes
+    llm.mode, llm.n_tasks, llm.research_every = "hybrid", 3, 0
+
+    async def run():
+        with metrics.collect("async") as run:
+            out = await create_async_app(durable=False).ainvoke(make_inputs("all independent async"))
+        return out, run.report()
+
+    out, report = asyncio.run(run())
+    assert report["nodes"]["reducer"]["calls"] == 1
+    assert len(out["sections"]) == 3
+    assert out["final"]
+
+
+def test_mixed_plan_writes_each_section_once(fakes, early, make_inputs):
+    llm, _ = fakes
+    llm.mode, llm.n_tasks = "hybrid", 6  # tasks 2, 4, 6 need research
+
+    final, calls, report = _run(create_app(durable=False), make_inputs("mixed plan"))
+
+    # 3 sections early inside orchestrator + 3 Sends after reconcile
+    assert calls["worker"] == 6
+    assert calls["reconcile"] == 1 and calls["reducer"] == 1
+    assert sorted(task_id for task_id, _ in final["sections"]) == [1, 2, 3, 4, 5, 6]
+    assert report["critical_path"]["steps"]
+
+
+def test_empty_plan_goes_to_reducer(fakes, make_inputs):
+    llm, _ = fakes
+    llm.mode, llm.n_tasks = "closed_book", 0
+
+    final, calls, _ = _run(create_app(durable=False), make_inputs("empty plan"))
+
+    assert "worker" not in calls
+    assert calls["reducer"] == 1
+    assert final["final"].startswith("# Fake benchmark blog")
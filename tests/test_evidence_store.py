@@ -0,0 +1,101 @@
+import sqlite3
+
+import pytest
+
+import node.Research
+from core.evidence_store import EvidenceStore
+from core.state import EvidenceItem
+from node.Research import _known_evidence, _recency_filter
+from workflow.graph import create_app
+from workflow.stream import try_stream
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = EvidenceStore(str(tmp_path / "evidence.sqlite"))
+    monkeypatch.setattr(node.Research, "get_evidence_store", lambda: store)
+    return store
+
+
+def _run(app, inputs):
+    events = dict(try_stream(app, inputs))
+    calls = {node: row["calls"] for node, row in events["metrics"]["nodes"].items()}
+    return events["final"], calls
+
+
+def _item(url: str, published_at: str) -> EvidenceItem:
+    return EvidenceItem(title=url, url=url, published_at=published_at, snippet="s")
+
+
+@pytest.fixture
+def open_book(make_inputs):
+    return {**make_inputs(mode="open_book"), "as_of": "2026-01-29", "recency_days": 7}
+
+
+def test_second_run_skips_extraction_of_known_urls(fakes, store, make_inputs):
+    llm, search = fakes
+    llm.mode, llm.n_tasks, llm.n_queries, llm.echo_results = "hybrid", 2, 2, True
+
+    first, _ = _run(create_app(durable=False), make_inputs("store topic"))
+    assert first["research_stats"]["store_hits"] == 0
+    extracted = first["research_stats"]["extracted"]
+    assert extracted > 0 and store.count() == extracted
+
+    llm_calls, search_calls = llm.calls, search.calls
+    second, calls = _run(create_app(durable=False), make_inputs("store topic"))
+
+    # Same search results: every URL comes from the store, the extractor is never called
+    assert second["research_stats"]["store_hits"] == extracted
+    assert second["research_stats"]["extracted"] == 0
+    assert llm.calls - llm_calls == 1 + 1 + 2  # router, planner, sections
+    assert search.calls - search_calls == 2
+    assert calls == {"router": 1, "research": 1, "orchestrator": 1, "worker": 2, "reducer": 1}
+    assert [e.url for e in second["evidence"]] == [e.url for e in first["evidence"]]
+
+
+def test_recency_filter_uses_own_date_for_urls_missing_from_store(store, open_book):
+    store.add_many([_item("https://a.example.com/stored", "2026-01-27"), _item("https://a.example.com/old", "2025-11-02")])
+    evidence = [
+        _item("https://a.example.com/stored", "2025-06-01"),  # store knows a fresher date
+        _item("https://a.example.com/old", "2026-01-28"),  # the store's date wins
+        _item("https://b.example.com/fresh", "2026-01-25"),  # not in the store
+        _item("https://b.example.com/stale", "2025-12-01"),  # not in the store
+    ]
+
+    kept = _recency_filter(open_book, evidence)
+
+    assert [(e.url, e.published_at) for e in kept] == [
+        ("https://a.example.com/stored", "2026-01-27"),
+        ("https://b.example.com/fresh", "2026-01-25"),
+    ]
+
+
+def test_unavailable_store_falls_back_to_memory(monkeypatch, open_book):
+    def broken():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(node.Research, "get_evidence_store", broken)
+    per_query = [[{"title": "t", "url": "https://example.com/x", "snippet": "s"}]]
+
+    assert _known_evidence(per_query) == ([], per_query)
+    kept = _recency_filter(open_book, [_item("https://example.com/x", "2026-01-28")])
+    assert [e.url for e in kept] == ["https://example.com/x"]
+
+
+def test_recency_query_is_answered_from_the_index(store):
+    urls = [f"https://example.com/{i}" for i in range(40)]
+    store.add_many([_item(url, f"2026-01-{1 + i % 28:02d}") for i, url in enumerate(urls)])
+    conn = store._conn()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        dates = store.published_since("2026-01-27", urls[20:30])
+    finally:
+        conn.set_trace_callback(None)
+
+    assert dates == {urls[26]: "2026-01-27", urls[27]: "2026-01-28"}
+    # The statement as run, parameters inlined by the trace callback
+    plan = conn.execute("EXPLAIN QUERY PLAN " + statements[-1]).fetchall()
+    assert [row[-1] for row in plan] == [
+        "SEARCH evidence USING COVERING INDEX ix_evidence_url_published (url=? AND published_at>?)"
+    ]
@@ -0,0 +1,36 @@
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from benchmarks.bench_fanout import make_state
+from node.Orchestrator import fanout, worker_payloads
+from node.worker import build_worker_messages
+
+
+def test_payload_carries_task_slice_and_brief_only():
+    state = make_state(9, 60)
+    payloads = worker_payloads(state)
+
+    assert all(set(p) == {"brief", "task", "evidence"} for p in payloads)
+    assert all(p["brief"] is payloads[0]["brief"] for p in payloads)
+    assert payloads[0]["brief"]["blog_title"] == "Benchmark blog"
+
+
+def test_checkpointed_send_size_does_not_grow_with_plan():
+    serde = JsonPlusSerializer()
+
+    def first_send_bytes(n_tasks):
+        return len(serde.dumps_typed(fanout(make_state(n_tasks, 0))[0])[1])
+
+    assert first_send_bytes(9) == first_send_bytes(3)
+
+
+def test_payload_from_older_checkpoint_builds_the_same_prompt():
+    state = make_state(3, 10)
+    new = worker_payloads(state)[1]
+    old = {
+        **{k: state[k] for k in ("topic", "mode", "as_of", "recency_days")},
+        "plan": state["plan"].model_dump(),
+        "task": new["task"].model_dump(),
+        "evidence": [e.model_dump() for e in new["evidence"]],
+    }
+
+    assert build_worker_messages(old)[1][1].content == build_worker_messages(new)[1][1].content
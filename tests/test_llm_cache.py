@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+import types
+import warnings
+
+import pytest
+from langchain_core.outputs import Generation
+
+import core.llm_cache
+from core.llm_cache import MemoryLLMCache, SQLiteLLMCache, bypass_llm_cache, get_llm_cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LLM = "fake-model temperature=0"
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        self.now += 1  # every call is a later access
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def _fresh(monkeypatch):
+    monkeypatch.setattr(core.llm_cache, "_caches", {})
+    monkeypatch.setattr(core.llm_cache, "time", types.SimpleNamespace(time=Clock().time))
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(**bounds):
+        if request.param == "memory":
+            return MemoryLLMCache(**bounds)
+        return SQLiteLLMCache(str(tmp_path / "llm_cache.sqlite"), **bounds)
+
+    return make
+
+
+def _answer(text: str):
+    return [Generation(text=text)]
+
+
+def _texts(cache, prompts):
+    return [(cache.lookup(p, LLM) or [Generation(text="-")])[0].text for p in prompts]
+
+
+def test_nonzero_temperature_is_not_cached_unless_allowed():
+    assert get_llm_cache(0.7, backend="memory") is None
+    assert get_llm_cache(0.7, backend="memory", allow_nonzero_temperature=True) is not None
+    assert get_llm_cache(0.0, backend="memory") is get_llm_cache(0, backend="memory")
+    assert get_llm_cache(0.0, backend="off") is None
+    with pytest.raises(ValueError):
+        get_llm_cache(0.0, backend="redis")
+
+
+def test_bypass_skips_read_and_write(make_cache):
+    cache = make_cache()
+    cache.update("cached", LLM, _answer("old"))
+
+    with bypass_llm_cache():
+        assert cache.lookup("cached", LLM) is None
+        cache.update("new", LLM, _answer("new"))
+
+    assert _texts(cache, ["cached", "new"]) == ["old", "-"]
+
+
+def test_least_recently_used_entry_is_evicted(make_cache):
+    cache = make_cache(max_entries=2)
+    cache.update("a", LLM, _answer("A"))
+    cache.update("b", LLM, _answer("B"))
+    cache.lookup("a", LLM)  # "b" is now the least recently used
+
+    cache.update("c", LLM, _answer("C"))
+
+    assert _texts(cache, ["a", "b", "c"]) == ["A", "-", "C"]
+
+
+def test_entry_over_size_bound_is_dropped(make_cache):
+    cache = make_cache(max_bytes=1)
+    cache.update("a", LLM, _answer("A"))
+
+    assert cache.lookup("a", LLM) is None
+
+
+def test_import_leaves_warning_filters_alone(tmp_path):
+    # pytest resets the filters around collection, so import in a fresh interpreter
+    probe = "import warnings, core.llm_cache; print(any(f[1] and 'loads' in f[1].pattern for f in warnings.filters))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+    cache = SQLiteLLMCache(str(tmp_path / "llm_cache.sqlite"))
+    cache.update("a", LLM, _answer("A"))
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        assert _texts(cache, ["a"]) == ["A"]
+    assert not [w for w in caught if "in beta" in str(w.message)]
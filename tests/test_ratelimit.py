@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from core import ratelimit
+from core.ratelimit import LLMGovernor, TokenBucket
+
+MESSAGES = [HumanMessage(content="hello")]
+
+
+def _result(text: str = "ok") -> ChatResult:
+    return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+class Throttled(Exception):
+    status_code = 429
+
+
+@pytest.fixture(autouse=True)
+def _fast_retries(monkeypatch):
+    monkeypatch.setattr(ratelimit, "RETRY_BASE_DELAY", 0.001)
+
+
+def test_success_releases_slot():
+    gov = LLMGovernor()
+    assert gov.call(lambda m: _result(), MESSAGES).generations[0].message.content == "ok"
+    assert gov.concurrency.in_flight == 0
+    assert gov.metrics.calls == 1
+
+
+def test_non_retryable_error_releases_slot():
+    gov = LLMGovernor()
+
+    def boom(messages):
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        gov.call(boom, MESSAGES)
+    assert gov.concurrency.in_flight == 0
+    assert gov.metrics.failures == 1
+
+
+def test_throttle_retries_and_halves_limit():
+    gov = LLMGovernor()
+    limit = gov.concurrency.limit
+    attempts = []
+
+    def flaky(messages):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise Throttled("429 RESOURCE_EXHAUSTED")
+        return _result()
+
+    gov.call(flaky, MESSAGES)
+    assert len(attempts) == 2
+    assert gov.metrics.throttled == 1 and gov.metrics.retries == 1
+    assert gov.concurrency.limit < limit
+    assert gov.concurrency.in_flight == 0
+
+
+def test_cancelled_calls_release_slots():
+    gov = LLMGovernor()
+
+    async def hang(messages):
+        await asyncio.sleep(3600)
+
+    async def main():
+        tasks = [asyncio.create_task(gov.acall(hang, MESSAGES)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert gov.concurrency.in_flight == 3
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(main())
+    assert gov.concurrency.in_flight == 0
+
+
+def test_abandoned_streams_release_slots():
+    gov = LLMGovernor()
+
+    def chunks(messages):
+        for word in ("a", "b", "c"):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+    stream = gov.stream(chunks, MESSAGES)
+    next(stream)
+    assert gov.concurrency.in_flight == 1
+    stream.close()
+    assert gov.concurrency.in_flight == 0
+
+    async def achunks(messages):
+        for word in ("a", "b", "c"):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+    async def main():
+        astream = gov.astream(achunks, MESSAGES)
+        await astream.__anext__()
+        await astream.aclose()
+
+    asyncio.run(main())
+    assert gov.concurrency.in_flight == 0
+
+
+def test_request_larger_than_bucket_is_admitted():
+    bucket = TokenBucket(rate=100.0, capacity=10.0)
+    t0 = time.monotonic()
+    assert bucket.acquire(50)
+    assert time.monotonic() - t0 < 0.5
+    # The overdraft still delays the next caller
+    assert not bucket.acquire(1, blocking=False)
+
+
+def test_tokens_per_minute_bucket_holds_a_minute():
+    ratelimit.configure_limit("llm_tokens", 60_000)
+    try:
+        t0 = time.monotonic()
+        ratelimit.acquire("llm_tokens", 1500)
+        assert time.monotonic() - t0 < 0.5
+        assert ratelimit.get_limit("llm_tokens").capacity == 60_000
+    finally:
+        ratelimit.configure_limit("llm_tokens", None)
+
+
+@pytest.mark.parametrize(
+    "exc, kind",
+    [
+        (Throttled("quota"), "throttle"),
+        (RuntimeError("429 RESOURCE_EXHAUSTED: quota exceeded"), "throttle"),
+        (ValueError("bad request: https://example.com/429/page"), None),
+        (ValueError("prompt is 4290 tokens, request id 1429"), None),
+        (ValueError("input of 500 tokens is too long"), None),
+        (TimeoutError(), "server"),
+        (RuntimeError("503 UNAVAILABLE"), "server"),
+    ],
+)
+def test_classify_error_trusts_codes_not_numbers_in_text(exc, kind):
+    assert ratelimit.classify_error(exc) == kind
+
+
+def test_async_waiter_is_woken_by_release_from_another_thread():
+    conc = ratelimit.AdaptiveConcurrency(minimum=1, maximum=1)
+    conc.enter()
+
+    async def main():
+        waiting = asyncio.create_task(conc.aenter())
+        await asyncio.sleep(0.01)
+        assert not waiting.done() and len(conc._waiters) == 1
+        t0 = time.monotonic()
+        threading.Timer(0.05, conc.exit).start()
+        await asyncio.wait_for(waiting, 1)
+        return time.monotonic() - t0
+
+    assert asyncio.run(main()) < 0.5
+    assert conc.in_flight == 1 and not conc._waiters
+
+
+def test_cancelled_waiter_leaves_no_waiter_behind():
+    conc = ratelimit.AdaptiveConcurrency(minimum=1, maximum=1)
+    conc.enter()
+
+    async def main():
+        waiting = asyncio.create_task(conc.aenter())
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+
+    asyncio.run(main())
+    assert not conc._waiters
+    conc.exit()
+    assert conc.in_flight == 0
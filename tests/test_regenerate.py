@@ -0,0 +1,57 @@
+import pytest
+
+from core.checkpoint import SQLiteSaver, new_thread_id, thread_config
+from workflow.graph import create_app
+from workflow.regenerate import regenerate_sections
+
+
+def _latest(sections):
+    # The sections reducer appends; the last entry per task id is the current one
+    return dict(sections)
+
+
+def test_regenerate_reruns_only_selected_sections(fakes, make_inputs):
+    llm, search = fakes
+    llm.mode, llm.n_tasks = "closed_book", 4
+    app = create_app()
+    assert isinstance(app.checkpointer, SQLiteSaver)
+    thread_id = new_thread_id()
+    app.invoke(make_inputs("regenerate topic"), config=thread_config(thread_id))
+    before = _latest(app.get_state(thread_config(thread_id)).values["sections"])
+    llm_calls, search_calls = llm.calls, search.calls
+
+    llm.section_words = 7  # regenerated sections are recognisably different
+    out = regenerate_sections(app, thread_id, [4, 2, 2])
+
+    assert llm.calls - llm_calls == 2 and search.calls == search_calls
+    after = _latest(out["sections"])
+    assert sorted(after) == [1, 2, 3, 4]
+    assert {i: after[i] for i in (1, 3)} == {i: before[i] for i in (1, 3)}
+    assert all(after[i] != before[i] and len(after[i].split()) < len(before[i].split()) for i in (2, 4))
+    for i in (1, 2, 3, 4):
+        assert after[i].split("\n", 1)[1].strip() in out["final"]
+
+    saved = app.get_state(thread_config(thread_id))
+    assert saved.metadata["source"] == "update"
+    # Written as the reducer's output: nothing is left to run on this thread
+    assert saved.next == ()
+    assert saved.values["final"] == out["final"]
+    assert _latest(saved.values["sections"]) == after
+
+    # A second regeneration starts from the edited blog
+    llm.section_words = 5
+    again = _latest(regenerate_sections(app, thread_id, [1])["sections"])
+    assert {i: again[i] for i in (2, 3, 4)} == {i: after[i] for i in (2, 3, 4)}
+
+
+def test_regenerate_rejects_unknown_task_ids(fakes, make_inputs):
+    llm, _ = fakes
+    llm.mode, llm.n_tasks = "closed_book", 2
+    app = create_app()
+    thread_id = new_thread_id()
+    app.invoke(make_inputs("regenerate topic"), config=thread_config(thread_id))
+    calls = llm.calls
+
+    with pytest.raises(ValueError, match=r"\[7\]"):
+        regenerate_sections(app, thread_id, [1, 7])
+    assert llm.calls == calls
@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeSearch
+import node.Research
+from node.Research import _asearch_many, _canonical_url, _prefilter_results, _search_many
+
+QUERIES = ["alpha", "beta", "gamma", "delta"]
+
+
+def _titles(per_query):
+    return [[r["title"] for r in results] for results in per_query]
+
+
+def _sync(search, **kwargs):
+    return _search_many(QUERIES, max_results=2, search_fn=search, max_workers=4, grouped=True, **kwargs)
+
+
+def _async(search, **kwargs):
+    return asyncio.run(_asearch_many(QUERIES, max_results=2, search_fn=search.asearch, max_concurrency=4, grouped=True, **kwargs))
+
+
+@pytest.fixture(params=[_sync, _async], ids=["threads", "async"])
+def search_many(request):
+    return request.param
+
+
+def test_results_keep_query_order(search_many):
+    # The first query finishes last
+    search = FakeSearch(latency=0.0, slow=["alpha"], slow_latency=0.1)
+
+    per_query = search_many(search, timeout=5.0)
+
+    assert _titles(per_query) == [[f"{q} result 0", f"{q} result 1"] for q in QUERIES]
+    flat = _search_many(QUERIES, max_results=1, search_fn=search, max_workers=4, timeout=5.0)
+    assert [r["title"] for r in flat] == [f"{q} result 0" for q in QUERIES]
+
+
+def test_failed_query_is_dropped_others_kept(search_many, caplog):
+    search = FakeSearch(latency=0.0, fail=["beta"])
+
+    per_query = search_many(search, timeout=5.0)
+
+    assert [len(results) for results in per_query] == [2, 0, 2, 2]
+    assert search.calls == len(QUERIES)
+    assert any("search failed for query 'beta'" in r.getMessage() for r in caplog.records)
+
+
+def test_slow_query_times_out_without_holding_the_rest(search_many, caplog):
+    search = FakeSearch(latency=0.01, slow=["gamma"], slow_latency=2.0)
+
+    t0 = time.perf_counter()
+    per_query = search_many(search, timeout=0.2)
+    elapsed = time.perf_counter() - t0
+
+    assert [len(results) for results in per_query] == [2, 2, 0, 2]
+    assert elapsed < 1.0
+    assert any("search timed out" in r.getMessage() and "'gamma'" in r.getMessage() for r in caplog.records)
+
+
+def test_timeout_counts_from_query_start(caplog):
+    # One worker: "beta" queues behind "alpha" but still gets its own full timeout
+    search = FakeSearch(latency=0.15)
+
+    per_query = _search_many(["alpha", "beta"], max_results=1, search_fn=search, max_workers=1, timeout=0.25, grouped=True)
+
+    assert [len(results) for results in per_query] == [1, 1]
+    assert not any("timed out" in r.getMessage() for r in caplog.records)
+
+
+@pytest.mark.parametrize("url, key", [
+    ("https://example.com/a?utm_source=x&utm_MEDIUM=y&id=7", "https://example.com/a?id=7"),
+    ("https://example.com/a?gclid=1&fbclid=2&msclkid=3", "https://example.com/a"),
+    ("https://www.Example.COM/a", "https://example.com/a"),
+    ("http://example.com:80/a", "https://example.com/a"),
+    ("https://example.com:443/a", "https://example.com/a"),
+    ("https://example.com:8443/a", "https://example.com:8443/a"),
+    ("https://example.com/a?b=2&a=1", "https://example.com/a?a=1&b=2"),
+    ("https://example.com/a/#section", "https://example.com/a"),
+    ("example.com/a", "https://example.com/a"),
+    ("", ""),
+    ("   ", ""),
+    (None, ""),
+    ("https:///no-host", ""),
+    ("http://host:abc/x", "http://host:abc/x"),  # unparseable: kept as given
+])
+def test_canonical_url(url, key):
+    assert _canonical_url(url) == key
+
+
+def _result(url, snippet="", title="t"):
+    return {"title": title, "url": url, "snippet": snippet}
+
+
+TEXT = "LangGraph checkpoints persist graph state after every superstep so a crashed run resumes where it stopped"
+
+
+@pytest.mark.parametrize("per_query, kept, counts", [
+    (
+        [[_result(""), _result("   "), _result("https://example.com/a")]],
+        [["https://example.com/a"]],
+        {"empty_url": 2, "kept": 1},
+    ),
+    (
+        [[_result("https://www.example.com/a?utm_source=x")], [_result(" https://example.com/a/ "), _result("https://example.com/b")]],
+        [["https://www.example.com/a?utm_source=x"], ["https://example.com/b"]],
+        {"duplicate_url": 1, "kept": 2},
+    ),
+    (
+        [[_result("https://a.example.com/1", TEXT)], [_result("https://b.example.com/2", TEXT + " today")]],
+        [["https://a.example.com/1"], []],
+        {"near_duplicate": 1, "kept": 1},
+    ),
+    (
+        [[_result("https://a.example.com/1", TEXT), _result("https://b.example.com/2", "Pricing of hosted vector databases per million queries")]],
+        [["https://a.example.com/1", "https://b.example.com/2"]],
+        {"near_duplicate": 0, "kept": 2},
+    ),
+    (
+        # Too short to shingle: never treated as a near duplicate
+        [[_result("https://a.example.com/1", "ok", title=""), _result("https://b.example.com/2", "ok", title="")]],
+        [["https://a.example.com/1", "https://b.example.com/2"]],
+        {"near_duplicate": 0, "kept": 2},
+    ),
+], ids=["empty-url", "duplicate-url", "near-duplicate", "distinct", "short-snippets"])
+def test_prefilter_results(per_query, kept, counts):
+    cleaned, stats = _prefilter_results(per_query)
+
+    assert [[r["url"] for r in results] for results in cleaned] == kept
+    assert {k: stats[k] for k in counts} == counts
+    assert stats["raw"] == sum(len(results) for results in per_query)
+
+
+def test_prefilter_truncates_long_snippets_on_a_word(monkeypatch):
+    monkeypatch.setattr(node.Research, "SNIPPET_MAX_CHARS", 20)
+    short = "fits in twenty"
+    cleaned, stats = _prefilter_results([[
+        _result("https://a.example.com/1", "  one two three four five six seven  "),
+        _result("https://b.example.com/2", short),
+    ]])
+
+    assert [r["snippet"] for r in cleaned[0]] == ["one two three four…", short]
+    assert stats["truncated"] == 1
+    assert stats["chars_after"] < stats["chars_before"]
@@ -0,0 +1,53 @@
+import core.blog_index
+from core.blog_index import BlogIndex, excerpt, fts_query, fts_rank
+from core.evidence_store import EvidenceStore
+
+
+def test_excerpt_highlights_best_window():
+    text = "filler " * 40 + "vector databases such as pgvector build an HNSW graph" + " tail" * 40
+    out = excerpt(text, "pgvector hnsw")
+    assert "**pgvector**" in out and "**HNSW**" in out
+    assert out.startswith("…") and out.endswith("…")
+    assert excerpt("", "x") == ""
+
+
+def test_rank_window_keeps_newest_matches(tmp_path):
+    store = EvidenceStore(str(tmp_path / "evidence.sqlite"))
+    store.add_many([{"title": f"agents {i}", "url": f"https://example.com/{i}", "snippet": "agents"} for i in range(50)])
+    conn = store._conn()
+
+    ranked = fts_rank(conn, "evidence_fts", fts_query("agents"), "4.0, 1.0", limit=100, window=10)
+    assert sorted(rowid for rowid, _ in ranked) == list(range(41, 51))
+
+    hits = store.search("agent", limit=5)
+    assert len(hits) == 5
+    assert all(hit["match"] == "**agents**" for hit in hits)
+
+
+def test_blog_search_returns_metadata_and_match(tmp_path):
+    index = BlogIndex(str(tmp_path / "blogs.sqlite"))
+    index.add(str(tmp_path / "a.md"), "# Caching\n\nA post about search result caching.", topic="cache")
+    index.add(str(tmp_path / "b.md"), "# Other\n\nNothing relevant here.")
+
+    hits = index.search("caching")
+    assert [hit["title"] for hit in hits] == ["Caching"]
+    assert "**caching**" in hits[0]["match"] and "body" not in hits[0]
+
+
+def test_blog_page_ranks_and_counts_within_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(core.blog_index, "FTS_RANK_WINDOW", 10)
+    index = BlogIndex(str(tmp_path / "blogs.sqlite"))
+    for i in range(25):
+        index.add(str(tmp_path / f"{i}.md"), f"# Post {i}\n\n" + "caching " * (1 + i % 5))
+
+    first, total = index.page("caching", limit=4)
+    second, _ = index.page("caching", offset=4, limit=4)
+    rest, _ = index.page("caching", offset=8, limit=4)
+
+    assert total == 10
+    # The newest 10 matches, best (most mentions) first, without repeats across pages
+    titles = [row["title"] for row in first + second + rest]
+    assert sorted(titles) == sorted(f"Post {i}" for i in range(15, 25))
+    assert set(titles[:2]) == {"Post 19", "Post 24"}
+    assert index.page("caching", offset=10) == ([], 10)
+    assert index.page("", limit=1)[1] == 25
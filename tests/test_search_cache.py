@@ -0,0 +1,100 @@
+import types
+
+import pytest
+
+import core.search_cache
+from core.search_cache import DAY, HOUR, SearchCache, ttl_for_recency
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(core.search_cache, "time", types.SimpleNamespace(time=clock.time))
+    return clock
+
+
+def _results(query: str, n: int = 2):
+    return [{"title": f"{query} {i}", "url": f"https://example.com/{i}", "snippet": "s"} for i in range(n)]
+
+
+@pytest.mark.parametrize("recency_days, ttl", [
+    (None, 6 * HOUR),
+    (0, 6 * HOUR),
+    (7, 6 * HOUR),  # open_book
+    (8, 3 * DAY),
+    (45, 3 * DAY),  # hybrid
+    (46, 30 * DAY),
+    (3650, 30 * DAY),  # closed_book
+])
+def test_ttl_for_recency(recency_days, ttl):
+    assert ttl_for_recency(recency_days) == ttl
+
+
+def test_expired_entry_is_a_miss_and_deleted_on_read(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "cache.sqlite"))
+    cache.put("LLM  Agents", 2, _results("agents"), ttl_s=HOUR)
+
+    assert cache.get("llm agents", 2) == _results("agents")  # normalized key
+    assert cache.get("llm agents", 3) is None  # max_results is part of the key
+
+    clock.now += HOUR
+    assert cache.get("llm agents", 2) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_shorter_caller_ttl_misses_without_dropping_entry(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "cache.sqlite"))
+    cache.put("rag", 2, _results("rag"), ttl_s=ttl_for_recency(3650))
+
+    clock.now += ttl_for_recency(7) + 1
+    assert cache.get("rag", 2, ttl_s=ttl_for_recency(7)) is None
+    assert cache.get("rag", 2, ttl_s=ttl_for_recency(3650)) == _results("rag")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "cache.sqlite"), max_entries=3)
+    for q in ("a", "b", "c"):
+        cache.put(q, 2, _results(q), ttl_s=DAY)
+        clock.now += 1
+    cache.get("a", 2)  # "b" is now the least recently used
+    clock.now += 1
+
+    cache.put("d", 2, _results("d"), ttl_s=DAY)
+
+    assert [q for q in "abcd" if cache.get(q, 2) is not None] == ["a", "c", "d"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_size_bound_evicts_until_it_holds(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "cache.sqlite"), max_bytes=1)
+    cache.put("a", 2, _results("a"), ttl_s=DAY)
+    clock.now += 1
+    cache.put("b", 2, _results("b"), ttl_s=DAY)
+
+    # Even the newest entry is over the bound on its own
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["evictions"] == 2
+
+
+def test_hit_and_miss_counters_persist_across_instances(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    first = SearchCache(path)
+    first.put("q", 2, _results("q"), ttl_s=DAY)
+    first.get("q", 2)
+    first.get("other", 2)
+
+    second = SearchCache(path)
+    second.get("q", 2)
+
+    stats = second.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 0)  # this instance
+    assert (stats["total_hits"], stats["total_misses"]) == (2, 1)  # all instances
+    assert first.stats()["entries"] == 1
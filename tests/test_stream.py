@@ -0,0 +1,49 @@
+from workflow.graph import create_app
+from workflow.stream import try_stream
+
+
+def _run(app, inputs):
+    events = list(try_stream(app, inputs))
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == "final"
+    report = dict(events)["metrics"]
+    return dict(events)["final"], report
+
+
+def test_closed_book_runs_each_node_and_llm_call_once(fakes, make_inputs):
+    llm, search = fakes
+    llm.mode, llm.n_tasks = "closed_book", 5
+
+    final, report = _run(create_app(durable=False), make_inputs())
+
+    # router + planner + one call per section, nothing repeated for the final state
+    assert llm.calls == 1 + 1 + 5
+    assert search.calls == 0
+    calls = {node: row["calls"] for node, row in report["nodes"].items()}
+    assert calls == {"router": 1, "orchestrator": 1, "worker": 5, "reducer": 1}
+    assert len(final["sections"]) == 5
+    assert final["final"].startswith("# Fake benchmark blog")
+
+
+def test_hybrid_runs_research_once(fakes, make_inputs):
+    llm, search = fakes
+    llm.mode, llm.n_tasks, llm.n_queries = "hybrid", 4, 3
+
+    final, report = _run(create_app(durable=False), make_inputs("hybrid topic"))
+
+    assert search.calls == 3
+    calls = {node: row["calls"] for node, row in report["nodes"].items()}
+    assert calls == {"router": 1, "research": 1, "orchestrator": 1, "worker": 4, "reducer": 1}
+    assert report["search"]["calls"] == 3
+    assert len(final["sections"]) == 4
+
+
+def test_durable_run_streams_once(fakes, make_inputs):
+    llm, _ = fakes
+    llm.mode, llm.n_tasks = "closed_book", 3
+
+    final, report = _run(create_app(), make_inputs("durable topic"))
+
+    assert llm.calls == 1 + 1 + 3
+    assert report["nodes"]["worker"]["calls"] == 3
+    assert final["final"]
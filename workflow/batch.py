@@ -0,0 +1,311 @@
+"""
+Headless batch runner: generates one blog per input topic.
+
+    python -m workflow.batch topics.jsonl --out results.jsonl --concurrency 4 \
+        --llm-rpm 300 --search-rpm 120
+
+Input is JSONL ({"topic": ..., "as_of": "YYYY-MM-DD", "id": ...}) or CSV with
+the same columns; only `topic` is required. Each finished job is appended to
+--out as one JSON line (flushed + fsynced), and a rerun skips every id that
+already has an "ok" record, so a crashed batch resumes where it stopped;
+jobs that died mid-graph continue from their last checkpoint. Checkpoint
+threads are scoped to the --out file, so another batch repeating a topic and
+as_of generates it again instead of returning the earlier blog.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+from core.env import load_env
+
+load_env()  # before the core modules below read their settings
+
+from core import metrics, ratelimit  # noqa: E402
+
+logger = logging.getLogger("workflow.batch")
+
+
+# -----------------------------
+# Jobs
+# -----------------------------
+def job_id(topic: str, as_of: str) -> str:
+    return hashlib.sha1(f"{topic.strip()}\x00{as_of}".encode("utf-8")).hexdigest()[:12]
+
+
+def thread_id(out_path: str, jid: str) -> str:
+    """
+    Checkpoint thread of job `jid` in the batch writing `out_path`: only a
+    rerun of that same batch resumes it.
+    """
+    scope = hashlib.sha1(str(Path(out_path).resolve()).encode("utf-8")).hexdigest()[:8]
+    return f"batch-{scope}-{jid}"
+
+
+def read_jobs(path: str) -> List[Dict[str, str]]:
+    """
+    Reads JSONL or CSV (chosen by extension) into [{"id", "topic", "as_of"}].
+
+    The id is also the job's checkpoint thread, so it must be unique: rows
+    repeating an earlier id (the same topic and as_of, or the same explicit
+    id) are dropped with a warning instead of running twice on one thread.
+    """
+    p = Path(path)
+    if p.suffix.lower() == ".csv":
+        with p.open(newline="", encoding="utf-8") as f:
+            rows: Iterable[dict] = list(csv.DictReader(f))
+    else:
+        with p.open(encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    jobs = []
+    first_row: Dict[str, int] = {}
+    for n, row in enumerate(rows, start=1):
+        topic = (row.get("topic") or "").strip()
+        if not topic:
+            continue
+        as_of = (row.get("as_of") or "").strip() or date.today().isoformat()
+        jid = str(row.get("id") or job_id(topic, as_of))
+        if jid in first_row:
+            logger.warning("row %d: duplicate job id %s (first seen in row %d), skipped", n, jid, first_row[jid])
+            continue
+        first_row[jid] = n
+        jobs.append({"id": jid, "topic": topic, "as_of": as_of})
+    return jobs
+
+
+def completed_ids(out_path: str) -> set:
+    done = set()
+    p = Path(out_path)
+    if not p.exists():
+        return done
+    with p.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn last line from a crash
+            if rec.get("status") == "ok":
+                done.add(rec.get("id"))
+    return done
+
+
+def initial_state(topic: str, as_of: str) -> Dict[str, Any]:
+    return {
+        "topic": topic,
+        "mode": "",
+        "needs_research": False,
+        "queries": [],
+        "evidence": [],
+        "plan": None,
+        "as_of": as_of,
+        "recency_days": 7,
+        "sections": [],
+        "final": "",
+    }
+
+
+# -----------------------------
+# Running
+# -----------------------------
+async def run_job(app, job: Dict[str, str], thread: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs one topic through the graph on checkpoint thread `thread` (default:
+    the job id), timing each stage from its updates: a node's latency is the
+    time since the previous stage finished (workers are all measured from
+    the end of planning). Records of resumed jobs say so ("resumed") and are
+    left out of the latency report.
+    """
+    t0 = time.perf_counter()
+    stages: Dict[str, List[float]] = {}
+    prev_end = t0
+    fanout_start = t0
+    final: Dict[str, Any] = {}
+
+    # A job that died mid-graph resumes after its last completed superstep
+    # instead of starting over.
+    config = {"configurable": {"thread_id": thread or job["id"]}}
+    inputs: Optional[Dict[str, Any]] = initial_state(job["topic"], job["as_of"])
+    resumed = False
+    if getattr(app, "checkpointer", None) is not None:
+        saved = await app.aget_state(config)
+        if saved.next:
+            inputs, resumed = None, True
+        elif saved.values.get("final"):
+            # Finished before the crash, but its record was never written
+            inputs, resumed, final = None, True, saved.values
+
+    with metrics.collect(job["id"]) as run:
+        if not final:
+            async for mode, chunk in app.astream(inputs, config=config, stream_mode=["updates", "values"]):
+                now = time.perf_counter()
+                if mode == "values":
+                    final = chunk
+                    continue
+                for node in chunk:
+                    start = fanout_start if node == "worker" else prev_end
+                    stages.setdefault(node, []).append(now - start)
+                    if node in ("orchestrator", "reconcile"):
+                        fanout_start = now
+                prev_end = now
+
+    plan = final.get("plan")
+    return {
+        "id": job["id"],
+        "topic": job["topic"],
+        "as_of": job["as_of"],
+        "status": "ok",
+        "resumed": resumed,
+        "mode": final.get("mode"),
+        "blog_title": plan.blog_title if plan is not None else None,
+        "evidence_count": len(final.get("evidence") or []),
+        "elapsed_s": round(time.perf_counter() - t0, 3),
+        "stages": {k: [round(v, 3) for v in vs] for k, vs in stages.items()},
+        "metrics": run.report() if run is not None else None,
+        "final": final.get("final", ""),
+    }
+
+
+def _append(out, record: Dict[str, Any]) -> None:
+    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    out.flush()
+    os.fsync(out.fileno())
+
+
+async def run_batch(jobs: List[Dict[str, str]], out_path: str, concurrency: int, app=None) -> List[Dict[str, Any]]:
+    if app is None:
+        from workflow.graph import create_async_app
+
+        app = create_async_app()
+
+    sem = asyncio.Semaphore(max(1, concurrency))
+    records: List[Dict[str, Any]] = []
+
+    with open(out_path, "a+", encoding="utf-8") as out:
+        # A crash can leave a torn last line; start the next record on a fresh one
+        if out.tell() > 0:
+            out.seek(out.tell() - 1)
+            if out.read(1) != "\n":
+                out.write("\n")
+
+        async def worker(job: Dict[str, str]) -> None:
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    rec = await run_job(app, job, thread_id(out_path, job["id"]))
+                except Exception as exc:
+                    logger.exception("job %s failed", job["id"])
+                    rec = {
+                        **job,
+                        "status": "error",
+                        "error": f"{type(exc).__name__}: {exc}",
+                        "elapsed_s": round(time.perf_counter() - t0, 3),
+                    }
+                # Single event loop: appends from different jobs never interleave
+                _append(out, rec)
+                records.append(rec)
+                logger.info("[%d/%d] %s %s (%.1fs)", len(records), len(jobs), rec["status"], job["topic"][:60], rec["elapsed_s"])
+
+        await asyncio.gather(*(worker(j) for j in jobs))
+
+    return records
+
+
+# -----------------------------
+# Report
+# -----------------------------
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    s = sorted(values)
+    k = (len(s) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(s) - 1)
+    return round(s[lo] + (s[hi] - s[lo]) * (k - lo), 3)
+
+
+def build_report(records: List[Dict[str, Any]], wall_s: float) -> Dict[str, Any]:
+    ok = [r for r in records if r.get("status") == "ok"]
+    # A resumed job's time covers only what was left (or nothing, if it had
+    # finished before the crash): it would skew the percentiles
+    timed = [r for r in ok if not r.get("resumed")]
+    per_stage: Dict[str, List[float]] = {}
+    for r in timed:
+        for stage, values in r.get("stages", {}).items():
+            per_stage.setdefault(stage, []).extend(values)
+    end_to_end = [r["elapsed_s"] for r in timed]
+    usage = {"llm_calls": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0, "search_calls": 0}
+    for r in ok:
+        m = r.get("metrics") or {}
+        for k in ("llm_calls", "input_tokens", "output_tokens", "cost_usd"):
+            usage[k] += (m.get("totals") or {}).get(k, 0)
+        usage["search_calls"] += (m.get("search") or {}).get("calls", 0)
+    usage["cost_usd"] = round(usage["cost_usd"], 6)
+
+    return {
+        "jobs": len(records),
+        "ok": len(ok),
+        "errors": len(records) - len(ok),
+        "resumed": len(ok) - len(timed),
+        "wall_s": round(wall_s, 3),
+        "blogs_per_hour": round(len(ok) / wall_s * 3600, 1) if wall_s > 0 else None,
+        "latency_s": {
+            name: {"n": len(vals), "p50": percentile(vals, 0.5), "p95": percentile(vals, 0.95), "max": percentile(vals, 1.0)}
+            for name, vals in [("end_to_end", end_to_end), *sorted(per_stage.items())]
+        },
+        "usage": usage,
+        # Admission control over the whole batch: queue wait, retries, 429s, AIMD limit
+        "llm": ratelimit.governor.snapshot(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Generate blogs for a JSONL/CSV list of topics.")
+    ap.add_argument("input", help="topics file (.jsonl or .csv)")
+    ap.add_argument("--out", default="batch_results.jsonl", help="append-only results file (also the resume log)")
+    ap.add_argument("--report", default=None, help="write the throughput/latency report JSON here")
+    ap.add_argument("--concurrency", type=int, default=4, help="topics generated at once")
+    ap.add_argument("--llm-rpm", type=float, default=None, help="global LLM requests/min (default: LLM_REQUESTS_PER_MINUTE)")
+    ap.add_argument("--search-rpm", type=float, default=None, help="global search requests/min (default: SEARCH_REQUESTS_PER_MINUTE)")
+    ap.add_argument("--limit", type=int, default=None, help="only run the first N pending jobs")
+    ap.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics on this port (default: METRICS_PORT)")
+    ap.add_argument("--metrics-host", default=None, help="address the metrics endpoint binds to (default: METRICS_HOST, loopback)")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.llm_rpm is not None:
+        ratelimit.configure_limit("llm", args.llm_rpm)
+    if args.search_rpm is not None:
+        ratelimit.configure_limit("search", args.search_rpm)
+
+    metrics.serve_prometheus(args.metrics_port, args.metrics_host)
+
+    jobs = read_jobs(args.input)
+    done = completed_ids(args.out)
+    pending = [j for j in jobs if j["id"] not in done]
+    skipped = len(jobs) - len(pending)
+    if args.limit is not None:
+        pending = pending[: args.limit]
+    logger.info("%d jobs, %d already done, %d to run", len(jobs), skipped, len(pending))
+
+    t0 = time.perf_counter()
+    records = asyncio.run(run_batch(pending, args.out, args.concurrency))
+    report = build_report(records, time.perf_counter() - t0)
+
+    print(json.dumps(report, indent=2))
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0 if report["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,64 @@
 from langgraph.graph import StateGraph, START, END 
 from core.state import State 
-from node.Router import router_node,route_next 
-from node.Research import research_node 
-from node.Orchestrator import orchestrator_node ,fanout
-from node.worker import worker_node 
-from node.Reducer import reducer_node
+from node.Router import router_node,arouter_node,route_next 
+from node.Research import research_node,aresearch_node 
+from node.Orchestrator import orchestrator_node,aorchestrator_node ,fanout,after_research,after_plan
+from node.Reconcile import reconcile_node,areconcile_node
+from node.worker import worker_node,aworker_node 
+from node.Reducer import reducer_node,areducer_node
+from core.checkpoint import get_checkpointer
+from core.metrics import instrument
 from langsmith import traceable
 
 
-@traceable(name="graph_node")
-def create_app() -> any:
-    """
-    Builds and returns the compiled LangGraph application.
-    """
+def _build_graph(router, research, orchestrator, reconcile, worker, reducer) -> StateGraph:
     g = StateGraph(State)
 
-    g.add_node("router", router_node)
-    g.add_node("research", research_node)
-    g.add_node("orchestrator", orchestrator_node)
-    g.add_node("worker", worker_node)
-    g.add_node("reducer", reducer_node)
+    # instrument() records wall time / LLM tokens / search per node while a
+    # run is being collected (core.metrics.collect) and is a pass-through otherwise
+    g.add_node("router", instrument("router", router))
+    g.add_node("research", instrument("research", research))
+    g.add_node("orchestrator", instrument("orchestrator", orchestrator))
+    g.add_node("reconcile", instrument("reconcile", reconcile))
+    g.add_node("worker", instrument("worker", worker))
+    g.add_node("reducer", instrument("reducer", reducer))
 
     g.add_edge(START, "router")
     g.add_conditional_edges("router", route_next, {"research": "research", "orchestrator": "orchestrator"})
-    g.add_edge("research", "orchestrator")
+    # SPECULATIVE_PLANNING (hybrid): router starts research and orchestrator
+    # together, and both hand over to reconcile, which runs once they're done
+    g.add_conditional_edges("research", after_research, ["orchestrator", "reconcile"])
 
-    g.add_conditional_edges("orchestrator", fanout, ["worker"])
+    g.add_conditional_edges("orchestrator", after_plan, ["reconcile", "worker", "reducer"])
+    # fanout goes straight to the reducer when no section is left to write
+    g.add_conditional_edges("reconcile", fanout, ["worker", "reducer"])
     g.add_edge("worker", "reducer")
     g.add_edge("reducer", END)
 
-    return g.compile()
+    return g
+
+
+@traceable(name="graph_node")
+def create_app(durable: bool = True) -> any:
+    """
+    Builds and returns the compiled LangGraph application.
+
+    With durable=True (and CHECKPOINTS not off) every superstep is saved to
+    the SQLite checkpointer, so each run needs a thread id
+    (config={"configurable": {"thread_id": ...}}). Re-invoking a failed
+    thread with None as input resumes after the last completed superstep and
+    re-executes only the tasks that failed, e.g. one of nine workers.
+    """
+    checkpointer = get_checkpointer() if durable else None
+    return _build_graph(router_node, research_node, orchestrator_node, reconcile_node, worker_node, reducer_node).compile(checkpointer=checkpointer)
+
+
+@traceable(name="graph_node")
+def create_async_app(durable: bool = True) -> any:
+    """
+    Same graph with async nodes (LLM ainvoke, async Tavily); run it with
+    ainvoke/astream. Workers fan out as coroutines on the event loop, so one
+    process can serve many concurrent generations. Checkpointing as in create_app.
+    """
+    checkpointer = get_checkpointer() if durable else None
+    return _build_graph(arouter_node, aresearch_node, aorchestrator_node, areconcile_node, aworker_node, areducer_node).compile(checkpointer=checkpointer)
@@ -0,0 +1,58 @@
+"""
+Regenerates chosen sections of a finished run without re-running routing,
+research or planning: the saved plan and evidence come from the run's
+checkpoint, only the selected workers call the LLM, and the reducer
+re-assembles the blog from the new and the kept sections.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+
+from core.checkpoint import thread_config
+from core.llm_cache import bypass_llm_cache
+from core.metrics import instrument
+from node.Orchestrator import worker_payloads
+from node.Reducer import reducer_node
+from node.worker import worker_node
+
+
+def load_run(app, thread_id: str) -> Dict[str, Any]:
+    """
+    Returns the last saved state of `thread_id`.
+    """
+    state = app.get_state(thread_config(thread_id)).values
+    if not state or state.get("plan") is None:
+        raise ValueError(f"No saved plan for run {thread_id!r}")
+    return state
+
+
+def regenerate_sections(app, thread_id: str, task_ids: Iterable[int]) -> Dict[str, Any]:
+    """
+    Re-executes worker_node for `task_ids` only (in parallel), re-runs the
+    reducer and saves the result back to the run's checkpoint, so a later
+    regeneration or resume starts from the edited blog. Returns the new state.
+    """
+    state = load_run(app, thread_id)
+    wanted = sorted(set(task_ids))
+    payloads = worker_payloads(state, wanted)
+    missing = set(wanted) - {p["task"].id for p in payloads}
+    if missing:
+        raise ValueError(f"Unknown task ids for this plan: {sorted(missing)}")
+    if not payloads:
+        return state
+
+    # A regenerated section must be a new answer, not the cached one
+    write = instrument("worker", worker_node)
+    with bypass_llm_cache(), ThreadPoolExecutor(max_workers=len(payloads)) as pool:
+        # Each section runs in a copy of this context (cache bypass, run metrics)
+        futures = [pool.submit(contextvars.copy_context().run, write, p) for p in payloads]
+        results = [f.result() for f in futures]
+    new_sections: List[tuple] = [section for r in results for section in r["sections"]]
+
+    # Appending keeps the sections reducer semantics; the latest entry per task wins
+    state = {**state, "sections": state["sections"] + new_sections}
+    final = reducer_node(state)["final"]
+    app.update_state(thread_config(thread_id), {"sections": new_sections, "final": final}, as_node="reducer")
+    return {**state, "final": final}
+
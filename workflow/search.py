@@ -0,0 +1,56 @@
+"""
+Searches saved blogs and collected evidence from the command line.
+
+    python -m workflow.search "vector databases" --kind blog evidence --limit 10
+    python -m workflow.search --backfill .        # index older blogs / embed missing docs
+
+Full-text search always runs; SEARCH_EMBEDDINGS=ollama (or --semantic) adds
+nearest neighbours from the local embedding model.
+"""
+from __future__ import annotations
+from typing import List, Optional
+import argparse
+import json
+import sys
+
+from core.env import load_env
+
+load_env()  # before the core modules below read their settings
+
+from core import search  # noqa: E402
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Search saved blogs and past evidence.")
+    ap.add_argument("query", nargs="?", default="", help="free-text query")
+    ap.add_argument("--kind", nargs="+", choices=search.KINDS, default=list(search.KINDS), help="what to search")
+    ap.add_argument("--limit", type=int, default=20)
+    sem = ap.add_mutually_exclusive_group()
+    sem.add_argument("--semantic", dest="semantic", action="store_true", default=None, help="require embeddings")
+    sem.add_argument("--no-semantic", dest="semantic", action="store_false", help="full-text only")
+    ap.add_argument("--json", action="store_true", help="print hits as JSON lines")
+    ap.add_argument("--backfill", metavar="DIR", default=None, help="index *.md in DIR and embed missing docs first")
+    args = ap.parse_args(argv)
+
+    if args.backfill is not None:
+        print(json.dumps(search.backfill(args.backfill)), file=sys.stderr)
+    if not args.query:
+        return 0 if args.backfill is not None else 2
+
+    try:
+        hits = search.search(args.query, kinds=args.kind, limit=args.limit, semantic=args.semantic)
+    except ValueError as exc:
+        ap.error(str(exc))
+    for hit in hits:
+        if args.json:
+            print(json.dumps(hit, ensure_ascii=False))
+            continue
+        print(f"[{hit['kind']}] {hit['title']}  ({hit['score']:.4f})")
+        print(f"    {hit.get('url') or hit['ref']}")
+        if hit.get("match"):
+            print(f"    {' '.join(hit['match'].split())}")
+    return 0 if hits else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
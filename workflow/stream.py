@@ -0,0 +1,72 @@
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from core import metrics
+from core.checkpoint import new_thread_id
+
+
+def try_stream(
+    graph_app,
+    inputs: Optional[Dict[str, Any]],
+    stream_tokens: bool = False,
+    thread_id: Optional[str] = None,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Runs the graph exactly once, yielding ("updates", step) for every node
+    update and ("final", state) with the last full state snapshot.
+
+    A combined updates+values stream gives the UI per-node progress and the
+    final State in the same pass, so no node (LLM call / search) is repeated.
+
+    With stream_tokens=True, worker tokens are also yielded as
+    ("section_token", (task_id, text)) while each section is being written.
+
+    When metrics are on, ("metrics", report) with the per-node/per-task
+    summary (core.metrics) comes right before "final".
+
+    With a checkpointer, each run is stored under `thread_id` (a fresh one if
+    omitted); pass inputs=None with the thread id of a failed run to resume it
+    instead of starting over.
+    """
+    modes = ["updates", "values"] + (["messages"] if stream_tokens else [])
+    if thread_id is None and getattr(graph_app, "checkpointer", None) is not None:
+        thread_id = new_thread_id()
+    config = {"configurable": {"thread_id": thread_id}} if thread_id else None
+    final: Dict[str, Any] = {}
+    with metrics.collect(thread_id or "") as run:
+        for mode, chunk in graph_app.stream(inputs, config=config, stream_mode=modes):
+            if mode == "updates":
+                yield ("updates", chunk)
+            elif mode == "values":
+                final = chunk
+            elif mode == "messages":
+                token = section_token(chunk)
+                if token is not None:
+                    yield ("section_token", token)
+    if run is not None:
+        yield ("metrics", run.report())
+    yield ("final", final)
+
+
+def section_token(chunk: Any) -> Optional[Tuple[int, str]]:
+    """
+    Maps a ("messages") stream chunk to (task_id, text) when it comes from a
+    worker (including sections written early inside orchestrator);
+    routing/planning/extraction tokens are structured output and dropped.
+    """
+    message, metadata = chunk
+    if metadata.get("langgraph_node") not in ("worker", "orchestrator") or "task_id" not in metadata:
+        return None
+    text = message.text
+    if not text:
+        return None
+    return (metadata["task_id"], text)
+
+
+def extract_latest_state(current_state: Dict[str, Any], step_payload: Any) -> Dict[str, Any]:
+    if isinstance(step_payload, dict):
+        if len(step_payload) == 1 and isinstance(next(iter(step_payload.values())), dict):
+            inner = next(iter(step_payload.values()))
+            current_state.update(inner)
+        else:
+            current_state.update(step_payload)
+    return current_state